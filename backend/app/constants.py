@@ -7,3 +7,12 @@ load_dotenv()  # load variables from .env file
 PROJECT_ID = os.getenv("PROJECT_ID")
 REGION = os.getenv("REGION")
 GCS_BUCKET = os.getenv("GCS_BUCKET")
+# "sqlite" (default) or "memory"
+DECK_REGISTRY_BACKEND = os.getenv("DECK_REGISTRY_BACKEND", "sqlite")
+# Longest a memo or benchmark request may run before its work is abandoned
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "900"))
+# "vertex" (default) or "local"; runs offline bulk extraction jobs
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "vertex")
+# Set to "1" to let the local batch backend call Gemini instead of answering
+# offline
+BATCH_LOCAL_LIVE = os.getenv("BATCH_LOCAL_LIVE", "0") == "1"
@@ -0,0 +1,91 @@
+"""Incremental parser that splits the AI competitive summary into sections."""
+
+from typing import Callable, Dict, List, Optional
+
+SECTION_KEYWORDS = [
+    "ADVANTAGE",
+    "DISADVANTAGE",
+    "RECOMMENDATION",
+    "PERSPECTIVE",
+    "ANALYSIS",
+]
+FALLBACK_SECTION = "Competitive Analysis Summary"
+
+SectionCallback = Callable[[str, str], None]
+
+
+def is_section_header(line: str) -> bool:
+    """A markdown heading, or an ALL CAPS line naming one of the summary sections."""
+    return line.startswith("##") or (
+        len(line) > 10
+        and line.isupper()
+        and any(keyword in line for keyword in SECTION_KEYWORDS)
+    )
+
+
+class AISummaryParser:
+    """
+    Assemble summary sections from text that arrives in chunks.
+
+    A section is complete once the next header starts, so on_section is
+    called for each section while the rest is still being generated; the
+    last section is reported by close(). Feeding a whole text and closing
+    gives the same sections as parsing it in one go.
+    """
+
+    def __init__(self, on_section: Optional[SectionCallback] = None):
+        self.on_section = on_section
+        self.reset()
+
+    def reset(self):
+        """Discard everything fed so far (e.g. before a retried stream)."""
+        self.sections: Dict[str, str] = {}
+        self.text_parts: List[str] = []
+        self._partial_line = ""
+        self._current_section: Optional[str] = None
+        self._current_content: List[str] = []
+
+    def feed(self, chunk: str):
+        self.text_parts.append(chunk)
+        lines = (self._partial_line + chunk).split("\n")
+        # The last piece may be an unfinished line
+        self._partial_line = lines.pop()
+        for line in lines:
+            self._add_line(line)
+
+    def close(self) -> Dict[str, str]:
+        """Flush the final section and return all sections in order."""
+        if self._partial_line:
+            self._add_line(self._partial_line)
+            self._partial_line = ""
+        self._finish_section()
+        text = "".join(self.text_parts).strip()
+        if not self.sections and text:
+            self._emit(FALLBACK_SECTION, text)
+        return self.sections
+
+    def _add_line(self, line: str):
+        line = line.strip()
+        if is_section_header(line):
+            self._finish_section()
+            self._current_section = line.lstrip("#").strip()
+            self._current_content = []
+        elif self._current_section and line:
+            self._current_content.append(line)
+
+    def _finish_section(self):
+        if self._current_section and self._current_content:
+            self._emit(self._current_section, "\n".join(self._current_content))
+        self._current_content = []
+
+    def _emit(self, title: str, content: str):
+        self.sections[title] = content
+        if self.on_section is not None:
+            self.on_section(title, content)
+
+
+def parse_ai_summary(ai_summary: str) -> Dict[str, str]:
+    """Split a complete AI summary into {section title: content}."""
+    parser = AISummaryParser()
+    parser.feed(ai_summary)
+    return parser.close()
@@ -1,14 +1,36 @@
 """Flow orchestrators for PDF processing and benchmarking."""
 
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import datetime
+
 from ..config.settings import BUCKET_NAME
+from ..data.analyzers import competitive_analyzer
+from ..data.processors import metrics_processor
+from ..services.benchmark_creation.batch_service import (
+    BATCH_POLL_INTERVAL,
+    BULK_EXTRACTION_MODEL,
+    BULK_EXTRACTION_SITE,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    BatchJob,
+    batch_backend,
+    create_batch_backend,
+    request_hash,
+    request_line,
+)
+from ..services.benchmark_creation.firestore_service import firestore_service
 from ..services.benchmark_creation.gcp_service import gcp_service
-from ..services.benchmark_creation.vision_service import vision_service
 from ..services.benchmark_creation.gemini_service import gemini_service
-from ..services.benchmark_creation.firestore_service import firestore_service
-from ..data.processors import metrics_processor
-from ..data.analyzers import competitive_analyzer
+from ..services.benchmark_creation.vision_service import vision_service
+from ..services.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    sleep_within_deadline,
+)
+from ..services.llm_usage import record_llm_call, usage_scope
 from ..visualizations.charts import chart_generator
 from ..visualizations.comparisons import comparison_visualizer
 from ..visualizations.reports import pdf_report_generator
@@ -20,62 +42,84 @@ class PDFProcessingFlow:
     def __init__(self):
         pass
 
-    def process_pdfs_from_folder(self, folder_path):
-        """Process all PDFs in a folder and store in vector store."""
+    def _list_pdfs(self, folder_path):
+        """PDF files in folder_path, or None if the folder or a service is unavailable."""
+        if not os.path.exists(folder_path):
+            print(f"Error: Folder {folder_path} does not exist")
+            return None
+
+        # Check service availability
+        if not gcp_service.is_available():
+            print("Google Cloud Storage service not available")
+            return None
+
+        if not vision_service.is_available():
+            print("Google Vision API service not available")
+            return None
+
+        if not gemini_service.is_available():
+            print("Gemini AI service not available")
+            return None
+
+        if not firestore_service.is_available():
+            print("Firestore service not available")
+            return None
+
+        # Get all PDF files
+        pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".pdf")]
+
+        if not pdf_files:
+            print("No PDF files found in the folder")
+            return None
+
+        print(f"Found {len(pdf_files)} PDF files to process")
+        return pdf_files
+
+    def _extract_text(self, folder_path, pdf_file):
+        """Upload a PDF to GCS and OCR it with the Vision API."""
+        pdf_path = os.path.join(folder_path, pdf_file)
+
+        # Upload to GCS
+        blob_name = f"pdfs/{pdf_file}"
+        if not gcp_service.upload_file(pdf_path, blob_name):
+            print(f"Failed to upload {pdf_file} to GCS")
+            return None
+
+        # Extract text using Vision API
+        gcs_uri = f"gs://{BUCKET_NAME}/{blob_name}"
+        extracted_text = vision_service.extract_text_from_pdf(gcs_uri)
+
+        if not extracted_text:
+            print(f"Failed to extract text from {pdf_file}")
+            return None
+        return extracted_text
+
+    def process_pdfs_from_folder(self, folder_path, bulk=False):
+        """
+        Process all PDFs in a folder and store in vector store.
+
+        With bulk=True the Gemini extractions run as one offline batch job
+        instead of one interactive call per PDF (see submit_bulk_extraction).
+        """
+        if bulk:
+            job_id = self.submit_bulk_extraction(folder_path)
+            return job_id is not None and self.ingest_bulk_job(job_id)
+
         try:
             print(f"Processing PDFs from folder: {folder_path}")
 
-            if not os.path.exists(folder_path):
-                print(f"Error: Folder {folder_path} does not exist")
-                return False
-
-            # Check service availability
-            if not gcp_service.is_available():
-                print("Google Cloud Storage service not available")
-                return False
-
-            if not vision_service.is_available():
-                print("Google Vision API service not available")
-                return False
-
-            if not gemini_service.is_available():
-                print("Gemini AI service not available")
-                return False
-
-            if not firestore_service.is_available():
-                print("Firestore service not available")
-                return False
-
-            # Get all PDF files
-            pdf_files = [
-                f for f in os.listdir(folder_path) if f.lower().endswith(".pdf")
-            ]
-
+            pdf_files = self._list_pdfs(folder_path)
             if not pdf_files:
-                print("No PDF files found in the folder")
                 return False
 
-            print(f"Found {len(pdf_files)} PDF files to process")
-
             successful_count = 0
 
             for pdf_file in pdf_files:
                 try:
-                    pdf_path = os.path.join(folder_path, pdf_file)
                     print(f"\nProcessing: {pdf_file}")
 
-                    # Upload to GCS
-                    blob_name = f"pdfs/{pdf_file}"
-                    if not gcp_service.upload_file(pdf_path, blob_name):
-                        print(f"Failed to upload {pdf_file} to GCS")
-                        continue
-
-                    # Extract text using Vision API
-                    gcs_uri = f"gs://{BUCKET_NAME}/{blob_name}"
-                    extracted_text = vision_service.extract_text_from_pdf(gcs_uri)
-
+                    extracted_text = self._extract_text(folder_path, pdf_file)
                     if not extracted_text:
-                        print(f"Failed to extract text from {pdf_file}")
                         continue
 
                     # Extract structured data using Gemini
@@ -88,16 +132,11 @@ class PDFProcessingFlow:
                         continue
 
                     # Store in Firestore
-                    stored_doc_id = firestore_service.store_memo(
-                        structured_data, pdf_file
-                    )
-
-                    if stored_doc_id:
-                        print(f"Successfully processed and stored: {pdf_file}")
+                    if self._store(structured_data, pdf_file):
                         successful_count += 1
-                    else:
-                        print(f"Failed to store {pdf_file} in Firestore")
 
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
                     print(f"Error processing {pdf_file}: {e}")
                     continue
@@ -107,10 +146,167 @@ class PDFProcessingFlow:
             )
             return successful_count > 0
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error in PDF processing flow: {e}")
             return False
 
+    def _store(self, structured_data, pdf_file):
+        stored_doc_id = firestore_service.store_memo(structured_data, pdf_file)
+        if stored_doc_id:
+            print(f"Successfully processed and stored: {pdf_file}")
+            return True
+        print(f"Failed to store {pdf_file} in Firestore")
+        return False
+
+    def submit_bulk_extraction(self, folder_path, backend=None):
+        """
+        OCR every PDF in a folder and submit their extractions as one batch job.
+
+        The requests are written to a JSONL job file and run by the batch
+        backend, away from the interactive rate limits. Returns the job id
+        to pass to ingest_bulk_job, or None if nothing was submitted.
+        """
+        backend = backend or batch_backend
+        try:
+            print(f"Preparing bulk extraction for folder: {folder_path}")
+
+            pdf_files = self._list_pdfs(folder_path)
+            if not pdf_files:
+                return None
+            if not gemini_service.extraction_available():
+                return None
+
+            # Nothing is written until every request is prepared, so a failure
+            # never leaves a partial job behind
+            job = BatchJob.create(backend.name, BULK_EXTRACTION_MODEL)
+            lines = []
+            for pdf_file in pdf_files:
+                try:
+                    print(f"\nExtracting text: {pdf_file}")
+                    extracted_text = self._extract_text(folder_path, pdf_file)
+                    if not extracted_text:
+                        continue
+                    prompt = gemini_service.build_extraction_prompt(extracted_text)
+                    if prompt is None:
+                        return None
+                    line = request_line(pdf_file, prompt)
+                    job.entries[pdf_file] = {
+                        "filename": pdf_file,
+                        # Enough to rebuild the metadata snippet
+                        "text_snippet": extracted_text[:201],
+                        "request_hash": request_hash(line["request"]),
+                    }
+                    lines.append(line)
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    print(f"Error preparing {pdf_file}: {e}")
+                    continue
+
+            if not job.entries:
+                print("No PDFs could be prepared for bulk extraction")
+                return None
+
+            os.makedirs(job.job_dir, exist_ok=True)
+            with open(job.requests_path, "w") as job_file:
+                for line in lines:
+                    job_file.write(json.dumps(line) + "\n")
+            backend.submit(job)
+            job.save()
+            print(
+                f"Submitted bulk extraction job {job.job_id} "
+                f"({len(job.entries)} of {len(pdf_files)} PDFs) to {backend.name}"
+            )
+            return job.job_id
+
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Error submitting bulk extraction: {e}")
+            return None
+
+    def ingest_bulk_job(
+        self,
+        job_id,
+        wait=True,
+        poll_interval=BATCH_POLL_INTERVAL,
+        allow_offline=False,
+    ):
+        """
+        Store the structured data from a finished bulk extraction job.
+
+        With wait=True the job is polled until it ends; otherwise a job that
+        is still running returns False and can be ingested later. A job is
+        ingested once; a job answered offline by the local backend holds
+        placeholder outputs and is only stored with allow_offline=True.
+        """
+        try:
+            job = BatchJob.load(job_id)
+            if job.ingested:
+                print(f"Bulk extraction job {job_id} was already ingested")
+                return False
+            backend = create_batch_backend(job.backend)
+
+            while backend.refresh(job) == JOB_RUNNING:
+                if not wait:
+                    print(f"Bulk extraction job {job_id} is still running")
+                    job.save()
+                    return False
+                sleep_within_deadline(poll_interval)
+            job.save()
+
+            if job.state != JOB_SUCCEEDED:
+                print(f"Bulk extraction job {job_id} {job.state}")
+                return False
+            if job.offline and not allow_offline:
+                print(
+                    f"Bulk extraction job {job_id} was answered offline; "
+                    "not storing its placeholder results"
+                )
+                return False
+
+            successful_count = 0
+            failed = []
+            with usage_scope(site=BULK_EXTRACTION_SITE):
+                for result in backend.results(job):
+                    entry = job.entries[result.key]
+                    pdf_file = entry["filename"]
+                    if result.usage:
+                        record_llm_call(job.model, **result.usage)
+                    if result.error:
+                        print(f"Bulk extraction failed for {pdf_file}: {result.error}")
+                        failed.append(pdf_file)
+                        continue
+                    try:
+                        structured_data = gemini_service.parse_structured_response(
+                            result.text, entry["text_snippet"], pdf_file
+                        )
+                    except json.JSONDecodeError as e:
+                        print(f"Error parsing JSON for {pdf_file}: {e}")
+                        failed.append(pdf_file)
+                        continue
+                    if self._store(structured_data, pdf_file):
+                        successful_count += 1
+                    else:
+                        failed.append(pdf_file)
+
+            job.ingested = True
+            job.save()
+            if failed:
+                print(f"Failed PDFs: {', '.join(failed)}")
+            print(
+                f"\nBulk ingestion complete. Successfully processed {successful_count} out of {len(job.entries)} PDFs"
+            )
+            return successful_count > 0
+
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Error ingesting bulk extraction job {job_id}: {e}")
+            return False
+
 
 class BenchmarkingFlow:
     """Orchestrator for benchmarking analysis flow."""
@@ -118,8 +314,17 @@ class BenchmarkingFlow:
     def __init__(self):
         pass
 
-    def create_benchmark_analysis(self, memo_text, output_dir="benchmark_output"):
-        """Create benchmark analysis from memo text."""
+    def create_benchmark_analysis(
+        self, memo_text, output_dir="benchmark_output", on_summary_section=None
+    ):
+        """
+        Create benchmark analysis from memo text.
+
+        The AI competitive summary is written while the charts render. With
+        on_summary_section, it is streamed and on_summary_section(title,
+        content) is called as each of its sections arrives.
+        """
+        summary_executor = ThreadPoolExecutor(max_workers=1)
         try:
             print("Starting benchmark analysis...")
 
@@ -190,17 +395,36 @@ class BenchmarkingFlow:
                 comparison_df, " > ".join(sector_hierarchy)
             )
 
-            # Generate visualizations
+            # Generate AI-powered competitive summary in the background
+            print("Generating AI competitive summary...")
+
+            # Only stream when someone consumes the sections: streams are not
+            # coalesced, while the plain call is shared with identical requests
+            on_section = None
+            if on_summary_section is not None:
+
+                def on_section(title, content):
+                    print(f"AI summary section ready: {title}")
+                    on_summary_section(title, content)
+
+            # The worker keeps this request's deadline and usage tags
+            summary_future = summary_executor.submit(
+                copy_context().run,
+                gemini_service.generate_competitive_summary,
+                target_company_data,
+                competitor_companies,
+                insights,
+                benchmarks,
+                on_section=on_section,
+            )
+
+            # Generate visualizations while the summary is being written
             print("Creating visualizations...")
             chart_paths = self._generate_all_charts(
                 comparison_df, target_company_data, competitor_companies, output_dir
             )
 
-            # Generate AI-powered competitive summary
-            print("Generating AI competitive summary...")
-            competitive_summary = gemini_service.generate_competitive_summary(
-                target_company_data, competitor_companies, insights, benchmarks
-            )
+            competitive_summary = summary_future.result()
 
             # Add summary to insights
             if competitive_summary:
@@ -210,6 +434,7 @@ class BenchmarkingFlow:
                 print("⚠️ AI competitive summary generation failed")
 
             # Create PDF report
+            check_deadline()
             print("Generating PDF report...")
             company_name = target_company_data.get("company_overview", {}).get(
                 "name", "target_company"
@@ -228,9 +453,14 @@ class BenchmarkingFlow:
                 print("Failed to create PDF report")
                 return None  # Return None instead of False
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error in benchmarking flow: {e}")
             return None  # Return None instead of False
+        finally:
+            # An abandoned request does not wait for the summary
+            summary_executor.shutdown(wait=False, cancel_futures=True)
 
     def _generate_all_charts(
         self, comparison_df, target_data, competitor_data, output_dir
@@ -245,6 +475,7 @@ class BenchmarkingFlow:
 
         # Radar chart
         radar_path = os.path.join(output_dir, "radar_chart.png")
+        check_deadline()
         try:
             if chart_generator.create_radar_chart(
                 comparison_df, target_company_name, radar_path
@@ -258,6 +489,7 @@ class BenchmarkingFlow:
 
         # Heatmap
         heatmap_path = os.path.join(output_dir, "performance_heatmap.png")
+        check_deadline()
         try:
             if chart_generator.create_heatmap(comparison_df, heatmap_path):
                 chart_paths["performance_heatmap"] = heatmap_path
@@ -269,6 +501,7 @@ class BenchmarkingFlow:
 
         # Bubble chart
         bubble_path = os.path.join(output_dir, "bubble_chart.png")
+        check_deadline()
         try:
             if chart_generator.create_bubble_chart(
                 comparison_df, target_company_name, bubble_path
@@ -282,6 +515,7 @@ class BenchmarkingFlow:
 
         # Quadrant analysis
         quadrant_path = os.path.join(output_dir, "quadrant_analysis.png")
+        check_deadline()
         try:
             if chart_generator.create_quadrant_analysis(
                 comparison_df, target_company_name, quadrant_path
@@ -295,6 +529,7 @@ class BenchmarkingFlow:
 
         # Distribution plots
         distribution_path = os.path.join(output_dir, "distribution_plots.png")
+        check_deadline()
         try:
             if chart_generator.create_distribution_plots(
                 comparison_df, target_company_name, distribution_path
@@ -308,6 +543,7 @@ class BenchmarkingFlow:
 
         # Scorecard
         scorecard_path = os.path.join(output_dir, "performance_scorecard.png")
+        check_deadline()
         try:
             benchmarks = competitive_analyzer.get_sector_benchmarks(
                 comparison_df,
@@ -327,6 +563,7 @@ class BenchmarkingFlow:
 
         # Fundraise analysis
         fundraise_path = os.path.join(output_dir, "fundraise_analysis.png")
+        check_deadline()
         try:
             if comparison_visualizer.create_fundraise_analysis(
                 target_data, competitor_data, fundraise_path
@@ -340,6 +577,7 @@ class BenchmarkingFlow:
 
         # Traction comparison
         traction_path = os.path.join(output_dir, "traction_comparison.png")
+        check_deadline()
         try:
             if comparison_visualizer.create_traction_comparison(
                 target_data, competitor_data, traction_path
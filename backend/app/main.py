@@ -1,11 +1,21 @@
 # main.py
+import asyncio
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Import your router
-from .router import rag_file_upload, generate_deal_note, generate_benchmark
+from .router import (
+    rag_file_upload,
+    generate_deal_note,
+    generate_benchmark,
+    portfolio_query,
+)
 from .vertex_config import init_vertex
+from .services.rag_agent.deal_note_agent import get_comprehensive_agent
+from .services.deadline import ClientDisconnected, DeadlineExceeded
 
 app = FastAPI(title="Async File Processor API", version="1.0.0")
 
@@ -21,11 +31,21 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     init_vertex()
+    # Build the shared deal-note agent now so the first memo skips construction
+    await asyncio.to_thread(get_comprehensive_agent)
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    # 499 is the conventional "client closed request" status
+    status_code = 499 if isinstance(exc, ClientDisconnected) else 504
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
 
 
 app.include_router(rag_file_upload.router, prefix="/api", tags=["Upload"])
 app.include_router(generate_deal_note.router, prefix="/api", tags=["Generate"])
 app.include_router(generate_benchmark.router, prefix="/api", tags=["Benchmark"])
+app.include_router(portfolio_query.router, prefix="/api", tags=["Portfolio"])
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,7 @@
 import asyncio
 import io
 import os
+import time
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor
 
@@ -8,7 +9,8 @@ import pymupdf  # PyMuPDF
 from fastapi import BackgroundTasks, UploadFile
 from PIL import Image
 from ..prompts.multimodal_extraction_prompt import MULTIMODAL_EXTRACTION_PROMPT
-from ..services.gemini_api import call_gemini_api
+from ..services.gemini_api import acall_gemini_api, gemini_call_stats
+from ..services.model_cascade import complete_markdown, get_cascade, not_empty
 from ..storage.store_raw_pitch import save_file
 from ..utils.gcs_utils import upload_images_to_gcs, upload_raw_pitch_async
 from vertexai.preview.generative_models import Image as GeminiImage
@@ -16,6 +18,14 @@ from vertexai.preview.generative_models import Image as GeminiImage
 from .base import FileProcessor
 
 DPI = 200
+# Pages extracted at once; each waits on the async client, not a thread
+PAGE_CONCURRENCY = 8
+# Pages go to the cheap model; empty or truncated output is redone on flash
+PAGE_EXTRACTION_CASCADE = get_cascade(
+    "page_extraction",
+    ["gemini-2.5-flash-lite", "gemini-2.5-flash"],
+    [not_empty, complete_markdown],
+)
 
 
 class PDFProcessor(FileProcessor):
@@ -32,13 +42,25 @@ class PDFProcessor(FileProcessor):
             pdf_path, file_name, DPI
         )
 
-        # Run Gemini API calls **sequentially** (one by one)
-        pdf_data = []
-        for img, page_num in zip(pages, page_numbers):
-            page_result = await self.extract_data_from_page(
-                img, file_name, page_num, pdf_path
+        # Run Gemini API calls concurrently, bounded by PAGE_CONCURRENCY
+        semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+        async def extract(img, page_num):
+            async with semaphore:
+                return await self.extract_data_from_page(
+                    img, file_name, page_num, pdf_path
+                )
+
+        extraction_start = time.time()
+        pdf_data = list(
+            await asyncio.gather(
+                *(extract(img, page_num) for img, page_num in zip(pages, page_numbers))
             )
-            pdf_data.append(page_result)
+        )
+        print(
+            f"Extracted {len(pdf_data)} pages in "
+            f"{time.time() - extraction_start:.2f}s ({gemini_call_stats()})"
+        )
 
         # Background uploads
         background_tasks.add_task(upload_raw_pitch_async, file_name, pdf_data)
@@ -67,11 +89,16 @@ class PDFProcessor(FileProcessor):
             return img, page_number + 1
 
         loop = asyncio.get_running_loop()
-        with ThreadPoolExecutor() as executor:
+        executor = ThreadPoolExecutor()
+        try:
             tasks = [
                 loop.run_in_executor(executor, render_page, i) for i in range(len(doc))
             ]
             results = await asyncio.gather(*tasks)
+        finally:
+            # If the request is abandoned, drop pages not yet rendered rather
+            # than blocking the event loop until they finish
+            executor.shutdown(wait=False, cancel_futures=True)
 
         for img, page_number in results:
             images.append(img)
@@ -80,7 +107,7 @@ class PDFProcessor(FileProcessor):
         return images, page_numbers
 
     async def extract_data_from_page(self, image, app_name, page_number, pdf_path):
-        """Call Gemini API for a single page sequentially with delay."""
+        """Call Gemini API for a single page."""
         print(f"Processing {os.path.basename(pdf_path)} - Page {page_number}...")
 
         buf = io.BytesIO()
@@ -90,11 +117,13 @@ class PDFProcessor(FileProcessor):
         prompt = MULTIMODAL_EXTRACTION_PROMPT.format(app_name=app_name)
         content = [prompt, gemini_img]
 
-        # Call Gemini API in thread to avoid blocking event loop
-        parsed_result = await asyncio.to_thread(
-            call_gemini_api,
-            model_name="gemini-2.5-flash-lite",
-            content=content,
+        # Page extraction is idempotent, so slow calls may be hedged
+        parsed_result = await PAGE_EXTRACTION_CASCADE.arun(
+            lambda model_name: acall_gemini_api(
+                model_name=model_name,
+                content=content,
+                hedge=True,
+            )
         )
 
         return parsed_result
@@ -1,3 +1,6 @@
+# Bump when the prompt changes so memoized memos are regenerated
+COMPREHENSIVE_DEAL_NOTE_PROMPT_VERSION = "1"
+
 COMPREHENSIVE_DEAL_NOTE_PROMPT = """You are a comprehensive investment analyst conducting detailed pitch deck analysis across 12 critical areas.
 
 AVAILABLE TOOLS:
@@ -0,0 +1,27 @@
+PORTFOLIO_QUERY_PROMPT = """You are an investment analyst answering a question across a portfolio of pitch decks.
+
+QUESTION: {question}
+
+EVIDENCE, GROUPED BY COMPANY:
+{evidence}
+
+INSTRUCTIONS:
+- Answer the question in Markdown, starting with a direct answer (e.g. the list of matching companies).
+- Then give one bullet per company with the specific figures that support the answer, citing sources (e.g., "[Acme, Source 2]").
+- Only use explicitly stated information. If a company's evidence does not address the question, say "Not reported".
+- Do NOT infer or estimate numbers that are not in the evidence.
+"""
+
+PORTFOLIO_MERGE_PROMPT = """You are an investment analyst answering a question across a portfolio of pitch decks.
+The portfolio was too large for one pass, so each answer below covers a different group of companies.
+
+QUESTION: {question}
+
+PARTIAL ANSWERS:
+{partial_answers}
+
+INSTRUCTIONS:
+- Combine the partial answers into one Markdown answer, starting with a direct answer covering all companies.
+- Keep every company's bullet and its citations (e.g., "[Acme, Source 2]") as written.
+- Do NOT add figures or companies that are not in the partial answers.
+"""
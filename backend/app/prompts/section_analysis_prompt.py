@@ -0,0 +1,35 @@
+# Bump when a prompt changes so memoized sections are regenerated
+SECTION_PROMPT_VERSION = "1"
+SYNTHESIS_PROMPT_VERSION = "1"
+
+SECTION_ANALYSIS_PROMPT = """You are an investment analyst writing one section of an investment memo for {company_name}.
+
+SECTION: {section_title}
+FOCUS: {section_focus}
+
+EVIDENCE FROM THE PITCH DECK:
+{evidence}
+
+INSTRUCTIONS:
+- Write the body of the "{section_title}" section in Markdown.
+- Do NOT add the section header; it will be added for you. Use "###" for sub-headings if needed.
+- Use bullet points for key findings and include specific metrics and numbers where available.
+- Attribute important claims to their sources (e.g., "[Source 2]").
+- Only use explicitly stated information. Do NOT infer or assume anything not directly mentioned.
+- If the evidence contains nothing relevant, reply with exactly: No specific information available.
+"""
+
+DEAL_NOTE_SYNTHESIS_PROMPT = """You are a senior investment analyst assembling the final investment memo for {company_name}.
+
+Below are the drafted sections of the memo, in order:
+
+{section_analyses}
+
+INSTRUCTIONS:
+- Start with a short "## EXECUTIVE SUMMARY" (4-6 bullet points) drawn only from the drafted sections.
+- Then reproduce every drafted section in the same order, each under a header formatted exactly as "## <SECTION TITLE IN CAPITALS>".
+- Keep all specific details, metrics and source attributions. Remove repetition across sections and tighten the wording.
+- Keep "No specific information available" for sections without evidence.
+- Do NOT add information that is not present in the drafted sections.
+- Output Markdown only.
+"""
@@ -1,7 +1,8 @@
 import argparse
+import asyncio
 import sys
 import os
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
@@ -10,6 +11,9 @@ from ..services.benchmark_creation.vision_service import (
                         vision_service,
                     )
 from ..services.benchmark_creation.gcp_service import gcp_service
+from ..services.deadline import DeadlineExceeded, RequestDeadline, run_request
+from ..services.llm_usage import usage_scope
+from ..constants import REQUEST_DEADLINE_SECONDS
 
 router = APIRouter()
 
@@ -28,8 +32,12 @@ def _import_benchmarking_flow():
 
 
 @router.post("/benchmark/")
-async def benchmark_mode(file: UploadFile = File(...), output_dir: str = "output"):
+async def benchmark_mode(
+    request: Request, file: UploadFile = File(...), output_dir: str = "output"
+):
     """Execute benchmarking mode with uploaded file and return PDF content."""
+    # One deadline covers both the OCR and the benchmarking flow
+    deadline = RequestDeadline(REQUEST_DEADLINE_SECONDS)
     temp_file_path = None
     pdf_path = None
     try:
@@ -92,7 +100,13 @@ async def benchmark_mode(file: UploadFile = File(...), output_dir: str = "output
                 
                 # Extract text from GCS URI
                 gcs_uri = f"gs://{gcp_service.bucket_name}/{blob_name}"
-                memo_text = vision_service.extract_text_from_pdf(gcs_uri)
+                # Blocking OCR runs in a worker thread so a client disconnect
+                # or the request deadline can cancel it
+                memo_text = await run_request(
+                    request,
+                    asyncio.to_thread(vision_service.extract_text_from_pdf, gcs_uri),
+                    deadline.remaining(),
+                )
                 if not memo_text:
                     # Clean up temp file
                     if temp_file_path and os.path.exists(temp_file_path):
@@ -114,6 +128,8 @@ async def benchmark_mode(file: UploadFile = File(...), output_dir: str = "output
                     status_code=422,
                     detail=error_msg
                 )
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             # Clean up temp file
             if temp_file_path and os.path.exists(temp_file_path):
@@ -138,7 +154,14 @@ async def benchmark_mode(file: UploadFile = File(...), output_dir: str = "output
         
         # Execute benchmarking flow
         benchmarking_flow = _import_benchmarking_flow()
-        pdf_path = benchmarking_flow.create_benchmark_analysis(memo_text, output_dir)
+        with usage_scope():
+            pdf_path = await run_request(
+                request,
+                asyncio.to_thread(
+                    benchmarking_flow.create_benchmark_analysis, memo_text, output_dir
+                ),
+                deadline.remaining(),
+            )
         
         # Clean up temp file
         if temp_file_path and os.path.exists(temp_file_path):
@@ -164,6 +187,11 @@ async def benchmark_mode(file: UploadFile = File(...), output_dir: str = "output
             print("❌ Benchmark analysis failed")
             raise HTTPException(status_code=500, detail="Benchmark analysis failed to generate PDF")
         
+    except DeadlineExceeded:
+        # Clean up temp file
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
     except Exception as e:
         # Clean up temp file
         if temp_file_path and os.path.exists(temp_file_path):
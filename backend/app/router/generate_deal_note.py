@@ -1,16 +1,122 @@
-from fastapi import APIRouter
-from ..services.rag_agent.execute_deal_note_agent import generate_full_investment_report
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from ..services.rag_agent.execute_deal_note_agent import (
+    ENGINE_MODES,
+    benchmark_engines,
+    generate_full_investment_report,
+    generate_preview_report,
+)
+from ..services.rag_agent.section_engine import analyze_sections_parallel
+from ..services.rag_agent.section_tools import SECTION_TOOLS, get_section_tools
 from ..services.rag_agent.rag_config.rag_registry import rag_registry
+from ..services.rag_agent.rag_config.rag_cache import retrieval_cache
+from ..services.rag_agent.adaptive_top_k import adaptive_top_k
+from ..services.rag_agent.tools.base_tool import aretrieval_flights, retrieval_flights
+from ..storage.deck_registry import DeckRecord, deck_registry
+from ..services.model_cascade import cascade_stats
+from ..services.llm_usage import usage_scope
+from ..storage.usage_ledger import usage_ledger
+from ..services.deadline import (
+    DeadlineExceeded,
+    abandon,
+    deadline_stats,
+    run_request,
+    start_request_task,
+)
+from ..constants import REQUEST_DEADLINE_SECONDS
+from ..storage.llm_cache import llm_cache
+from ..storage.section_cache import section_cache
 from ..generate_deal_note_pdf import create_investment_memo_pdf
 from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 
 
+def resolve_deck(deck_id: Optional[str] = None) -> DeckRecord:
+    """Look up the requested deck, or the most recent upload when none is given"""
+    deck_id = deck_id or rag_registry.get_optional("deck_id")
+    deck = deck_registry.get_optional(deck_id) if deck_id else None
+    if deck is None:
+        raise HTTPException(status_code=404, detail=f"Unknown deck: {deck_id}")
+    return deck
+
+
 @router.post("/generate_memo/")
-async def generate_deal_note():
-    company_name = rag_registry.get("company_name")
-    response = await generate_full_investment_report(company_name)
+async def generate_deal_note(
+    request: Request, engine: Optional[str] = None, deck_id: Optional[str] = None
+):
+    if engine is not None and engine not in ENGINE_MODES:
+        raise HTTPException(status_code=422, detail=f"Unknown engine: {engine}")
+    deck = await asyncio.to_thread(resolve_deck, deck_id)
+    company_name = deck.company_name
+
+    async def build_memo():
+        response = await generate_full_investment_report(
+            company_name,
+            corpus_name=deck.corpus_name,
+            engine=engine,
+            deck_id=deck.deck_id,
+        )
+        return await create_investment_memo_pdf(
+            markdown_content=response["comprehensive_analysis"],
+            company_name=company_name,
+        )
+
+    # Abandoned as soon as the client disconnects or the deadline passes
+    with usage_scope(deck_id=deck.deck_id):
+        pdf_buffer = await run_request(request, build_memo(), REQUEST_DEADLINE_SECONDS)
+    return StreamingResponse(
+        pdf_buffer,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"inline; filename={company_name}_deal_note.pdf"
+        },
+    )
+
+
+@router.post("/generate_memo/preview/")
+async def generate_preview_deal_note(
+    request: Request,
+    deck_id: Optional[str] = None,
+    sections: Optional[str] = None,
+    format: str = "pdf",
+):
+    """Fast triage memo; `sections` is a comma-separated subset of section names"""
+    if format not in ("pdf", "markdown"):
+        raise HTTPException(status_code=422, detail=f"Unknown format: {format}")
+    section_names = None
+    if sections:
+        section_names = [name.strip() for name in sections.split(",")]
+        try:
+            get_section_tools(section_names)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    deck = await asyncio.to_thread(resolve_deck, deck_id)
+    company_name = deck.company_name
+    with usage_scope(deck_id=deck.deck_id):
+        response = await run_request(
+            request,
+            generate_preview_report(
+                company_name,
+                corpus_name=deck.corpus_name,
+                deck_id=deck.deck_id,
+                section_names=section_names,
+            ),
+            REQUEST_DEADLINE_SECONDS,
+        )
+    if response.get("error"):
+        raise HTTPException(status_code=500, detail=response["error"])
+    if format == "markdown":
+        return {
+            "deck_id": deck.deck_id,
+            "markdown": response["comprehensive_analysis"],
+            "sections_analyzed": response["sections_analyzed"],
+            "execution_time": response["execution_time"],
+        }
     pdf_buffer = await create_investment_memo_pdf(
         markdown_content=response["comprehensive_analysis"],
         company_name=company_name,
@@ -18,7 +124,167 @@ async def generate_deal_note():
     return StreamingResponse(
         pdf_buffer,
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"inline; filename={company_name}_deal_note.pdf"
-        },
+        headers={"Content-Disposition": f"inline; filename={company_name}_preview.pdf"},
+    )
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/generate_memo/stream/")
+async def stream_deal_note(deck_id: Optional[str] = None):
+    """Stream deal-note sections as server-sent events as soon as each one is ready"""
+    deck = await asyncio.to_thread(resolve_deck, deck_id)
+    total = len(SECTION_TOOLS)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_section(result: Dict[str, Any]):
+        await queue.put(result)
+
+    async def event_stream():
+        start_time = time.time()
+        with usage_scope(deck_id=deck.deck_id):
+            task, deadline = start_request_task(
+                analyze_sections_parallel(
+                    deck.company_name,
+                    corpus_name=deck.corpus_name,
+                    on_section=on_section,
+                    deck_id=deck.deck_id,
+                ),
+                REQUEST_DEADLINE_SECONDS,
+            )
+        completed = 0
+        try:
+            yield sse_event("progress", {"completed": 0, "total": total})
+            while completed < total:
+                getter = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(
+                    {getter, task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter not in done:
+                    # The engine finished (or failed) without reporting every section
+                    getter.cancel()
+                    break
+                result = getter.result()
+                completed += 1
+                yield sse_event(
+                    "section",
+                    {
+                        "section": result["section"],
+                        "title": result["title"],
+                        "markdown": result["markdown"],
+                        "execution_time": result.get("execution_time", 0.0),
+                        "cached": result.get("cached"),
+                        "elapsed": round(time.time() - start_time, 2),
+                    },
+                )
+                yield sse_event("progress", {"completed": completed, "total": total})
+
+            try:
+                response = await task
+            except DeadlineExceeded as e:
+                yield sse_event("error", {"detail": str(e)})
+                return
+            if response.get("error"):
+                yield sse_event("error", {"detail": response["error"]})
+                return
+            yield sse_event(
+                "done",
+                {
+                    "comprehensive_analysis": response["comprehensive_analysis"],
+                    "execution_time": response["execution_time"],
+                    "synthesis_time": response["synthesis_time"],
+                    "elapsed": round(time.time() - start_time, 2),
+                },
+            )
+        finally:
+            # Stop generating if the client disconnects mid-stream
+            if not task.done():
+                abandon(task, deadline, "client disconnected")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@router.post("/generate_memo/benchmark/")
+async def benchmark_deal_note_engines(request: Request, deck_id: Optional[str] = None):
+    deck = await asyncio.to_thread(resolve_deck, deck_id)
+    with usage_scope(deck_id=deck.deck_id):
+        return await run_request(
+            request,
+            benchmark_engines(
+                deck.company_name, corpus_name=deck.corpus_name, deck_id=deck.deck_id
+            ),
+            REQUEST_DEADLINE_SECONDS,
+        )
+
+
+@router.get("/rag_cache/stats/")
+async def rag_cache_stats():
+    return {
+        **retrieval_cache.stats(),
+        "coalesced": retrieval_flights.coalesced + aretrieval_flights.coalesced,
+        "adaptive_top_k": adaptive_top_k.stats(),
+    }
+
+
+@router.get("/section_cache/stats/")
+async def section_cache_stats():
+    return section_cache.stats()
+
+
+@router.get("/llm_cache/stats/")
+async def llm_cache_stats():
+    return await asyncio.to_thread(llm_cache.stats)
+
+
+@router.get("/llm_usage/")
+async def llm_usage(
+    group_by: str = "site",
+    deck_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    since: Optional[float] = None,
+):
+    """Tokens, latency, retries and estimated cost per call site, model, deck or request"""
+    try:
+        summary = await asyncio.to_thread(
+            usage_ledger.summary, group_by, deck_id, request_id, since
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "group_by": group_by,
+        "total_cost_usd": round(sum(row["estimated_cost_usd"] for row in summary), 6),
+        "rows": summary,
+    }
+
+
+@router.get("/llm_usage/export/")
+async def export_llm_usage(
+    deck_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    since: Optional[float] = None,
+):
+    """Raw usage ledger rows as JSONL"""
+    lines = await asyncio.to_thread(
+        lambda: list(usage_ledger.export(deck_id, request_id, since))
+    )
+    return StreamingResponse(
+        iter(lines),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=llm_usage.jsonl"},
+    )
+
+
+@router.get("/llm_routing/stats/")
+async def llm_routing_stats():
+    return cascade_stats()
+
+
+@router.get("/deadlines/stats/")
+async def request_deadline_stats():
+    return deadline_stats()
@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from ..services.rag_agent.portfolio_query import portfolio_query
+
+router = APIRouter()
+
+
+class PortfolioQueryRequest(BaseModel):
+    question: str
+    # All registered decks when omitted
+    deck_ids: Optional[List[str]] = None
+    # Query one corpus holding many decks instead of each deck's own corpus
+    shared_corpus: Optional[str] = None
+    top_k: Optional[int] = None
+    answer: bool = True
+
+
+@router.post("/portfolio_query/")
+async def query_portfolio(request: PortfolioQueryRequest):
+    try:
+        return await portfolio_query(
+            request.question,
+            deck_ids=request.deck_ids,
+            shared_corpus=request.shared_corpus,
+            top_k=request.top_k,
+            answer=request.answer,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,37 +1,97 @@
+import asyncio
 import os
+from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, UploadFile
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, UploadFile
+
+from ..constants import GCS_BUCKET, REQUEST_DEADLINE_SECONDS
 from ..processors.factory import ProcessorFactory
+from ..services.deadline import run_request
+from ..services.llm_usage import usage_scope
+from ..services.rag_agent.rag_config.rag_cache import retrieval_cache
+from ..services.rag_agent.rag_config.rag_models_config import rag_model_config
+from ..services.rag_agent.rag_config.rag_registry import rag_registry
+from ..services.rag_agent.section_engine import precompute_sections
 from ..services.vector_indexing.chunking import chunk_markdown_slides
 from ..services.vector_indexing.create_corpus import upload_to_rag_corpus
 from ..services.vector_indexing.upload_to_gcs import upload_file_to_gcs
-from ..services.rag_agent.rag_config.rag_registry import rag_registry
-from ..constants import GCS_BUCKET
+from ..storage.chunk_store import chunk_store
+from ..storage.deck_registry import deck_registry
 
 router = APIRouter()
 
 
 @router.post("/upload/")
-async def upload_rag_data(file: UploadFile, background_tasks: BackgroundTasks):
-    processor = ProcessorFactory.get_processor(file)
+async def upload_rag_data(
+    request: Request,
+    file: UploadFile,
+    background_tasks: BackgroundTasks,
+    deck_id: Optional[str] = None,
+    precompute: Optional[bool] = None,
+):
+    if deck_id is not None and not deck_registry.is_valid_deck_id(deck_id):
+        raise HTTPException(
+            status_code=422,
+            detail="deck_id may only contain letters, digits, '-' and '_'",
+        )
+    if not file.filename:
+        raise HTTPException(status_code=422, detail="The uploaded file has no name")
     filename = os.path.splitext(file.filename)[0]
-    raw_pitch_contents = await processor.process(
-        file=file, background_tasks=background_tasks, file_name=filename
-    )
-    chunks = await chunk_markdown_slides(md_slides=raw_pitch_contents, doc_id=filename)
-    await upload_file_to_gcs(
-        chunks,
-        GCS_BUCKET,
-        f"{filename}.jsonl",
-        f"{filename}/{filename}.jsonl",
+    # Every upload is stored under its own deck id so concurrent uploads of
+    # the same file never overwrite each other's chunks, files or corpus
+    deck_id = deck_id or deck_registry.new_deck_id(filename)
+    previous_deck = deck_registry.get_optional(deck_id)
+    processor = ProcessorFactory.get_processor(file)
+
+    async def ingest() -> str:
+        raw_pitch_contents = await processor.process(
+            file=file, background_tasks=background_tasks, file_name=deck_id
+        )
+        chunks = await chunk_markdown_slides(
+            md_slides=raw_pitch_contents, doc_id=deck_id
+        )
+        await asyncio.to_thread(chunk_store.save_chunks, deck_id, chunks)
+        await upload_file_to_gcs(
+            chunks,
+            GCS_BUCKET,
+            f"{deck_id}.jsonl",
+            f"{deck_id}/{deck_id}.jsonl",
+        )
+        return await upload_to_rag_corpus(
+            display_name=filename, file_name=f"{deck_id}.jsonl"
+        )
+
+    # Page extraction stops if the uploader goes away; the deck is only
+    # registered once ingestion has finished
+    with usage_scope(deck_id=deck_id):
+        rag_corpus_name = await run_request(request, ingest(), REQUEST_DEADLINE_SECONDS)
+    previous_corpus = previous_deck.corpus_name if previous_deck else None
+    if previous_corpus and previous_corpus != rag_corpus_name:
+        retrieval_cache.invalidate_corpus(previous_corpus)
+    deck = await asyncio.to_thread(
+        deck_registry.register, deck_id, filename, rag_corpus_name
     )
+    # Endpoints called without a deck id fall back to the latest upload
+    rag_registry.set("deck_id", deck_id)
     rag_registry.set("company_name", filename)
-    rag_corpus_name = await upload_to_rag_corpus(
-        display_name=filename, file_name=f"{filename}.jsonl"
-    )
     rag_registry.set("corpus_name", rag_corpus_name)
 
+    if precompute is None:
+        precompute = rag_model_config.precompute_sections
+    if precompute:
+        background_tasks.add_task(
+            precompute_sections, filename, rag_corpus_name, deck_id
+        )
+
     return {
         "message": "File uploaded and processing completed",
         "file": file.filename,
+        "deck_id": deck.deck_id,
+        "precompute_sections": precompute,
     }
+
+
+@router.get("/decks/")
+async def list_decks():
+    decks = await asyncio.to_thread(deck_registry.list)
+    return [deck.to_dict() for deck in decks]
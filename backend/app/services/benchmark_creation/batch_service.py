@@ -0,0 +1,336 @@
+"""Batch prediction jobs for offline bulk extraction."""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterator, Optional
+
+from ...constants import BATCH_BACKEND, BATCH_LOCAL_LIVE
+from ...storage.store_raw_pitch import BASE_UPLOAD_DIR
+from ..llm_usage import usage_scope
+
+BATCH_JOBS_DIR = os.path.join(BASE_UPLOAD_DIR, "batch_jobs")
+# Bulk jobs skip the cascade, so they go straight to the stronger model
+BULK_EXTRACTION_MODEL = "gemini-2.5-flash"
+BULK_EXTRACTION_SITE = "bulk_extraction"
+# How often a waiting ingestion checks whether its job has finished
+BATCH_POLL_INTERVAL = 30  # seconds
+
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+Responder = Callable[[str, str], str]
+
+
+def request_line(key: str, prompt: str) -> Dict:
+    """One line of a batch job file: a Gemini request tagged with its key."""
+    return {
+        "key": key,
+        "request": {"contents": [{"role": "user", "parts": [{"text": prompt}]}]},
+    }
+
+
+def request_hash(request: Dict) -> str:
+    """Hash of a request's prompt text, for outputs that drop the key."""
+    text = "".join(
+        part.get("text", "")
+        for content in request.get("contents", [])
+        for part in content.get("parts", [])
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def response_text(response: Dict) -> str:
+    candidates = response.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+def offline_responder(model: str, prompt: str) -> str:
+    """Deterministic stand-in answer: the same prompt always gets the same JSON."""
+    return json.dumps(
+        {
+            "offline_response": True,
+            "model": model,
+            "prompt_hash": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        }
+    )
+
+
+def live_responder(model: str, prompt: str) -> str:
+    """Answer interactively with Gemini, which records its own usage."""
+    from .gemini_service import gemini_service
+
+    return gemini_service._generate(prompt, model_name=model)
+
+
+def response_usage(response: Dict) -> Optional[Dict[str, int]]:
+    """Prompt and output token counts from a prediction's usage metadata, if any."""
+    usage = response.get("usageMetadata") or response.get("usage_metadata")
+    if not usage:
+        return None
+    return {
+        "prompt_tokens": int(
+            usage.get("promptTokenCount") or usage.get("prompt_token_count") or 0
+        ),
+        "output_tokens": int(
+            usage.get("candidatesTokenCount")
+            or usage.get("candidates_token_count")
+            or 0
+        ),
+    }
+
+
+@dataclass
+class BatchResult:
+    """The outcome of one request in a finished job"""
+
+    key: str
+    text: str = ""
+    error: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+
+
+@dataclass
+class BatchJob:
+    """
+    A submitted bulk extraction job.
+
+    entries maps each request key to what ingestion needs besides the model
+    output (source filename, text snippet, request hash). The job is saved
+    as a manifest so its results can be ingested by a later process.
+    """
+
+    job_id: str
+    backend: str
+    model: str
+    entries: Dict[str, Dict] = field(default_factory=dict)
+    state: str = JOB_RUNNING
+    external_id: Optional[str] = None
+    output_location: Optional[str] = None
+    created_at: float = 0.0
+    ingested: bool = False
+    # Answered by offline_responder, so the outputs are placeholders
+    offline: bool = False
+
+    @classmethod
+    def create(cls, backend: str, model: str) -> "BatchJob":
+        return cls(
+            job_id=uuid.uuid4().hex[:12],
+            backend=backend,
+            model=model,
+            created_at=time.time(),
+        )
+
+    @property
+    def job_dir(self) -> str:
+        return os.path.join(BATCH_JOBS_DIR, self.job_id)
+
+    @property
+    def requests_path(self) -> str:
+        return os.path.join(self.job_dir, "requests.jsonl")
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def save(self):
+        os.makedirs(self.job_dir, exist_ok=True)
+        path = os.path.join(self.job_dir, "manifest.json")
+        # Replace atomically so a crash never leaves a half-written manifest
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, job_id: str) -> "BatchJob":
+        path = os.path.join(BATCH_JOBS_DIR, job_id, "manifest.json")
+        if not os.path.exists(path):
+            raise ValueError(f"Unknown batch job: {job_id}")
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def key_for(self, line: Dict) -> Optional[str]:
+        """The request key of an output line, by key or by request hash."""
+        if line.get("key") in self.entries:
+            return line["key"]
+        digest = request_hash(line.get("request", {}))
+        for key, entry in self.entries.items():
+            if entry.get("request_hash") == digest:
+                return key
+        return None
+
+
+class BatchBackend(ABC):
+    """Runs a job file of extraction requests as one batch job"""
+
+    name = ""
+
+    @abstractmethod
+    def submit(self, job: BatchJob):
+        """Start job from job.requests_path, setting job.external_id."""
+
+    @abstractmethod
+    def refresh(self, job: BatchJob) -> str:
+        """Update and return job.state."""
+
+    @abstractmethod
+    def output_lines(self, job: BatchJob) -> Iterator[Dict]:
+        """Prediction lines of a succeeded job, each with its request and response."""
+
+    def results(self, job: BatchJob) -> Iterator[BatchResult]:
+        for line in self.output_lines(job):
+            key = job.key_for(line)
+            if key is None:
+                print(f"Batch job {job.job_id}: skipping output without a known key")
+                continue
+            if line.get("status"):
+                yield BatchResult(key, error=str(line["status"]))
+                continue
+            response = line.get("response") or {}
+            text = response_text(response)
+            yield BatchResult(
+                key,
+                text=text,
+                error=None if text else "empty response",
+                usage=response_usage(response),
+            )
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    File-based stand-in for a batch service, for tests and local runs.
+
+    submit() answers every request in the job file straight away with
+    responder(model, prompt) and writes the predictions next to it in the
+    same format the Vertex backend reads. The default responder answers
+    offline and deterministically; live=True (or BATCH_LOCAL_LIVE=1) calls
+    Gemini interactively instead.
+    """
+
+    name = "local"
+
+    def __init__(
+        self, responder: Optional[Responder] = None, live: bool = BATCH_LOCAL_LIVE
+    ):
+        if responder is None:
+            responder = live_responder if live else offline_responder
+        self.responder = responder
+
+    def _predictions_path(self, job: BatchJob) -> str:
+        return os.path.join(job.job_dir, "predictions.jsonl")
+
+    def submit(self, job: BatchJob):
+        job.external_id = job.job_id
+        job.offline = self.responder is offline_responder
+        output_path = self._predictions_path(job)
+        with (
+            open(job.requests_path) as source,
+            open(output_path + ".tmp", "w") as output,
+            usage_scope(site=BULK_EXTRACTION_SITE),
+        ):
+            for raw in source:
+                if not raw.strip():
+                    continue
+                line = json.loads(raw)
+                prompt = line["request"]["contents"][0]["parts"][0]["text"]
+                try:
+                    text = self.responder(job.model, prompt)
+                    line["response"] = {
+                        "candidates": [{"content": {"parts": [{"text": text}]}}]
+                    }
+                    line["status"] = ""
+                except Exception as e:
+                    line["status"] = str(e)
+                output.write(json.dumps(line) + "\n")
+        os.replace(output_path + ".tmp", output_path)
+        job.output_location = output_path
+
+    def refresh(self, job: BatchJob) -> str:
+        if os.path.exists(self._predictions_path(job)):
+            job.state = JOB_SUCCEEDED
+        return job.state
+
+    def output_lines(self, job: BatchJob) -> Iterator[Dict]:
+        with open(self._predictions_path(job)) as f:
+            for raw in f:
+                if raw.strip():
+                    yield json.loads(raw)
+
+
+class VertexBatchBackend(BatchBackend):
+    """
+    Vertex AI batch prediction.
+
+    The job file is uploaded to the GCS bucket and run as a
+    BatchPredictionJob, which has its own quota and does not compete with
+    interactive calls. Outputs are read back from the bucket.
+    """
+
+    name = "vertex"
+
+    def _prefix(self, job: BatchJob) -> str:
+        return f"batch_jobs/{job.job_id}"
+
+    def submit(self, job: BatchJob):
+        from vertexai.batch_prediction import BatchPredictionJob
+
+        from ...vertex_config import init_vertex
+        from .gcp_service import gcp_service
+
+        blob_name = f"{self._prefix(job)}/requests.jsonl"
+        if not gcp_service.upload_file(job.requests_path, blob_name):
+            raise RuntimeError(f"Failed to upload batch job file for {job.job_id}")
+        init_vertex()
+        bucket = gcp_service.bucket_name
+        batch_job = BatchPredictionJob.submit(
+            source_model=job.model,
+            input_dataset=f"gs://{bucket}/{blob_name}",
+            output_uri_prefix=f"gs://{bucket}/{self._prefix(job)}/output",
+        )
+        job.external_id = batch_job.resource_name
+
+    def refresh(self, job: BatchJob) -> str:
+        from vertexai.batch_prediction import BatchPredictionJob
+
+        if job.external_id is None:
+            raise RuntimeError(f"Batch job {job.job_id} was never submitted")
+        batch_job = BatchPredictionJob(job.external_id)
+        if batch_job.has_ended:
+            job.state = JOB_SUCCEEDED if batch_job.has_succeeded else JOB_FAILED
+            job.output_location = batch_job.output_location
+        return job.state
+
+    def output_lines(self, job: BatchJob) -> Iterator[Dict]:
+        from .gcp_service import gcp_service
+
+        if job.output_location is None:
+            raise RuntimeError(f"Batch job {job.job_id} has no output location")
+        # output_location is gs://<bucket>/<prefix>
+        bucket_name, _, prefix = job.output_location[len("gs://") :].partition("/")
+        bucket = gcp_service.client.bucket(bucket_name)
+        for blob in gcp_service.client.list_blobs(bucket, prefix=prefix):
+            if not blob.name.endswith(".jsonl"):
+                continue
+            for raw in blob.download_as_text().splitlines():
+                if raw.strip():
+                    yield json.loads(raw)
+
+
+BATCH_BACKENDS = {"local": LocalFileBatchBackend, "vertex": VertexBatchBackend}
+
+
+def create_batch_backend(backend: str = "vertex") -> BatchBackend:
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend: {backend}")
+    return BATCH_BACKENDS[backend]()
+
+
+# Global instance
+batch_backend = create_batch_backend(BATCH_BACKEND)
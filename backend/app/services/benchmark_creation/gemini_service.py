@@ -1,9 +1,39 @@
 """Gemini AI service for structured data extraction."""
 
 import json
+import time
+
 import google.generativeai as genai
+
 from ...config.gemini_config import gemini_config
 from ...config.settings import load_extraction_prompt
+from ...data.summary_parser import AISummaryParser
+from ...storage.llm_cache import llm_cache
+from ..deadline import DeadlineExceeded, check_deadline
+from ..llm_usage import record_llm_call, usage_from_response
+from ..model_cascade import (
+    check_truncation,
+    complete_markdown,
+    finish_reason,
+    get_cascade,
+    not_empty,
+    valid_json,
+)
+from ..rate_limiter import estimate_content_tokens, rate_limiter
+from ..single_flight import SingleFlight
+
+GEMINI_MODEL = "gemini-1.5-flash"
+# Escalation target when the base model's output fails validation
+GEMINI_ESCALATION_MODEL = "gemini-2.5-flash"
+
+STRUCTURED_EXTRACTION_CASCADE = get_cascade(
+    "structured_extraction", [GEMINI_MODEL, GEMINI_ESCALATION_MODEL], [valid_json]
+)
+COMPETITIVE_SUMMARY_CASCADE = get_cascade(
+    "competitive_summary",
+    [GEMINI_MODEL, GEMINI_ESCALATION_MODEL],
+    [not_empty, complete_markdown],
+)
 
 
 class GeminiService:
@@ -13,6 +43,9 @@ class GeminiService:
         self.configured = False
         self.model = None
         self.prompt_template = None
+        self._models = {}
+        # Identical concurrent prompts share one request
+        self._flights = SingleFlight()
         # Try to initialize automatically
         self.initialize()
 
@@ -21,7 +54,8 @@ class GeminiService:
         if gemini_config.configure():
             self.configured = True
             try:
-                self.model = genai.GenerativeModel("gemini-1.5-flash")
+                self.model = genai.GenerativeModel(GEMINI_MODEL)
+                self._models[GEMINI_MODEL] = self.model
                 self.prompt_template = load_extraction_prompt()
                 return True
             except Exception as e:
@@ -29,49 +63,162 @@ class GeminiService:
                 return False
         return False
 
-    def extract_structured_data(self, extracted_text, filename):
-        """Extract structured data from text using Gemini."""
+    def _get_model(self, model_name):
+        if model_name not in self._models:
+            self._models[model_name] = genai.GenerativeModel(model_name)
+        return self._models[model_name]
+
+    def _call(self, model_name, prompt, request):
+        """Run request() under the shared rate limiter and record its usage."""
+        calls = {"attempts": 0}
+
+        def attempt():
+            calls["attempts"] += 1
+            return request()
+
+        start_time = time.time()
+        try:
+            response, text = rate_limiter.call(
+                model_name, estimate_content_tokens(prompt), attempt
+            )
+        except Exception:
+            record_llm_call(
+                model_name,
+                latency=time.time() - start_time,
+                retries=max(calls["attempts"] - 1, 0),
+                failed=True,
+            )
+            raise
+        prompt_tokens, output_tokens = usage_from_response(response, prompt, text)
+        record_llm_call(
+            model_name,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            latency=time.time() - start_time,
+            retries=calls["attempts"] - 1,
+        )
+        # Raised before the caller caches it, so a cut-off output is not reused
+        return check_truncation(text, finish_reason(response))
+
+    def _generate(self, prompt, use_cache=True, model_name=GEMINI_MODEL):
+        """Call the model through the shared rate limiter and response cache."""
+        model = self._get_model(model_name)
+        request_key = llm_cache.make_key(model_name, prompt)
+        if use_cache:
+            cached = llm_cache.get(request_key)
+            if cached is not None:
+                record_llm_call(model_name, cached=True)
+                return cached
+
+        def request():
+            response = model.generate_content(prompt)
+            return response, response.text if response else ""
+
+        def generate():
+            text = self._call(model_name, prompt, request)
+            if use_cache and text:
+                llm_cache.set(request_key, model_name, text)
+            return text
+
+        return self._flights.do(request_key, generate)
+
+    def _generate_stream(self, prompt, parser, use_cache=True, model_name=GEMINI_MODEL):
+        """
+        Like _generate, but feeds the response to parser chunk by chunk as it
+        is generated. Streams are not coalesced, since each caller has its
+        own parser.
+        """
+        model = self._get_model(model_name)
+        request_key = llm_cache.make_key(model_name, prompt)
+        parser.reset()
+        if use_cache:
+            cached = llm_cache.get(request_key)
+            if cached is not None:
+                record_llm_call(model_name, cached=True)
+                parser.feed(cached)
+                return cached
+
+        def request():
+            # A retried stream starts over
+            parser.reset()
+            response = model.generate_content(prompt, stream=True)
+            for chunk in response:
+                check_deadline()
+                parser.feed(chunk.text if chunk.parts else "")
+            return response, "".join(parser.text_parts)
+
+        text = self._call(model_name, prompt, request)
+        if use_cache and text:
+            llm_cache.set(request_key, model_name, text)
+        return text
+
+    def extraction_available(self):
+        """Whether extraction prompts can be built, initializing if needed."""
         if not self.configured:
             print("Gemini not configured, skipping structured extraction")
-            return None
+            return False
 
         if not self.model or not self.prompt_template:
-            if not self.initialize():
-                return None
+            return self.initialize()
+        return True
 
+    def build_extraction_prompt(self, extracted_text):
+        """Structured extraction prompt for a document's text, or None if unavailable."""
+        if not self.extraction_available():
+            return None
+
+        return self.prompt_template.format(extracted_text=extracted_text)
+
+    def parse_structured_response(self, response, extracted_text, filename):
+        """
+        Parse an extraction response into structured data with metadata.
+
+        Raises json.JSONDecodeError if the response is not valid JSON.
+        """
+        # Clean up the response text
+        response_text = response.strip()
+
+        # Remove markdown code blocks if present
+        if response_text.startswith("```json"):
+            response_text = response_text[7:]
+        if response_text.endswith("```"):
+            response_text = response_text[:-3]
+
+        response_text = response_text.strip()
+
+        # Parse JSON
+        structured_data = json.loads(response_text)
+
+        # Add metadata
+        structured_data["metadata"] = {
+            "source_document_title": filename,
+            "extraction_date": json.loads(
+                json.dumps(structured_data.get("metadata", {}))
+            ).get("extraction_date", "2025-09-20"),
+            "raw_text_snippet": extracted_text[:200] + "..."
+            if len(extracted_text) > 200
+            else extracted_text,
+        }
+        return structured_data
+
+    def extract_structured_data(self, extracted_text, filename, use_cache=True):
+        """Extract structured data from text using Gemini."""
+        response = None
         try:
             # Format the prompt with the extracted text
-            prompt = self.prompt_template.format(extracted_text=extracted_text)
+            prompt = self.build_extraction_prompt(extracted_text)
+            if prompt is None:
+                return None
 
             print("Sending text to Gemini for structured extraction...")
-            response = self.model.generate_content(prompt)
-
-            if response and response.text:
-                # Clean up the response text
-                response_text = response.text.strip()
-
-                # Remove markdown code blocks if present
-                if response_text.startswith("```json"):
-                    response_text = response_text[7:]
-                if response_text.endswith("```"):
-                    response_text = response_text[:-3]
-
-                response_text = response_text.strip()
-
-                # Parse JSON
-                structured_data = json.loads(response_text)
-
-                # Add metadata
-                structured_data["metadata"] = {
-                    "source_document_title": filename,
-                    "extraction_date": json.loads(
-                        json.dumps(structured_data.get("metadata", {}))
-                    ).get("extraction_date", "2025-09-20"),
-                    "raw_text_snippet": extracted_text[:200] + "..."
-                    if len(extracted_text) > 200
-                    else extracted_text,
-                }
+            response = STRUCTURED_EXTRACTION_CASCADE.run(
+                lambda model_name: self._generate(prompt, use_cache, model_name)
+            )
 
+            if response:
+                structured_data = self.parse_structured_response(
+                    response, extracted_text, filename
+                )
                 print("Successfully extracted structured data")
                 return structured_data
             else:
@@ -80,16 +227,34 @@ class GeminiService:
 
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON from Gemini response: {e}")
-            print(f"Raw response: {response.text if response else 'No response'}")
+            print(f"Raw response: {response if response else 'No response'}")
+            # Don't serve an unparseable response again
+            for model_name in STRUCTURED_EXTRACTION_CASCADE.models:
+                llm_cache.delete(llm_cache.make_key(model_name, prompt))
             return None
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error during Gemini extraction: {e}")
             return None
 
     def generate_competitive_summary(
-        self, target_data, competitor_data, insights, benchmarks
+        self,
+        target_data,
+        competitor_data,
+        insights,
+        benchmarks,
+        use_cache=True,
+        on_section=None,
     ):
-        """Generate AI-powered competitive analysis summary."""
+        """
+        Generate AI-powered competitive analysis summary.
+
+        With on_section, the response is streamed and on_section(title,
+        content) is called as soon as each section is complete. A section is
+        sent again, replacing the earlier one, if the output is retried or
+        escalated to the stronger model.
+        """
         if not self.configured or not self.model:
             print("Gemini not configured, skipping competitive summary")
             return None
@@ -101,9 +266,28 @@ class GeminiService:
             )
 
             # Generate summary using Gemini
-            response = self.model.generate_content(summary_prompt)
-            return response.text
-
+            if on_section is None:
+                return COMPETITIVE_SUMMARY_CASCADE.run(
+                    lambda model_name: self._generate(
+                        summary_prompt, use_cache, model_name
+                    )
+                )
+
+            parser = AISummaryParser(on_section)
+
+            def stream(model_name):
+                try:
+                    return self._generate_stream(
+                        summary_prompt, parser, use_cache, model_name
+                    )
+                finally:
+                    # Also reports the last section of a cut-off output
+                    parser.close()
+
+            return COMPETITIVE_SUMMARY_CASCADE.run(stream)
+
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error generating competitive summary: {e}")
             return None
@@ -2,8 +2,14 @@
 
 import os
 import json
+import time
 from google.cloud import vision_v1 as vision
 from .gcp_service import gcp_service
+from ..deadline import DeadlineExceeded, remaining, sleep_within_deadline
+
+# Longest a single Vision OCR job may run, and how often it is polled
+VISION_TIMEOUT = 420  # seconds
+VISION_POLL_INTERVAL = 5  # seconds
 
 
 class VisionService:
@@ -62,7 +68,7 @@ class VisionService:
         )
         
         print('Waiting for Vision API operation to complete...')
-        result = operation.result(timeout=420)
+        self._wait_for_operation(operation)
         
         # Process the results
         storage_client = gcp_service.client
@@ -87,6 +93,22 @@ class VisionService:
         
         return extracted_text.strip()
     
+    def _wait_for_operation(self, operation):
+        """Poll the OCR job until done, cancelling it if the request gives up on it."""
+        # Never wait past the request's own deadline
+        give_up_at = time.monotonic() + remaining(VISION_TIMEOUT)
+        try:
+            while not operation.done():
+                left = give_up_at - time.monotonic()
+                if left <= 0:
+                    raise TimeoutError("Vision API operation timed out")
+                sleep_within_deadline(min(VISION_POLL_INTERVAL, left))
+        except (DeadlineExceeded, TimeoutError):
+            print('Cancelling abandoned Vision API operation')
+            operation.cancel()
+            raise
+        return operation.result()
+    
     def is_available(self):
         """Check if Vision API service is available."""
         return self.available
@@ -0,0 +1,240 @@
+"""Request deadlines and cancellation that follow a request into every call it makes."""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+# How often a running request checks whether its client is still connected
+DISCONNECT_POLL_INTERVAL = 1.0  # seconds
+TIMED_OUT = "deadline exceeded"
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request ran out of time, so its remaining work was abandoned."""
+
+
+class ClientDisconnected(DeadlineExceeded):
+    """The client went away, so nobody is waiting for the result."""
+
+
+class RequestDeadline:
+    """
+    Absolute deadline plus a cancel flag for one request.
+
+    The flag is a threading.Event so blocking work in worker threads (retry
+    waits, Vision polling, chart rendering) can notice cancellation too.
+    """
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        parent: Optional["RequestDeadline"] = None,
+    ):
+        self.parent = parent
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        if parent is not None and parent.expires_at is not None:
+            self.expires_at = (
+                parent.expires_at
+                if self.expires_at is None
+                else min(self.expires_at, parent.expires_at)
+            )
+        self.cancelled = threading.Event()
+        self.reason = TIMED_OUT
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self.cancelled.is_set():
+            self.reason = reason
+            self.cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        if self.cancelled.is_set():
+            return True
+        return self.parent is not None and self.parent.is_cancelled()
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return self.is_cancelled() or (remaining is not None and remaining <= 0)
+
+    def error(self) -> "DeadlineExceeded":
+        """The exception describing why this request can no longer finish."""
+        source: Optional[RequestDeadline] = self
+        while source is not None and not source.cancelled.is_set():
+            source = source.parent
+        if source is not None and source.reason != TIMED_OUT:
+            return ClientDisconnected(f"Request {source.reason}")
+        return DeadlineExceeded("Request deadline exceeded")
+
+
+_current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar(
+    "request_deadline", default=None
+)
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "deadline_exceeded": 0, "disconnected": 0, "completed": 0}
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None):
+    """Bind a deadline (never later than an enclosing one) for everything run inside."""
+    deadline = RequestDeadline(seconds, parent=_current_deadline.get())
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[RequestDeadline]:
+    return _current_deadline.get()
+
+
+def detached_context() -> Context:
+    """Copy of the current context without its deadline, for work shared across requests."""
+    context = copy_context()
+    context.run(_current_deadline.set, None)
+    return context
+
+
+def remaining(cap: Optional[float] = None) -> Optional[float]:
+    """Seconds left for the current request, capped at `cap`; None when unbounded."""
+    deadline = _current_deadline.get()
+    left = deadline.remaining() if deadline else None
+    if left is None:
+        return cap
+    return left if cap is None else min(left, cap)
+
+
+def check_deadline():
+    """Raise DeadlineExceeded if the current request has expired or been cancelled."""
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired():
+        raise deadline.error()
+
+
+def sleep_within_deadline(seconds: float):
+    """
+    Blocking sleep that wakes early on cancellation.
+
+    Raises straight away when the wait would outlast the deadline, since the
+    work after it could never finish in time.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        time.sleep(seconds)
+        return
+    check_deadline()
+    left = deadline.remaining()
+    if left is not None and seconds > left:
+        raise DeadlineExceeded(
+            f"Waiting {seconds:.1f}s would exceed the request deadline"
+        )
+    deadline.cancelled.wait(seconds)
+    check_deadline()
+
+
+async def asleep_within_deadline(seconds: float):
+    """Async variant of sleep_within_deadline; task cancellation interrupts it."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        check_deadline()
+        left = deadline.remaining()
+        if left is not None and seconds > left:
+            raise DeadlineExceeded(
+                f"Waiting {seconds:.1f}s would exceed the request deadline"
+            )
+    await asyncio.sleep(seconds)
+
+
+async def await_within_deadline(awaitable: Awaitable[Any]) -> Any:
+    """
+    Await work that may be shared with other requests, giving up at this
+    request's own deadline. The work itself is left to its other waiters.
+    """
+    check_deadline()
+    try:
+        async with asyncio.timeout(remaining()) as scope:
+            return await awaitable
+    except TimeoutError:
+        if scope.expired():
+            raise DeadlineExceeded("Request deadline exceeded")
+        raise
+
+
+async def _bounded(coroutine: Awaitable[Any], deadline: RequestDeadline) -> Any:
+    try:
+        return await asyncio.wait_for(coroutine, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        # Also wakes blocking work still running in worker threads
+        deadline.cancel(TIMED_OUT)
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def start_request_task(
+    coroutine: Awaitable[Any], seconds: Optional[float]
+) -> Tuple["asyncio.Task", RequestDeadline]:
+    """Run coroutine as a task bound to a new deadline; the task keeps the scope."""
+    with deadline_scope(seconds) as deadline:
+        task = asyncio.ensure_future(_bounded(coroutine, deadline))
+    _count("requests")
+    return task, deadline
+
+
+def abandon(task: "asyncio.Task", deadline: RequestDeadline, reason: str):
+    """Cancel a request's task and flag its thread-side work to stop."""
+    deadline.cancel(reason)
+    if not task.done():
+        task.cancel()
+
+
+async def run_request(
+    request: Any,
+    coroutine: Awaitable[Any],
+    seconds: Optional[float] = None,
+    poll_interval: float = DISCONNECT_POLL_INTERVAL,
+) -> Any:
+    """
+    Await coroutine under a request deadline, abandoning it if the client leaves.
+
+    `request` is the Starlette request, polled for disconnects every
+    poll_interval seconds. On disconnect or deadline the task is cancelled
+    and ClientDisconnected / DeadlineExceeded is raised.
+    """
+    task, deadline = start_request_task(coroutine, seconds)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                result = task.result()
+                _count("completed")
+                return result
+            if request is not None and await request.is_disconnected():
+                _count("disconnected")
+                abandon(task, deadline, "client disconnected")
+                raise ClientDisconnected("Client disconnected")
+    except ClientDisconnected:
+        raise
+    except DeadlineExceeded:
+        _count("deadline_exceeded")
+        raise
+    finally:
+        # Covers the handler itself being cancelled by the server
+        if not task.done():
+            abandon(task, deadline, "request cancelled")
+
+
+def deadline_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
@@ -1,9 +1,86 @@
+import asyncio
+import threading
 import time
+from typing import Any, Dict
 
 from vertexai.preview.generative_models import GenerativeModel
 
+from ..storage.llm_cache import llm_cache
+from .deadline import DeadlineExceeded
+from .hedging import hedger
+from .llm_usage import arecord_llm_call, record_llm_call, usage_from_response
+from .model_cascade import check_truncation, finish_reason
+from .rate_limiter import estimate_content_tokens, rate_limiter
+from .single_flight import AsyncSingleFlight, SingleFlight
+
 MAX_RETRIES = 3
-RETRY_DELAY = 2  # seconds
+RETRY_DELAY = 2  # seconds, doubled per attempt with jitter
+
+# Model handles are stateless wrappers, so one per model name is shared
+_models: Dict[str, GenerativeModel] = {}
+_models_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "failures": 0, "in_flight": 0, "peak_in_flight": 0}
+_latency = {"total": 0.0}
+
+# Identical concurrent calls share one request
+_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
+
+
+def get_model(model_name: str) -> GenerativeModel:
+    """Return the shared GenerativeModel handle for a model name."""
+    if model_name not in _models:
+        with _models_lock:
+            if model_name not in _models:
+                _models[model_name] = GenerativeModel(model_name)
+    return _models[model_name]
+
+
+def _track_start():
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+        _stats["peak_in_flight"] = max(_stats["peak_in_flight"], _stats["in_flight"])
+
+
+def _track_end(elapsed: float, failed: bool):
+    with _stats_lock:
+        _stats["in_flight"] -= 1
+        _latency["total"] += elapsed
+        if failed:
+            _stats["failures"] += 1
+
+
+def _call_usage(
+    calls: Dict, content: list, output: str, start_time: float, failed: bool = False
+) -> Dict:
+    """Usage ledger fields for one logical call and the attempts it took."""
+    prompt_tokens, output_tokens = (
+        (0, 0) if failed else usage_from_response(calls["response"], content, output)
+    )
+    return {
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "latency": time.time() - start_time,
+        "retries": max(calls["attempts"] - 1, 0),
+        "failed": failed,
+    }
+
+
+def gemini_call_stats() -> Dict[str, float]:
+    """Call counts, failures, peak concurrency and average latency per attempt."""
+    with _stats_lock:
+        return {
+            **_stats,
+            "hedged": hedger.hedged,
+            "hedge_wins": hedger.hedge_wins,
+            "coalesced": _flights.coalesced + _async_flights.coalesced,
+            "avg_latency": round(_latency["total"] / _stats["calls"], 3)
+            if _stats["calls"]
+            else 0.0,
+        }
 
 
 # -----------------------
@@ -14,6 +91,7 @@ def call_gemini_api(
     content: list,
     max_retries: int = MAX_RETRIES,
     retry_delay: int = RETRY_DELAY,
+    use_cache: bool = True,
 ) -> str:
     """
     Calls the Gemini model with a prompt and text input.
@@ -23,23 +101,149 @@ def call_gemini_api(
         model_name (str): Gemini model name (e.g., "gemini-2.5-flash-lite")
         prompt (str): Prompt template to guide extraction
         max_retries (int): Number of retry attempts
-        retry_delay (int): Delay between retries (seconds)
+        retry_delay (int): Base delay for exponential backoff (seconds)
+        use_cache (bool): Serve and store the response in the LLM cache
 
     Returns:
         str: Response from LLM
     """
-    model = GenerativeModel(model_name)
+    model = get_model(model_name)
+    request_key = llm_cache.make_key(model_name, content)
+    cache_key = request_key if use_cache else None
+    if cache_key:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            record_llm_call(model_name, cached=True)
+            return cached
 
-    for attempt in range(1, max_retries + 1):
+    calls: Dict[str, Any] = {"attempts": 0, "response": None}
+
+    def attempt() -> str:
+        _track_start()
+        calls["attempts"] += 1
+        start_time = time.time()
         try:
-            # Combine prompt and text input
             response = model.generate_content(content)
-            raw_output = response.text.strip()
-            return raw_output
+        except Exception:
+            _track_end(time.time() - start_time, failed=True)
+            raise
+        _track_end(time.time() - start_time, failed=False)
+        calls["response"] = response
+        return response.text.strip()
+
+    def generate() -> str:
+        start_time = time.time()
+        try:
+            output = rate_limiter.call(
+                model_name,
+                estimate_content_tokens(content),
+                attempt,
+                max_retries=max_retries,
+                base_delay=retry_delay,
+            )
+        except DeadlineExceeded:
+            record_llm_call(
+                model_name, **_call_usage(calls, content, "", start_time, failed=True)
+            )
+            # Nobody is waiting for this output any more
+            raise
+        except Exception as call_err:
+            print(f"Gemini call failed after {max_retries} attempts: {call_err}")
+            record_llm_call(
+                model_name, **_call_usage(calls, content, "", start_time, failed=True)
+            )
+            # Return empty string after all retries fail
+            return ""
+        record_llm_call(model_name, **_call_usage(calls, content, output, start_time))
+        # A cut-off output is escalated by the cascade, never cached
+        check_truncation(output, finish_reason(calls["response"]))
+        if cache_key and output:
+            llm_cache.set(cache_key, model_name, output)
+        return output
 
+    return _flights.do(request_key, generate)
+
+
+async def acall_gemini_api(
+    model_name: str,
+    content: list,
+    max_retries: int = MAX_RETRIES,
+    retry_delay: int = RETRY_DELAY,
+    use_cache: bool = True,
+    hedge: bool = False,
+) -> str:
+    """
+    Async variant of call_gemini_api.
+
+    Uses the model's native async generation and non-blocking retry waits, so
+    no worker thread is held while a request is in flight. With hedge=True
+    (idempotent calls only) a slow attempt is raced against a duplicate.
+    """
+    model = get_model(model_name)
+    request_key = llm_cache.make_key(model_name, content)
+    cache_key = request_key if use_cache else None
+    if cache_key:
+        cached = await asyncio.to_thread(llm_cache.get, cache_key)
+        if cached is not None:
+            await arecord_llm_call(model_name, cached=True)
+            return cached
+
+    calls: Dict[str, Any] = {"attempts": 0, "response": None}
+
+    async def attempt() -> str:
+        _track_start()
+        calls["attempts"] += 1
+        start_time = time.time()
+        try:
+            response = await model.generate_content_async(content)
+        except asyncio.CancelledError:
+            # A hedged attempt that lost the race
+            _track_end(time.time() - start_time, failed=False)
+            raise
+        except Exception:
+            _track_end(time.time() - start_time, failed=True)
+            raise
+        _track_end(time.time() - start_time, failed=False)
+        calls["response"] = response
+        return response.text.strip()
+
+    tokens = estimate_content_tokens(content)
+
+    async def hedged_attempt() -> str:
+        return await hedger.run(
+            model_name,
+            attempt,
+            before_hedge=lambda: rate_limiter.aacquire(model_name, tokens),
+        )
+
+    async def generate() -> str:
+        start_time = time.time()
+        try:
+            output = await rate_limiter.acall(
+                model_name,
+                tokens,
+                hedged_attempt if hedge else attempt,
+                max_retries=max_retries,
+                base_delay=retry_delay,
+            )
+        except DeadlineExceeded:
+            await arecord_llm_call(
+                model_name, **_call_usage(calls, content, "", start_time, failed=True)
+            )
+            # Nobody is waiting for this output any more
+            raise
         except Exception as call_err:
-            print(f"[Attempt {attempt}] Gemini call failed: {call_err}")
-            time.sleep(retry_delay)
+            print(f"Gemini call failed after {max_retries} attempts: {call_err}")
+            await arecord_llm_call(
+                model_name, **_call_usage(calls, content, "", start_time, failed=True)
+            )
+            return ""
+        await arecord_llm_call(
+            model_name, **_call_usage(calls, content, output, start_time)
+        )
+        check_truncation(output, finish_reason(calls["response"]))
+        if cache_key and output:
+            await asyncio.to_thread(llm_cache.set, cache_key, model_name, output)
+        return output
 
-    # Return empty dict after all retries fail
-    return ""
+    return await _async_flights.do(request_key, generate)
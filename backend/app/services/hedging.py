@@ -0,0 +1,140 @@
+"""Hedged requests: race a duplicate call once the first one runs unusually long."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+HEDGE_PERCENTILE = 95
+# At most this share of requests may send a duplicate
+HEDGE_BUDGET_PCT = 10.0
+# Latency samples needed before the percentile is trusted
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies per key."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+
+class Hedger:
+    """
+    Issue a duplicate of a slow idempotent call and keep whichever finishes first.
+
+    The duplicate is sent once the call has run past the key's observed p95
+    latency, as long as the hedge budget allows it; the losing call is
+    cancelled. A primary cancelled because its hedge won is recorded with the
+    time it had run so far, a lower bound on its latency; recording only
+    completed calls would hide the slow tail and pull the p95 down toward the
+    fast mode.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        budget_pct: float = HEDGE_BUDGET_PCT,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+    ):
+        self.percentile = percentile
+        self.budget_pct = budget_pct
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _threshold(self, key: str) -> Optional[float]:
+        if self.latencies.count(key) < self.min_samples:
+            return None
+        return self.latencies.percentile(key, self.percentile)
+
+    def _within_budget(self) -> bool:
+        return (self.hedged + 1) * 100 <= self.budget_pct * self.requests
+
+    async def _timed(self, key: str, coroutine: Callable[[], Awaitable[Any]]) -> Any:
+        start_time = time.monotonic()
+        result = await coroutine()
+        self.latencies.record(key, time.monotonic() - start_time)
+        return result
+
+    async def run(
+        self,
+        key: str,
+        coroutine: Callable[[], Awaitable[Any]],
+        before_hedge: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """Run coroutine(), racing a duplicate if it outlives the hedge threshold."""
+        self.requests += 1
+        threshold = self._threshold(key)
+        start_time = time.monotonic()
+        primary = asyncio.ensure_future(self._timed(key, coroutine))
+        tasks = [primary]
+        try:
+            if threshold is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done or not self._within_budget():
+                return await primary
+
+            self.hedged += 1
+            if before_hedge is not None:
+                await before_hedge()
+            hedge = asyncio.ensure_future(self._timed(key, coroutine))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    if winners[0] is hedge:
+                        self.hedge_wins += 1
+                        if not primary.done():
+                            # Censored sample for the primary cancelled below
+                            self.latencies.record(key, time.monotonic() - start_time)
+                    return winners[0].result()
+                if not pending:
+                    # Both attempts failed; surface the primary's error
+                    return primary.result()
+        finally:
+            # Cancel the losing (or abandoned) attempt
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self, key: str) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "p50": self.latencies.percentile(key, 50),
+            "p95": self.latencies.percentile(key, 95),
+            "p99": self.latencies.percentile(key, 99),
+        }
+
+
+# Global instance
+hedger = Hedger()
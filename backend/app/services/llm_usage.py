@@ -0,0 +1,133 @@
+"""Attribute every LLM call to a call site, deck and request, and record it in the usage ledger."""
+
+import asyncio
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+from ..storage.usage_ledger import usage_ledger
+from .rate_limiter import estimate_content_tokens
+
+# List prices in USD per million (prompt, output) tokens
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+UNATTRIBUTED_SITE = "other"
+
+_current_tags: ContextVar[Optional[Dict[str, Optional[str]]]] = ContextVar(
+    "llm_usage_tags", default=None
+)
+
+
+def _tags() -> Dict[str, Optional[str]]:
+    return _current_tags.get() or {}
+
+
+@contextmanager
+def usage_scope(
+    site: Optional[str] = None,
+    deck_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+):
+    """
+    Tag the LLM calls made inside with a call site, deck and request.
+
+    Tags not given are inherited from the enclosing scope; the outermost
+    scope starts a new request id.
+    """
+    parent = _tags()
+    tags = {
+        "site": site or parent.get("site"),
+        "deck_id": deck_id or parent.get("deck_id"),
+        "request_id": request_id or parent.get("request_id") or uuid.uuid4().hex[:12],
+    }
+    token = _current_tags.set(tags)
+    try:
+        yield tags
+    finally:
+        _current_tags.reset(token)
+
+
+def estimate_cost(model: str, prompt_tokens: int, output_tokens: int) -> float:
+    prompt_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + output_tokens * output_price) / 1_000_000
+
+
+def usage_from_response(
+    response: Any, content: Any = None, output: str = ""
+) -> Tuple[int, int]:
+    """
+    Prompt and output token counts from a response's usage metadata.
+
+    Accepts a Gemini response or a LangChain generation_info dict; counts
+    missing from either are estimated from the content and output text.
+    """
+    if isinstance(response, dict):
+        usage = response.get("usage_metadata")
+    else:
+        usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict):
+        prompt_tokens = usage.get("prompt_token_count")
+        output_tokens = usage.get("candidates_token_count")
+    else:
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+    # Fall back to the same estimate the rate limiter budgets with
+    if not prompt_tokens:
+        prompt_tokens = estimate_content_tokens(content) if content is not None else 0
+    if not output_tokens:
+        output_tokens = estimate_content_tokens(output or "")
+    return int(prompt_tokens), int(output_tokens)
+
+
+def _entry(
+    model: str,
+    prompt_tokens: int = 0,
+    output_tokens: int = 0,
+    latency: float = 0.0,
+    retries: int = 0,
+    cached: bool = False,
+    failed: bool = False,
+) -> Dict[str, Any]:
+    tags = _tags()
+    return {
+        "request_id": tags.get("request_id"),
+        "deck_id": tags.get("deck_id"),
+        "site": tags.get("site") or UNATTRIBUTED_SITE,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "latency": round(latency, 4),
+        "retries": retries,
+        "cached": int(cached),
+        "failed": int(failed),
+        # A cache hit costs nothing
+        "cost": 0.0 if cached else estimate_cost(model, prompt_tokens, output_tokens),
+    }
+
+
+def record_llm_call(model: str, **usage: Any):
+    """
+    Record one logical LLM call under the current usage scope.
+
+    usage: prompt_tokens, output_tokens, latency (seconds, retries included),
+    retries, cached and failed.
+    """
+    entry = _entry(model, **usage)
+    try:
+        usage_ledger.record(entry)
+    except Exception as e:
+        # Accounting must never fail the call it describes
+        print(f"LLM usage ledger error: {e}")
+
+
+async def arecord_llm_call(model: str, **usage: Any):
+    """Async variant of record_llm_call; the write runs off the event loop."""
+    entry = _entry(model, **usage)
+    try:
+        await asyncio.to_thread(usage_ledger.record, entry)
+    except Exception as e:
+        print(f"LLM usage ledger error: {e}")
@@ -0,0 +1,248 @@
+"""Cascade routing: try the cheapest model first and escalate only failing outputs."""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .deadline import DeadlineExceeded
+from .llm_usage import usage_scope
+
+# Relative price per call, used to estimate savings against always using the
+# strongest model of a cascade
+MODEL_COST_WEIGHTS: Dict[str, float] = {
+    "gemini-1.5-flash": 0.75,
+    "gemini-2.5-flash-lite": 1.0,
+    "gemini-2.5-flash": 6.0,
+}
+
+Validator = Callable[[str], bool]
+
+_checking_truncation: ContextVar[bool] = ContextVar(
+    "cascade_truncation_checks", default=False
+)
+
+
+class TruncatedOutput(Exception):
+    """The model stopped at its output token limit; carries the partial output."""
+
+    def __init__(self, output: str):
+        super().__init__("output stopped at the token limit")
+        self.output = output
+
+
+def _cost(model: str) -> float:
+    return MODEL_COST_WEIGHTS.get(model, 1.0)
+
+
+def not_empty(text: str) -> bool:
+    return bool(text and text.strip())
+
+
+def complete_markdown(text: str) -> bool:
+    """Reject output with an unclosed code fence."""
+    return (text or "").count("```") % 2 == 0
+
+
+def finish_reason(response: Any) -> Any:
+    """Finish reason of a Gemini response's first candidate, if the SDK exposes one."""
+    candidates = getattr(response, "candidates", None)
+    return getattr(candidates[0], "finish_reason", None) if candidates else None
+
+
+def hit_token_limit(reason: Any) -> bool:
+    """Whether a finish reason (SDK enum or its name) means the output was cut off."""
+    name = getattr(reason, "name", None) or str(reason or "")
+    return name.rsplit(".", 1)[-1] == "MAX_TOKENS"
+
+
+def check_truncation(output: str, reason: Any) -> str:
+    """
+    Raise TruncatedOutput for output cut off at the token limit, so the
+    cascade escalates it. Outside a cascade the output is returned as is.
+    """
+    if _checking_truncation.get() and hit_token_limit(reason):
+        raise TruncatedOutput(output)
+    return output
+
+
+@contextmanager
+def _truncation_checks():
+    token = _checking_truncation.set(True)
+    try:
+        yield
+    finally:
+        _checking_truncation.reset(token)
+
+
+def strip_code_fence(text: str) -> str:
+    text = (text or "").strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    elif text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def valid_json(text: str) -> bool:
+    try:
+        json.loads(strip_code_fence(text))
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class ModelCascade:
+    """
+    Route one call site through a list of models, cheapest first.
+
+    Each output is checked by the site's validators; a failing output, an
+    output cut off at the token limit, or a failed call is retried on the
+    next model, unless the request's deadline has passed. The last model's
+    output is returned even if it fails validation.
+    """
+
+    def __init__(self, site: str, models: List[str], validators: List[Validator]):
+        self.site = site
+        self.models = list(models)
+        self.validators = list(validators)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.escalations = 0
+        self.served_by: Dict[str, int] = {model: 0 for model in self.models}
+        self._latency: Dict[str, List[float]] = {
+            model: [0.0, 0] for model in self.models
+        }
+
+    def _passes(self, output: str) -> bool:
+        return all(validator(output) for validator in self.validators)
+
+    def _record(self, model: str, elapsed: float):
+        with self._lock:
+            self._latency[model][0] += elapsed
+            self._latency[model][1] += 1
+
+    def _finish(self, model: str, escalated: int):
+        with self._lock:
+            self.calls += 1
+            self.escalations += escalated
+            self.served_by[model] += 1
+
+    def run(self, generate: Callable[[str], str]) -> str:
+        output = ""
+        for index, model in enumerate(self.models):
+            last = index == len(self.models) - 1
+            start_time = time.time()
+            try:
+                with usage_scope(site=self.site), _truncation_checks():
+                    output = generate(model)
+            except DeadlineExceeded:
+                raise
+            except TruncatedOutput as e:
+                output = e.output
+                if not last:
+                    print(f"[{self.site}] {model} hit its token limit, escalating")
+                    continue
+            except Exception as e:
+                if last:
+                    raise
+                print(f"[{self.site}] {model} failed ({e}), escalating")
+                continue
+            finally:
+                self._record(model, time.time() - start_time)
+            if last or self._passes(output):
+                self._finish(model, index)
+                return output
+            print(f"[{self.site}] {model} output failed validation, escalating")
+        return output
+
+    async def arun(self, generate: Callable[[str], Awaitable[str]]) -> str:
+        output = ""
+        for index, model in enumerate(self.models):
+            last = index == len(self.models) - 1
+            start_time = time.time()
+            try:
+                with usage_scope(site=self.site), _truncation_checks():
+                    output = await generate(model)
+            except DeadlineExceeded:
+                raise
+            except TruncatedOutput as e:
+                output = e.output
+                if not last:
+                    print(f"[{self.site}] {model} hit its token limit, escalating")
+                    continue
+            except Exception as e:
+                if last:
+                    raise
+                print(f"[{self.site}] {model} failed ({e}), escalating")
+                continue
+            finally:
+                self._record(model, time.time() - start_time)
+            if last or self._passes(output):
+                self._finish(model, index)
+                return output
+            print(f"[{self.site}] {model} output failed validation, escalating")
+        return output
+
+    def _avg_latency(self, model: str) -> Optional[float]:
+        total, count = self._latency[model]
+        return total / count if count else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            strongest = self.models[-1]
+            # Cost of every attempt made versus one call per item on the strongest model
+            spent = sum(_cost(m) * self._latency[m][1] for m in self.models)
+            baseline = _cost(strongest) * self.calls
+            # Time of every attempt made versus the strongest model's average per item
+            strong_latency = self._avg_latency(strongest)
+            latencies = {m: self._avg_latency(m) for m in self.models}
+            latency_saved = None
+            if strong_latency is not None:
+                latency_saved = strong_latency * self.calls - sum(
+                    self._latency[m][0] for m in self.models
+                )
+            return {
+                "models": self.models,
+                "calls": self.calls,
+                "escalations": self.escalations,
+                "escalation_rate": round(self.escalations / self.calls, 3)
+                if self.calls
+                else 0.0,
+                "served_by": dict(self.served_by),
+                "avg_latency": {
+                    m: round(latency, 3)
+                    for m, latency in latencies.items()
+                    if latency is not None
+                },
+                "estimated_cost_saved_pct": round(100 * (1 - spent / baseline), 1)
+                if baseline
+                else 0.0,
+                "estimated_latency_saved_s": round(latency_saved, 2)
+                if latency_saved is not None
+                else None,
+            }
+
+
+_cascades: Dict[str, ModelCascade] = {}
+_cascades_lock = threading.Lock()
+
+
+def get_cascade(
+    site: str, models: List[str], validators: List[Validator]
+) -> ModelCascade:
+    """Return the shared cascade for a call site, creating it on first use."""
+    with _cascades_lock:
+        if site not in _cascades:
+            _cascades[site] = ModelCascade(site, models, validators)
+        return _cascades[site]
+
+
+def cascade_stats() -> Dict[str, Dict[str, Any]]:
+    with _cascades_lock:
+        cascades = list(_cascades.values())
+    return {cascade.site: cascade.stats() for cascade in cascades}
@@ -0,0 +1,94 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from .context_budget import estimate_tokens
+from .rag_config.rag_models_config import rag_model_config
+
+
+class AdaptiveTopK:
+    """
+    Evidence policy that keeps a small top_k and widens only on thin evidence.
+
+    Retrieval runs once at rag_model_config.top_k and the ranked result is
+    trimmed client-side, so widening costs no extra round trip and every
+    section shares one cached retrieval. The kept prefix is widened (k
+    doubled, up to top_k) when it is full but short on text or its scores
+    are weak. A prefix with fewer than k contexts is final, since nothing
+    else passed the similarity threshold.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections: Dict[str, Dict[str, Any]] = {}
+
+    def schedule(self) -> List[int]:
+        """The k values to try, smallest first."""
+        max_k = rag_model_config.top_k
+        k = min(rag_model_config.adaptive_initial_k, max_k)
+        steps = [k]
+        while k < max_k:
+            k = min(k * 2, max_k)
+            steps.append(k)
+        return steps
+
+    def is_sufficient(self, contexts: List[Dict[str, Any]], k: int) -> bool:
+        if len(contexts) < k:
+            return True
+        tokens = sum(estimate_tokens(ctx["text"]) for ctx in contexts)
+        if tokens < rag_model_config.adaptive_min_tokens:
+            return False
+        # Scores are vector distances: lower means closer
+        scores = [ctx["score"] for ctx in contexts if ctx.get("score") is not None]
+        if (
+            scores
+            and sum(scores) / len(scores) > rag_model_config.adaptive_max_distance
+        ):
+            return False
+        return True
+
+    def trim(
+        self, contexts: List[Dict[str, Any]], section: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Keep the smallest ranked prefix of a top_k result whose evidence is sufficient."""
+        for widenings, k in enumerate(self.schedule()):
+            if self.is_sufficient(contexts[:k], k):
+                break
+        self.record(section, contexts[:k], contexts[k:], widenings)
+        return contexts[:k]
+
+    def record(
+        self,
+        section: Optional[str],
+        contexts: List[Dict[str, Any]],
+        dropped: List[Dict[str, Any]],
+        widenings: int,
+    ):
+        """Track contexts kept and the tokens of the contexts trimmed away."""
+        tokens_saved = sum(estimate_tokens(ctx["text"]) for ctx in dropped)
+        with self._lock:
+            entry = self._sections.setdefault(
+                section or "default",
+                {"queries": 0, "contexts": 0, "widenings": 0, "tokens_saved": 0},
+            )
+            entry["queries"] += 1
+            entry["contexts"] += len(contexts)
+            entry["widenings"] += widenings
+            entry["tokens_saved"] += tokens_saved
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                section: {
+                    **entry,
+                    "avg_contexts": round(entry["contexts"] / entry["queries"], 2),
+                }
+                for section, entry in self._sections.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._sections.clear()
+
+
+# Global instance
+adaptive_top_k = AdaptiveTopK()
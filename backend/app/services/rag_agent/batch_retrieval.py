@@ -0,0 +1,128 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from ..deadline import DeadlineExceeded
+from .rag_config.rag_cache import context_id, normalize_query
+from .rag_config.rag_models_config import rag_model_config
+from .section_tools import build_section_queries
+from .tools.base_tool import aretrieve_adaptive, aretrieve_contexts
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[List[Dict[str, Any]]], k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Fuse ranked context lists with RRF: score(d) = sum(1 / (k + rank))."""
+    k = k or rag_model_config.rrf_k
+    scores: Dict[str, float] = {}
+    first_seen: Dict[str, Dict[str, Any]] = {}
+    for ranked in ranked_lists:
+        for rank, ctx in enumerate(ranked, 1):
+            cid = context_id(ctx["text"])
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(cid, ctx)
+
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [
+        {**first_seen[cid], "id": cid, "rrf_score": round(score, 6)}
+        for cid, score in fused
+    ]
+
+
+async def batch_retrieve(
+    section_queries: Dict[str, str],
+    paraphrases: Optional[Dict[str, List[str]]] = None,
+    corpus_name: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run all section queries (and their paraphrases) concurrently in one call.
+
+    Identical queries are issued once. Without an explicit top_k each query
+    uses the adaptive top_k policy. Each section's result lists are fused
+    with RRF and truncated to top_k; every list is also fused into one global
+    ranking across the whole memo.
+
+    A failed query is left out of the fusion and its sections are listed in
+    "errors", so callers can tell missing evidence from evidence that could
+    not be retrieved.
+
+    Returns:
+        dict: {"sections": {section: [contexts]}, "fused": [contexts],
+               "errors": {section: error}, "queries": int,
+               "execution_time": float}
+    """
+    adaptive = top_k is None and rag_model_config.adaptive_top_k_enabled
+    top_k = top_k or rag_model_config.top_k
+    start_time = time.time()
+
+    section_jobs: Dict[str, List[str]] = {}
+    for section, query in section_queries.items():
+        section_jobs[section] = [query] + list((paraphrases or {}).get(section, []))
+
+    # Overlapping section queries collapse onto one request
+    unique_queries: Dict[str, str] = {}
+    query_sections: Dict[str, str] = {}
+    for section, queries in section_jobs.items():
+        for query in queries:
+            unique_queries.setdefault(normalize_query(query), query)
+            query_sections.setdefault(normalize_query(query), section)
+
+    results = await asyncio.gather(
+        *(
+            aretrieve_adaptive(
+                query, query_sections[normalized], corpus_name=corpus_name
+            )
+            if adaptive
+            else aretrieve_contexts(query, corpus_name=corpus_name, top_k=top_k)
+            for normalized, query in unique_queries.items()
+        ),
+        return_exceptions=True,
+    )
+    by_query: Dict[str, List[Dict[str, Any]]] = {}
+    failed: Dict[str, str] = {}
+    for normalized, result in zip(unique_queries, results):
+        if isinstance(result, DeadlineExceeded):
+            raise result
+        if isinstance(result, BaseException):
+            print(f"Batched RAG query error: {str(result)}")
+            failed[normalized] = str(result)
+            continue
+        by_query[normalized] = result
+
+    sections = {}
+    errors: Dict[str, str] = {}
+    all_lists = []
+    for section, queries in section_jobs.items():
+        ranked_lists = []
+        for query in queries:
+            normalized = normalize_query(query)
+            if normalized in failed:
+                errors[section] = failed[normalized]
+            else:
+                ranked_lists.append(by_query[normalized])
+        all_lists.extend(ranked_lists)
+        sections[section] = reciprocal_rank_fusion(ranked_lists)[:top_k]
+
+    return {
+        "sections": sections,
+        "fused": reciprocal_rank_fusion(all_lists),
+        "errors": errors,
+        "queries": len(unique_queries),
+        "execution_time": round(time.time() - start_time, 2),
+    }
+
+
+async def batch_retrieve_sections(
+    query: str,
+    paraphrases: Optional[Dict[str, List[str]]] = None,
+    corpus_name: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Retrieve evidence for all 12 deal-note sections in one round trip."""
+    return await batch_retrieve(
+        build_section_queries(query),
+        paraphrases=paraphrases,
+        corpus_name=corpus_name,
+        top_k=top_k,
+    )
@@ -0,0 +1,111 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from .rag_config.rag_cache import context_id
+from .rag_config.rag_models_config import rag_model_config
+
+_current_budget: ContextVar[Optional["ContextBudget"]] = ContextVar(
+    "context_budget", default=None
+)
+
+BUDGET_EXHAUSTED_MESSAGE = (
+    "Context budget for this analysis is exhausted. "
+    "Write the Final Answer from the evidence already gathered."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+class ContextBudget:
+    """Per-run tracker that dedupes retrieved chunks and caps observation size."""
+
+    def __init__(
+        self,
+        observation_token_budget: int = 1500,
+        run_token_budget: int = 12000,
+    ):
+        self.observation_token_budget = observation_token_budget
+        self.run_token_budget = run_token_budget
+        self._refs: Dict[str, str] = {}
+        self.tokens_used = 0
+        self.raw_tokens = 0
+        self.observations = 0
+        self.duplicates_replaced = 0
+        self.contexts_trimmed = 0
+
+    def render(self, contexts: List[Dict[str, Any]]) -> str:
+        """Format contexts for one observation within the remaining budget."""
+        self.observations += 1
+        self.raw_tokens += sum(
+            estimate_tokens(f"[Source {i}]: {ctx['text']}")
+            for i, ctx in enumerate(contexts, 1)
+        )
+
+        blocks = []
+        observation_tokens = 0
+        for ctx in contexts:
+            cid = context_id(ctx["text"])
+            if cid in self._refs:
+                block = f"[Source {self._refs[cid]}]: (same evidence as shown earlier)"
+                self.duplicates_replaced += 1
+            else:
+                remaining = min(
+                    self.observation_token_budget - observation_tokens,
+                    self.run_token_budget - self.tokens_used - observation_tokens,
+                )
+                if remaining <= 0:
+                    self.contexts_trimmed += 1
+                    continue
+                text = ctx["text"]
+                if estimate_tokens(text) > remaining:
+                    text = text[: remaining * 4].rstrip() + " ..."
+                    self.contexts_trimmed += 1
+                ref = f"E{len(self._refs) + 1}"
+                self._refs[cid] = ref
+                block = f"[Source {ref}]: {text}"
+            blocks.append(block)
+            observation_tokens += estimate_tokens(block)
+
+        self.tokens_used += observation_tokens
+        if not blocks and contexts:
+            return BUDGET_EXHAUSTED_MESSAGE
+        return "\n\n".join(blocks)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "observations": self.observations,
+            "unique_chunks": len(self._refs),
+            "duplicates_replaced": self.duplicates_replaced,
+            "contexts_trimmed": self.contexts_trimmed,
+            "observation_tokens": self.tokens_used,
+            "observation_tokens_without_budget": self.raw_tokens,
+            "observation_tokens_saved": max(self.raw_tokens - self.tokens_used, 0),
+        }
+
+
+def current_context_budget() -> Optional[ContextBudget]:
+    return _current_budget.get()
+
+
+@contextmanager
+def context_budget_scope(enabled: Optional[bool] = None):
+    """Install a fresh ContextBudget for the duration of one analysis run."""
+    if enabled is None:
+        enabled = rag_model_config.context_budget_enabled
+    budget = (
+        ContextBudget(
+            observation_token_budget=rag_model_config.observation_token_budget,
+            run_token_budget=rag_model_config.run_token_budget,
+        )
+        if enabled
+        else None
+    )
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
@@ -0,0 +1,153 @@
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .rag_config.rag_cache import normalize_query
+from .rag_config.rag_models_config import rag_model_config
+from .section_tools import SECTION_TOOLS, SectionTool
+
+_current_controller: ContextVar[Optional["ToolCoverageController"]] = ContextVar(
+    "coverage_controller", default=None
+)
+
+REPEATED_CALL_NOTE = (
+    "(Repeated call: this is the same evidence already returned for this "
+    "section. Move on to a section that has not been covered yet.)"
+)
+
+
+def _memo_key(section: str, query: str) -> Tuple[str, str]:
+    # Near-identical inputs differ only in case, spacing or punctuation
+    return section, re.sub(r"[^a-z0-9 ]", "", normalize_query(query))
+
+
+class ToolCoverageController:
+    """Per-run memo of tool observations that tracks which sections are covered."""
+
+    def __init__(self, section_names: List[str], grace_iterations: int = 2):
+        self.section_names = list(section_names)
+        self.grace_iterations = grace_iterations
+        self.covered: Dict[str, int] = {}
+        self._observations: Dict[Tuple[str, str], str] = {}
+        self.tool_calls = 0
+        self.memoized_calls = 0
+        self.iterations_used = 0
+        self.stopped_early = False
+        self._completed_at_iteration: Optional[int] = None
+
+    @property
+    def missing(self) -> List[str]:
+        return [name for name in self.section_names if name not in self.covered]
+
+    def is_complete(self) -> bool:
+        return not self.missing
+
+    def _lookup(self, section: str, query: str) -> Optional[str]:
+        self.tool_calls += 1
+        observation = self._observations.get(_memo_key(section, query))
+        if observation is not None:
+            self.memoized_calls += 1
+            return f"{REPEATED_CALL_NOTE}\n\n{observation}"
+        return None
+
+    def _record(self, section: str, query: str, observation: str) -> str:
+        # The RAG tools return "" when retrieval fails; keep the section
+        # missing so the agent retries it instead of replaying the failure
+        if not observation.strip():
+            return observation
+        self._observations[_memo_key(section, query)] = observation
+        self.covered[section] = self.covered.get(section, 0) + 1
+        return observation
+
+    def _guidance(self) -> str:
+        if self.is_complete():
+            return (
+                f"\n\nAll {len(self.section_names)} sections have been covered. "
+                "Do not call any more tools; write the Final Answer now."
+            )
+        return f"\n\nSections not yet covered: {', '.join(self.missing)}"
+
+    def run_sync(self, section: str, query: str, func: Callable[[str], str]) -> str:
+        observation = self._lookup(section, query)
+        if observation is None:
+            observation = self._record(section, query, func(query))
+        return observation + self._guidance()
+
+    async def run(
+        self, section: str, query: str, coroutine: Callable[[str], Awaitable[str]]
+    ) -> str:
+        observation = self._lookup(section, query)
+        if observation is None:
+            observation = self._record(section, query, await coroutine(query))
+        return observation + self._guidance()
+
+    def should_stop(self, iterations: int) -> bool:
+        """Stop the loop a few iterations after coverage is complete."""
+        self.iterations_used = iterations
+        if not self.is_complete():
+            return False
+        if self._completed_at_iteration is None:
+            self._completed_at_iteration = iterations
+        if iterations >= self._completed_at_iteration + self.grace_iterations:
+            self.stopped_early = True
+            return True
+        return False
+
+    def stats(self, max_iterations: int) -> Dict[str, Any]:
+        return {
+            "sections_covered": len(self.covered),
+            "sections_missing": self.missing,
+            "tool_calls": self.tool_calls,
+            "memoized_calls": self.memoized_calls,
+            "iterations_used": self.iterations_used,
+            # Iteration at which all sections were covered, if they were
+            "covered_at_iteration": self._completed_at_iteration,
+            # Headroom under the cap, not a saving: runs rarely get near
+            # max_iterations; compare iterations_used with a run that has
+            # coverage_control_enabled=False to measure what stopping saves
+            "iterations_remaining": max(max_iterations - self.iterations_used, 0),
+            "stopped_early": self.stopped_early,
+        }
+
+
+def current_coverage_controller() -> Optional[ToolCoverageController]:
+    return _current_controller.get()
+
+
+@contextmanager
+def coverage_scope(enabled: Optional[bool] = None):
+    """Install a fresh ToolCoverageController for one agent run."""
+    if enabled is None:
+        enabled = rag_model_config.coverage_control_enabled
+    controller = (
+        ToolCoverageController(
+            [section.name for section in SECTION_TOOLS],
+            grace_iterations=rag_model_config.coverage_grace_iterations,
+        )
+        if enabled
+        else None
+    )
+    token = _current_controller.set(controller)
+    try:
+        yield controller
+    finally:
+        _current_controller.reset(token)
+
+
+def controlled_tool(section: SectionTool):
+    """Wrap a section's sync and async tools so calls go through the run's controller."""
+
+    def func(query: str) -> str:
+        controller = current_coverage_controller()
+        if controller is None:
+            return section.func(query)
+        return controller.run_sync(section.name, query, section.func)
+
+    async def coroutine(query: str) -> str:
+        controller = current_coverage_controller()
+        if controller is None:
+            return await section.coroutine(query)
+        return await controller.run(section.name, query, section.coroutine)
+
+    return func, coroutine
@@ -1,99 +1,81 @@
-from ...prompts.comprehensive_deal_note_prompt import COMPREHENSIVE_DEAL_NOTE_PROMPT
-from langchain.tools import Tool
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain.agents.format_scratchpad import format_log_to_str
 from langchain.prompts import PromptTemplate
-from langchain.agents import create_react_agent, AgentExecutor
-from .rag_config.rag_models_config import rag_model_config
-from .tools.team_overview_tool import team_overview_tool
-from .tools.problem_statement_tool import problem_statement_tool
-from .tools.problem_solution_tool import solution_tool
-from .tools.business_model_tool import business_model_tool
-from .tools.differentiation_tool import differentiation_tool
-from .tools.market_opportunity_tool import market_opportunity_tool
-from .tools.market_strategy_tool import gtm_strategy_tool
-from .tools.traction_tool import traction_tool
-from .tools.product_architecture_tool import product_architecture_tool
-from .tools.risk_mitigation_tool import risks_mitigations_tool
-from .tools.exit_potential_tool import exit_potentials_tool
-from .tools.funding_details_tool import funding_details_tool
+from langchain.tools import Tool
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tools import render_text_description
+
+from ...prompts.comprehensive_deal_note_prompt import COMPREHENSIVE_DEAL_NOTE_PROMPT
+from .coverage_controller import controlled_tool, current_coverage_controller
 from .rag_config.rag_llm import llm
+from .rag_config.rag_models_config import rag_model_config
+from .section_tools import SECTION_TOOLS
+
+# The executor holds no per-request state (corpus and company are bound per
+# request through rag_request_scope), so one instance serves every request.
+_agent_executor: Optional[AgentExecutor] = None
+_agent_lock = threading.Lock()
+agent_build_time: Optional[float] = None
+
+# Create comprehensive prompt template with fixed ReAct format
+DEAL_NOTE_PROMPT = PromptTemplate(
+    input_variables=["input", "agent_scratchpad", "tools", "tool_names"],
+    template=COMPREHENSIVE_DEAL_NOTE_PROMPT,
+)
+FINAL_ANSWER_MARKER = "Final Answer:"
+FINAL_ANSWER_SUFFIX = (
+    "\nThought: All sections have been covered. I now know the final answer."
+    f"\n{FINAL_ANSWER_MARKER}"
+)
+
+
+class FinalAnswerCallback(BaseCallbackHandler):
+    """Record whether the agent reached a real Final Answer."""
+
+    def __init__(self):
+        self.final_answer = False
+
+    def on_agent_finish(self, finish: Any, **kwargs):
+        # A run forced to stop (iteration or time limit) finishes with the
+        # executor's canned message and an empty log
+        self.final_answer = FINAL_ANSWER_MARKER in (getattr(finish, "log", "") or "")
+
+
+class CoverageAwareAgentExecutor(AgentExecutor):
+    """AgentExecutor that also stops once the run's controller reports full coverage"""
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        controller = current_coverage_controller()
+        if controller is not None and controller.should_stop(iterations):
+            print(f"All sections covered, stopping agent after {iterations} iterations")
+            return False
+        return super()._should_continue(iterations, time_elapsed)
 
 
 def create_comprehensive_agent():
     """Create the comprehensive agent with all 12 specialized tools"""
 
-    # Define all 12 specialized tools
-    tools = [
-        Tool(
-            name="Team_Overview",
-            func=team_overview_tool,
-            description="Extract team and leadership information: founders, team bios, roles, skills, education, experience, team composition, advisory board.",
-        ),
-        Tool(
-            name="Problem_Statement",
-            func=problem_statement_tool,
-            description="Extract problem statement: specific problems addressed, market pain points, customer challenges, unmet needs.",
-        ),
-        Tool(
-            name="Solution",
-            func=solution_tool,
-            description="Extract solution information: product features, value proposition, how it addresses problems, capabilities, benefits.",
-        ),
-        Tool(
-            name="Differentiation",
-            func=differentiation_tool,
-            description="Extract competitive differentiation: unique selling points, IP, competitive edge, barriers to entry, moats.",
-        ),
-        Tool(
-            name="Market_Opportunity",
-            func=market_opportunity_tool,
-            description="Extract market opportunity: market size (TAM/SAM/SOM), trends, growth rates, target users, competitors.",
-        ),
-        Tool(
-            name="Business_Model",
-            func=business_model_tool,
-            description="Extract business model: revenue sources, pricing, revenue metrics, unit economics, monetization strategy.",
-        ),
-        Tool(
-            name="Traction",
-            func=traction_tool,
-            description="Extract traction data: adoption, growth (ARR, MRR, DAU, MAU), MoM/YoY growth, churn, milestones.",
-        ),
-        Tool(
-            name="Product_Architecture",
-            func=product_architecture_tool,
-            description="Extract technical architecture: tech stack, operational infrastructure, system architecture, integrations.",
-        ),
-        Tool(
-            name="GTM_Strategy",
-            func=gtm_strategy_tool,
-            description="Extract go-to-market strategy: sales channels, marketing, partnerships, customer acquisition strategy.",
-        ),
-        Tool(
-            name="Funding_Details",
-            func=funding_details_tool,
-            description="Extract funding information: stage, amount raised, investors, cap table, runway, use of funds.",
-        ),
-        Tool(
-            name="Risks_Mitigations",
-            func=risks_mitigations_tool,
-            description="Extract risk analysis: identified risks (market, tech, regulatory, execution) and mitigation plans.",
-        ),
-        Tool(
-            name="Exit_Potentials",
-            func=exit_potentials_tool,
-            description="Extract exit strategy: IPO potential, acquisition opportunities, M&A prospects, exit pathways.",
-        ),
-    ]
-
-    # Create comprehensive prompt template with fixed ReAct format
-    prompt = PromptTemplate(
-        input_variables=["input", "agent_scratchpad", "tools", "tool_names"],
-        template=COMPREHENSIVE_DEAL_NOTE_PROMPT,
-    )
+    # Define all 12 specialized tools; the coroutine lets acall await retrievals
+    # and both go through the run's coverage controller when one is active
+    tools = []
+    for section in SECTION_TOOLS:
+        func, coroutine = controlled_tool(section)
+        tools.append(
+            Tool(
+                name=section.name,
+                func=func,
+                coroutine=coroutine,
+                description=section.description,
+            )
+        )
 
-    agent = create_react_agent(llm=llm, tools=tools, prompt=prompt)
+    agent = create_react_agent(llm=llm, tools=tools, prompt=DEAL_NOTE_PROMPT)
 
-    agent_executor = AgentExecutor(
+    agent_executor = CoverageAwareAgentExecutor(
         agent=agent,
         tools=tools,
         verbose=True,
@@ -102,3 +84,35 @@ def create_comprehensive_agent():
         handle_parsing_errors=True,
     )
     return agent_executor
+
+
+def get_comprehensive_agent() -> AgentExecutor:
+    """Return the shared agent executor, building it on first use"""
+    global _agent_executor, agent_build_time
+    if _agent_executor is None:
+        with _agent_lock:
+            if _agent_executor is None:
+                start_time = time.time()
+                _agent_executor = create_comprehensive_agent()
+                agent_build_time = round(time.time() - start_time, 4)
+                print(f"Built deal-note agent in {agent_build_time}s")
+    return _agent_executor
+
+
+async def generate_final_answer(
+    agent_executor: AgentExecutor,
+    query: str,
+    intermediate_steps: List[Tuple[Any, str]],
+    callbacks: Optional[list] = None,
+) -> str:
+    """Ask the LLM for the Final Answer from the steps gathered so far"""
+    prompt = DEAL_NOTE_PROMPT.format(
+        input=query,
+        agent_scratchpad=format_log_to_str(intermediate_steps),
+        tools=render_text_description(list(agent_executor.tools)),
+        tool_names=", ".join(tool.name for tool in agent_executor.tools),
+    )
+    output = await llm.ainvoke(
+        prompt + FINAL_ANSWER_SUFFIX, config={"callbacks": callbacks or []}
+    )
+    return output.strip()
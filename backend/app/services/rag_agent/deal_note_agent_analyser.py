@@ -1,27 +1,129 @@
 import asyncio
-from typing import Any, Dict
 import time
-from .deal_note_agent import create_comprehensive_agent
+from typing import Any, Dict, Optional
 
+from ...prompts.comprehensive_deal_note_prompt import (
+    COMPREHENSIVE_DEAL_NOTE_PROMPT_VERSION,
+)
+from ...storage.chunk_store import chunk_store
+from ...storage.section_cache import section_cache
+from ..deadline import DeadlineExceeded
+from ..llm_usage import usage_scope
+from . import deal_note_agent
+from .context_budget import context_budget_scope, estimate_tokens
+from .coverage_controller import coverage_scope
+from .deal_note_agent import (
+    FinalAnswerCallback,
+    generate_final_answer,
+    get_comprehensive_agent,
+)
+from .llm_timing import LLMTimingCallback
+from .rag_config.rag_context import rag_request_scope
+from .rag_config.rag_models_config import rag_model_config
 
-async def analyze_comprehensive(query: str) -> Dict[str, Any]:
+AGENT_MEMO_SECTION = "__agent_memo__"
+
+
+async def analyze_comprehensive(
+    query: str,
+    corpus_name: Optional[str] = None,
+    company_name: Optional[str] = None,
+    context_budget: Optional[bool] = None,
+    use_cache: Optional[bool] = None,
+    deck_id: Optional[str] = None,
+) -> Dict[str, Any]:
     """Run comprehensive 12-section investment analysis"""
+    if use_cache is None:
+        use_cache = rag_model_config.section_cache_enabled
     try:
         print("Starting comprehensive 12-section analysis...")
         print(f"Query: {query}")
-        agent_executor = await asyncio.to_thread(create_comprehensive_agent)
-        start_time = time.time()
-        result = await agent_executor.acall({"input": query})
-        execution_time = time.time() - start_time
+        # The whole memo is memoized per corpus version; the agent's free-form
+        # tool calls leave no stable per-section evidence to key on
+        corpus_version = None
+        if use_cache and company_name:
+            corpus_version = await asyncio.to_thread(
+                chunk_store.corpus_version, deck_id or company_name
+            )
+        memo_key = (
+            AGENT_MEMO_SECTION,
+            f"{COMPREHENSIVE_DEAL_NOTE_PROMPT_VERSION}:{query}",
+            rag_model_config.model_name,
+        )
+        if corpus_version:
+            cached = await asyncio.to_thread(
+                section_cache.get, corpus_version, *memo_key
+            )
+            if cached is not None:
+                print(f"Serving memoized deal note for corpus version {corpus_version}")
+                return {
+                    "query": query,
+                    "engine": "agent",
+                    "comprehensive_analysis": cached["markdown"],
+                    "execution_time": 0.0,
+                    "corpus_version": corpus_version,
+                    "cached": "corpus",
+                }
+        setup_start = time.time()
+        agent_executor = get_comprehensive_agent()
+        setup_time = time.time() - setup_start
+        llm_timing = LLMTimingCallback()
+        final_answer = FinalAnswerCallback()
+        with (
+            rag_request_scope(corpus_name, company_name, deck_id),
+            usage_scope(site="agent", deck_id=deck_id),
+            context_budget_scope(enabled=context_budget) as budget,
+            coverage_scope() as controller,
+        ):
+            start_time = time.time()
+            result = await agent_executor.acall(
+                {"input": query}, callbacks=[llm_timing, final_answer]
+            )
+            if controller is not None:
+                controller.iterations_used = len(result.get("intermediate_steps", []))
+            completed = final_answer.final_answer
+            if controller is not None and controller.stopped_early:
+                # The loop was cut short after full coverage; write the answer now
+                result["output"] = await generate_final_answer(
+                    agent_executor,
+                    query,
+                    result.get("intermediate_steps", []),
+                    callbacks=[llm_timing],
+                )
+                completed = True
+            execution_time = time.time() - start_time
+
+        output = result.get("output")
+        # Only a finished memo is memoized; a run stopped at the iteration or
+        # time limit would otherwise be served for the whole corpus version
+        if corpus_version and output and completed:
+            await asyncio.to_thread(
+                section_cache.set, corpus_version, *memo_key, corpus_version, output
+            )
 
         # Format results
         analysis_result = {
             "query": query,
+            "engine": "agent",
             "comprehensive_analysis": result.get("output", "No analysis generated"),
             "execution_time": round(execution_time, 2),
+            "setup_time": round(setup_time, 4),
+            "agent_build_time": deal_note_agent.agent_build_time,
             "tools_used": len(result.get("intermediate_steps", [])),
+            "corpus_version": corpus_version,
+            "cached": None,
+            "completed": completed,
             "sections_analyzed": [],
             "tool_breakdown": {},
+            "scratchpad_tokens": sum(
+                estimate_tokens(action.log) + estimate_tokens(str(observation))
+                for action, observation in result.get("intermediate_steps", [])
+            ),
+            "llm_stats": llm_timing.stats(),
+            "context_budget": budget.stats() if budget else None,
+            "coverage": controller.stats(rag_model_config.max_iterations)
+            if controller
+            else None,
         }
 
         # Analyze which tools were used
@@ -36,8 +138,16 @@ async def analyze_comprehensive(query: str) -> Dict[str, Any]:
 
             analysis_result["tool_breakdown"] = tools_used
 
+        print(
+            f"Scratchpad tokens: {analysis_result['scratchpad_tokens']}, "
+            f"LLM time: {analysis_result['llm_stats']['llm_time']}s "
+            f"(context budget {'on' if budget else 'off'})"
+        )
+
         return analysis_result
 
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         return {
             "query": query,
@@ -1,11 +1,29 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from .deal_note_agent_analyser import analyze_comprehensive
+from .section_engine import analyze_sections_parallel
+from .rag_config.rag_cache import retrieval_cache
+from .rag_config.rag_llm import get_llm
+from .rag_config.rag_models_config import rag_model_config
+
+ENGINE_MODES = ("agent", "parallel")
 
 
 async def generate_full_investment_report(
     company_name: str = "Target Company",
+    corpus_name: Optional[str] = None,
+    context_budget: Optional[bool] = None,
+    engine: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+    deck_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Generate complete investment report covering all 12 sections"""
+    engine = engine or rag_model_config.engine_mode
+    if engine not in ENGINE_MODES:
+        raise ValueError(f"Unknown deal-note engine: {engine}")
+    if engine == "parallel":
+        return await analyze_sections_parallel(
+            company_name, corpus_name=corpus_name, use_cache=use_cache, deck_id=deck_id
+        )
 
     comprehensive_query = f"""
         Generate a complete investment analysis report for {company_name} covering all 12 critical areas:
@@ -25,4 +43,66 @@ async def generate_full_investment_report(
         
         Provide comprehensive analysis with specific details, metrics, and insights for each section.
         """
-    return await analyze_comprehensive(comprehensive_query)
+    return await analyze_comprehensive(
+        comprehensive_query,
+        corpus_name=corpus_name,
+        company_name=company_name,
+        context_budget=context_budget,
+        use_cache=use_cache,
+        deck_id=deck_id,
+    )
+
+
+async def generate_preview_report(
+    company_name: str = "Target Company",
+    corpus_name: Optional[str] = None,
+    deck_id: Optional[str] = None,
+    section_names: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Quick triage memo on a cheaper model over a subset of sections.
+
+    Retrieval runs exactly as in the full memo and only the evidence passed
+    to the model is trimmed, so the retrieval cache already holds these
+    sections when the full memo is generated afterwards.
+    """
+    report = await analyze_sections_parallel(
+        company_name,
+        section_names=section_names or rag_model_config.preview_sections,
+        llm=get_llm(rag_model_config.preview_model_name),
+        corpus_name=corpus_name,
+        deck_id=deck_id,
+        max_contexts=rag_model_config.preview_max_contexts,
+    )
+    report["preview"] = True
+    return report
+
+
+async def benchmark_engines(
+    company_name: str = "Target Company",
+    corpus_name: Optional[str] = None,
+    deck_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the agent and parallel engines back to back and compare cost and latency"""
+    comparison = {}
+    for engine in ENGINE_MODES:
+        # Each engine pays for its own retrievals
+        retrieval_cache.clear()
+        report = await generate_full_investment_report(
+            company_name,
+            corpus_name=corpus_name,
+            engine=engine,
+            use_cache=False,
+            deck_id=deck_id,
+        )
+        llm_stats = report.get("llm_stats", {})
+        comparison[engine] = {
+            "execution_time": report.get("execution_time"),
+            "llm_calls": llm_stats.get("llm_calls"),
+            "llm_time": llm_stats.get("llm_time"),
+            "prompt_tokens": llm_stats.get("prompt_tokens"),
+            "output_tokens": llm_stats.get("output_tokens"),
+            "error": report.get("error"),
+        }
+        print(f"[{engine}] {comparison[engine]}")
+    return comparison
@@ -0,0 +1,54 @@
+import time
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .context_budget import estimate_tokens
+
+
+class LLMTimingCallback(BaseCallbackHandler):
+    """Collect LLM latency and prompt size for one agent run."""
+
+    def __init__(self):
+        self._starts: Dict[UUID, float] = {}
+        self.llm_calls = 0
+        self.llm_time = 0.0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.max_prompt_tokens = 0
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs
+    ):
+        self._starts[run_id] = time.time()
+        prompt_tokens = sum(estimate_tokens(prompt) for prompt in prompts)
+        self.prompt_tokens += prompt_tokens
+        self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs):
+        for generations in getattr(response, "generations", []):
+            for generation in generations:
+                self.output_tokens += estimate_tokens(generation.text)
+        self._finish(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._finish(run_id)
+
+    def _finish(self, run_id: UUID):
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            self.llm_calls += 1
+            self.llm_time += time.time() - start
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "llm_calls": self.llm_calls,
+            "llm_time": round(self.llm_time, 2),
+            "avg_llm_latency": round(self.llm_time / self.llm_calls, 2)
+            if self.llm_calls
+            else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "max_prompt_tokens": self.max_prompt_tokens,
+        }
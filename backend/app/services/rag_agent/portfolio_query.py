@@ -0,0 +1,278 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...prompts.portfolio_query_prompt import (
+    PORTFOLIO_MERGE_PROMPT,
+    PORTFOLIO_QUERY_PROMPT,
+)
+from ...storage.deck_registry import DeckRecord, deck_registry
+from ..deadline import DeadlineExceeded
+from ..llm_usage import usage_scope
+from .context_budget import estimate_tokens
+from .llm_timing import LLMTimingCallback
+from .rag_config.rag_llm import llm as default_llm
+from .rag_config.rag_models_config import rag_model_config
+from .tools.base_tool import alist_corpus_files, aretrieve_contexts
+
+
+def _best_score(contexts: List[Dict[str, Any]]) -> Optional[float]:
+    scores = [ctx["score"] for ctx in contexts if ctx.get("score") is not None]
+    return min(scores) if scores else None
+
+
+def merge_by_company(
+    decks: List[DeckRecord], results: Dict[str, List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Group evidence per deck and rank companies by their closest context."""
+    merged = [
+        {
+            "deck_id": deck.deck_id,
+            "company_name": deck.company_name,
+            "best_score": _best_score(results.get(deck.deck_id, [])),
+            "evidence": results.get(deck.deck_id, []),
+        }
+        for deck in decks
+    ]
+    # Scores are vector distances; decks without evidence go last
+    merged.sort(
+        key=lambda entry: (
+            not entry["evidence"],
+            entry["best_score"] is None,
+            entry["best_score"] or 0.0,
+        )
+    )
+    return merged
+
+
+async def _gather_by_deck(
+    decks: List[DeckRecord], query_deck
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """
+    Run query_deck for every deck with bounded parallelism.
+
+    Returns the contexts per deck and the error per deck whose query failed.
+    """
+    semaphore = asyncio.Semaphore(rag_model_config.portfolio_concurrency)
+
+    async def bounded(deck: DeckRecord) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await query_deck(deck)
+
+    results = await asyncio.gather(
+        *(bounded(deck) for deck in decks), return_exceptions=True
+    )
+    by_deck = {}
+    errors: Dict[str, str] = {}
+    for deck, result in zip(decks, results):
+        if isinstance(result, DeadlineExceeded):
+            raise result
+        if isinstance(result, BaseException):
+            print(f"Portfolio query error for {deck.deck_id}: {str(result)}")
+            errors[deck.deck_id] = str(result)
+            continue
+        by_deck[deck.deck_id] = result
+    return by_deck, errors
+
+
+async def _fan_out(
+    question: str, decks: List[DeckRecord], top_k: int
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """Query every deck's own corpus."""
+
+    async def query_deck(deck: DeckRecord) -> List[Dict[str, Any]]:
+        if not deck.corpus_name:
+            return []
+        return await aretrieve_contexts(
+            question, corpus_name=deck.corpus_name, top_k=top_k
+        )
+
+    return await _gather_by_deck(decks, query_deck)
+
+
+def _deck_file_ids(
+    files: List[Dict[str, Any]], decks: List[DeckRecord]
+) -> Dict[str, List[str]]:
+    """Map each deck to its files in a shared corpus."""
+    # Every deck's jsonl is uploaded under gs://<bucket>/<deck_id>/
+    file_ids: Dict[str, List[str]] = {deck.deck_id: [] for deck in decks}
+    for rag_file in files:
+        for deck in decks:
+            if any(f"/{deck.deck_id}/" in uri for uri in rag_file["uris"]):
+                file_ids[deck.deck_id].append(rag_file["file_id"])
+                break
+    return file_ids
+
+
+async def _query_shared_corpus(
+    question: str, decks: List[DeckRecord], corpus_name: str, top_k: int
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """
+    Query one corpus holding many decks, once per deck.
+
+    Each query is restricted server-side to the deck's own files, so every
+    deck gets its own top_k instead of competing for one global top_k.
+    """
+    file_ids = _deck_file_ids(await alist_corpus_files(corpus_name), decks)
+
+    async def query_deck(deck: DeckRecord) -> List[Dict[str, Any]]:
+        if not file_ids[deck.deck_id]:
+            return []
+        return await aretrieve_contexts(
+            question,
+            corpus_name=corpus_name,
+            top_k=top_k,
+            rag_file_ids=file_ids[deck.deck_id],
+        )
+
+    return await _gather_by_deck(decks, query_deck)
+
+
+def _cap_evidence(
+    contexts: List[Dict[str, Any]], max_tokens: int
+) -> List[Dict[str, Any]]:
+    """Keep a company's best contexts within max_tokens, truncating the last."""
+    capped, used = [], 0
+    for ctx in contexts:
+        tokens = estimate_tokens(ctx["text"])
+        if used + tokens > max_tokens:
+            remaining_chars = (max_tokens - used) * 4
+            if remaining_chars > 0:
+                capped.append({**ctx, "text": ctx["text"][:remaining_chars] + "..."})
+            break
+        capped.append(ctx)
+        used += tokens
+    return capped
+
+
+def _format_company(entry: Dict[str, Any]) -> str:
+    evidence = _cap_evidence(
+        entry["evidence"], rag_model_config.portfolio_tokens_per_deck
+    )
+    texts = [
+        f"[{entry['company_name']}, Source {i}]: {ctx['text']}"
+        for i, ctx in enumerate(evidence, 1)
+    ]
+    if entry.get("error"):
+        # Not the same as a company with nothing relevant in its deck
+        return f"### {entry['company_name']}\nEvidence could not be retrieved."
+    return f"### {entry['company_name']}\n" + (
+        "\n\n".join(texts) if texts else "No evidence retrieved."
+    )
+
+
+def _evidence_batches(companies: List[Dict[str, Any]], max_tokens: int) -> List[str]:
+    """Formatted evidence split into blocks of at most max_tokens each."""
+    batches: List[str] = []
+    blocks: List[str] = []
+    used = 0
+    for entry in companies:
+        block = _format_company(entry)
+        tokens = estimate_tokens(block)
+        if blocks and used + tokens > max_tokens:
+            batches.append("\n\n".join(blocks))
+            blocks, used = [], 0
+        blocks.append(block)
+        used += tokens
+    if blocks:
+        batches.append("\n\n".join(blocks))
+    return batches
+
+
+async def _answer(
+    question: str, companies: List[Dict[str, Any]], llm
+) -> Dict[str, Any]:
+    """
+    Write the answer from the merged evidence.
+
+    Companies are answered in batches that each fit the prompt budget; when
+    there is more than one batch, the partial answers are merged by a final
+    call.
+    """
+    llm_timing = LLMTimingCallback()
+    config = {"callbacks": [llm_timing]}
+    batches = _evidence_batches(
+        companies, rag_model_config.portfolio_prompt_token_budget
+    )
+    semaphore = asyncio.Semaphore(rag_model_config.portfolio_concurrency)
+
+    async def answer_batch(evidence: str) -> str:
+        async with semaphore:
+            output = await llm.ainvoke(
+                PORTFOLIO_QUERY_PROMPT.format(question=question, evidence=evidence),
+                config=config,
+            )
+        return output.strip()
+
+    with usage_scope(site="portfolio_answer"):
+        partials = await asyncio.gather(*(answer_batch(batch) for batch in batches))
+        if len(partials) == 1:
+            answer = partials[0]
+        else:
+            output = await llm.ainvoke(
+                PORTFOLIO_MERGE_PROMPT.format(
+                    question=question,
+                    partial_answers="\n\n---\n\n".join(partials),
+                ),
+                config=config,
+            )
+            answer = output.strip()
+    return {
+        "answer": answer,
+        "answer_batches": len(batches),
+        "llm_stats": llm_timing.stats(),
+    }
+
+
+async def portfolio_query(
+    question: str,
+    deck_ids: Optional[List[str]] = None,
+    shared_corpus: Optional[str] = None,
+    top_k: Optional[int] = None,
+    answer: bool = True,
+    llm=None,
+) -> Dict[str, Any]:
+    """
+    Answer one question across many decks.
+
+    The question is retrieved against each selected deck's corpus
+    concurrently (or per deck's files in a shared corpus), the evidence is
+    merged per company and capped, and the LLM writes the answer. Decks
+    whose retrieval failed are listed in "errors" with their error, so they
+    are not mistaken for decks without relevant evidence.
+    """
+    start_time = time.time()
+    if deck_ids:
+        decks = await asyncio.to_thread(
+            lambda: [deck_registry.get(deck_id) for deck_id in deck_ids]
+        )
+    else:
+        decks = await asyncio.to_thread(deck_registry.list)
+    if not decks:
+        raise RuntimeError("No decks registered")
+    top_k = top_k or rag_model_config.portfolio_contexts_per_deck
+
+    if shared_corpus:
+        results, errors = await _query_shared_corpus(
+            question, decks, shared_corpus, top_k
+        )
+    else:
+        results, errors = await _fan_out(question, decks, top_k)
+    companies = merge_by_company(decks, results)
+    for entry in companies:
+        if entry["deck_id"] in errors:
+            entry["error"] = errors[entry["deck_id"]]
+    retrieval_time = time.time() - start_time
+
+    response = {
+        "question": question,
+        "decks_queried": len(decks),
+        "companies": companies,
+        "answer": None,
+        "errors": errors,
+        "retrieval_time": round(retrieval_time, 2),
+    }
+    if answer and any(entry["evidence"] for entry in companies):
+        response.update(await _answer(question, companies, llm or default_llm))
+    response["execution_time"] = round(time.time() - start_time, 2)
+    return response
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .rag_models_config import rag_model_config
+
+CacheKey = Tuple[str, str, int, float, float, Tuple[str, ...]]
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so equivalent queries share a cache entry."""
+    return " ".join(query.split()).lower()
+
+
+def context_id(text: str) -> str:
+    """Stable identity for a retrieved chunk, derived from its text."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+class RetrievalCache:
+    """Bounded LRU cache of RAG retrieval results with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 900):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[Dict[str, Any]]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def make_key(
+        self,
+        corpus_name: str,
+        query: str,
+        top_k: int,
+        similarity_threshold: float,
+        hybrid_alpha: float,
+        rag_file_ids: Sequence[str] = (),
+    ) -> CacheKey:
+        return (
+            corpus_name,
+            normalize_query(query),
+            int(top_k),
+            float(similarity_threshold),
+            float(hybrid_alpha),
+            tuple(sorted(rag_file_ids)),
+        )
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, contexts = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(contexts)
+
+    def set(self, key: CacheKey, contexts: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(contexts))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_corpus(self, corpus_name: str) -> int:
+        """Drop every cached retrieval for a corpus, e.g. after a re-import."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == corpus_name]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        if stale:
+            print(f"Invalidated {len(stale)} cached retrievals for {corpus_name}")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+retrieval_cache = RetrievalCache(
+    max_entries=rag_model_config.cache_max_entries,
+    ttl_seconds=rag_model_config.cache_ttl_seconds,
+)
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from .rag_registry import rag_registry
+
+# Per-request RAG state, so shared agents and tools never read another
+# request's corpus from the process-wide registry.
+_current_corpus_name: ContextVar[Optional[str]] = ContextVar(
+    "corpus_name", default=None
+)
+_current_company_name: ContextVar[Optional[str]] = ContextVar(
+    "company_name", default=None
+)
+_current_deck_id: ContextVar[Optional[str]] = ContextVar("deck_id", default=None)
+
+
+@contextmanager
+def rag_request_scope(
+    corpus_name: Optional[str] = None,
+    company_name: Optional[str] = None,
+    deck_id: Optional[str] = None,
+):
+    """Bind the corpus, company and deck a request works on for everything it awaits."""
+    corpus_token = _current_corpus_name.set(corpus_name)
+    company_token = _current_company_name.set(company_name)
+    deck_token = _current_deck_id.set(deck_id)
+    try:
+        yield
+    finally:
+        _current_deck_id.reset(deck_token)
+        _current_company_name.reset(company_token)
+        _current_corpus_name.reset(corpus_token)
+
+
+def current_corpus_name() -> str:
+    return _current_corpus_name.get() or rag_registry.get("corpus_name")
+
+
+def current_company_name() -> Optional[str]:
+    return _current_company_name.get() or rag_registry.get_optional("company_name")
+
+
+def current_deck_id() -> Optional[str]:
+    """Document id of the deck's stored chunks (the company name for legacy uploads)."""
+    return _current_deck_id.get() or current_company_name()
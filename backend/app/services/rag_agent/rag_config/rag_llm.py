@@ -1,10 +1,155 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.outputs import LLMResult
 from langchain_google_vertexai import VertexAI
-from .rag_models_config import rag_model_config
+
 from ....constants import PROJECT_ID
+from ...llm_usage import arecord_llm_call, record_llm_call, usage_from_response
+from ...model_cascade import check_truncation
+from ...rate_limiter import estimate_content_tokens, rate_limiter
+from .rag_models_config import rag_model_config
+
+
+def _usage(
+    prompts: List[str], result: Any, start_time: float, retries: int = 0
+) -> List[Dict]:
+    """Usage ledger fields for each prompt of one LLM batch call."""
+    latency = (time.time() - start_time) / max(len(prompts), 1)
+    usages = []
+    for index, (prompt, generations) in enumerate(zip(prompts, result.generations)):
+        generation = generations[0] if generations else None
+        prompt_tokens, output_tokens = usage_from_response(
+            (generation.generation_info or {}) if generation else {},
+            prompt,
+            generation.text if generation else "",
+        )
+        usages.append(
+            {
+                "prompt_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "latency": latency,
+                # The batch was retried as a whole; count it once
+                "retries": retries if index == 0 else 0,
+            }
+        )
+    return usages
+
+
+def _check_truncation(result: Any):
+    """Let a cascade escalate a generation that stopped at the token limit."""
+    for generations in result.generations:
+        for generation in generations:
+            check_truncation(
+                generation.text,
+                (generation.generation_info or {}).get("finish_reason"),
+            )
+
+
+class RateLimitedVertexAI(VertexAI):
+    """
+    VertexAI LLM that draws from the shared per-model rate limiter and records usage.
+
+    LangChain's own retry is reduced to a single attempt, so every attempt
+    goes through rate_limiter.call/acall: each one takes budget, and retries
+    use jittered backoff that honours the server's Retry-After hint.
+    """
 
+    max_retries: int = 1
 
-llm = VertexAI(
+    def __init__(self, *, model_name: Optional[str] = None, **kwargs: Any) -> None:
+        # Keeps model_name a typed argument, as VertexAI.__init__ does
+        super().__init__(model_name=model_name, **kwargs)
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        stream: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        generate = super()._generate
+        calls = {"attempts": 0}
+
+        def attempt():
+            calls["attempts"] += 1
+            return generate(
+                prompts, stop=stop, run_manager=run_manager, stream=stream, **kwargs
+            )
+
+        start_time = time.time()
+        try:
+            result = rate_limiter.call(
+                self.model_name, estimate_content_tokens(prompts), attempt
+            )
+        except Exception:
+            record_llm_call(
+                self.model_name,
+                latency=time.time() - start_time,
+                retries=max(calls["attempts"] - 1, 0),
+                failed=True,
+            )
+            raise
+        for usage in _usage(prompts, result, start_time, calls["attempts"] - 1):
+            record_llm_call(self.model_name, **usage)
+        _check_truncation(result)
+        return result
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        agenerate = super()._agenerate
+        calls = {"attempts": 0}
+
+        async def attempt():
+            calls["attempts"] += 1
+            return await agenerate(
+                prompts, stop=stop, run_manager=run_manager, **kwargs
+            )
+
+        start_time = time.time()
+        try:
+            result = await rate_limiter.acall(
+                self.model_name, estimate_content_tokens(prompts), attempt
+            )
+        except Exception:
+            await arecord_llm_call(
+                self.model_name,
+                latency=time.time() - start_time,
+                retries=max(calls["attempts"] - 1, 0),
+                failed=True,
+            )
+            raise
+        for usage in _usage(prompts, result, start_time, calls["attempts"] - 1):
+            await arecord_llm_call(self.model_name, **usage)
+        _check_truncation(result)
+        return result
+
+
+llm = RateLimitedVertexAI(
     model_name=rag_model_config.model_name,
     project=PROJECT_ID,
     temperature=rag_model_config.temperature,
 )
+
+_llms: Dict[str, RateLimitedVertexAI] = {rag_model_config.model_name: llm}
+
+
+def get_llm(model_name: str) -> RateLimitedVertexAI:
+    """Return a shared VertexAI client for the given model"""
+    if model_name not in _llms:
+        _llms[model_name] = RateLimitedVertexAI(
+            model_name=model_name,
+            project=PROJECT_ID,
+            temperature=rag_model_config.temperature,
+        )
+    return _llms[model_name]
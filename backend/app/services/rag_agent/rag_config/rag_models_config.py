@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 
 
 @dataclass
@@ -11,6 +12,63 @@ class InvestmentAnalysisConfig:
     hybrid_alpha = 1
     similarity_threshold: float = 0.6
     max_iterations: int = 50
+    # "parallel" runs the map-reduce section engine, which caches each
+    # section on its own evidence; "agent" runs the ReAct loop, whose memo
+    # is only reused whole while the corpus is unchanged
+    engine_mode: str = "parallel"
+    coverage_control_enabled: bool = True
+    coverage_grace_iterations: int = 2
+    cache_max_entries: int = 256
+    cache_ttl_seconds: float = 900
+    rrf_k: int = 60
+    # Longest one RAG retrieval call may take; calls are shared across
+    # requests, so each request also stops waiting at its own deadline
+    retrieval_timeout: float = 30.0
+    # Keep a small k of each top_k retrieval, widening only on thin evidence
+    adaptive_top_k_enabled: bool = True
+    adaptive_initial_k: int = 3
+    adaptive_min_tokens: int = 300
+    adaptive_max_distance: float = 0.5
+    context_budget_enabled: bool = True
+    observation_token_budget: int = 1500
+    run_token_budget: int = 12000
+    # Reuse generated sections across runs on the same (or unchanged) evidence
+    section_cache_enabled: bool = True
+    # Draft all sections in the background once a deck has been ingested
+    precompute_sections: bool = False
+    # Portfolio questions: decks queried at once and contexts kept per deck
+    portfolio_concurrency: int = 8
+    portfolio_contexts_per_deck: int = 3
+    # Evidence per company in the answer prompt; companies whose evidence
+    # would not fit one prompt are answered in batches, then merged
+    portfolio_tokens_per_deck: int = 600
+    portfolio_prompt_token_budget: int = 20000
+    # Cheapest first, e.g. ["gemini-2.5-flash-lite", "gemini-2.5-flash"]; section
+    # drafts that come back empty or truncated escalate. Empty keeps model_name.
+    section_cascade_models: List[str] = field(default_factory=list)
+    # Preview memo: cheaper model, fewer sections and contexts per section
+    preview_model_name: str = "gemini-2.5-flash-lite"
+    preview_max_contexts: int = 3
+    preview_sections: List[str] = field(
+        default_factory=lambda: [
+            "Team_Overview",
+            "Problem_Statement",
+            "Solution",
+            "Market_Opportunity",
+            "Traction",
+            "Funding_Details",
+        ]
+    )
+    # Per section tool: ("none" | "neighbors" | "slide", neighbor window)
+    section_expansion: Dict[str, Tuple[str, int]] = field(
+        default_factory=lambda: {
+            "Team_Overview": ("slide", 0),
+            "Market_Opportunity": ("neighbors", 1),
+            "Business_Model": ("neighbors", 1),
+            "Traction": ("slide", 0),
+            "Funding_Details": ("neighbors", 1),
+        }
+    )
 
 
 rag_model_config = InvestmentAnalysisConfig()
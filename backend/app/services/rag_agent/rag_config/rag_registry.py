@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 
 
 class RagCorpusRegistry:
@@ -15,5 +15,8 @@ class RagCorpusRegistry:
             raise RuntimeError(f"No RAG corpus registered for key: {key}")
         return self._registry[key]
 
+    def get_optional(self, key: str) -> Optional[str]:
+        return self._registry.get(key)
+
 
 rag_registry = RagCorpusRegistry()
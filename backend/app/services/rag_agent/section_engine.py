@@ -0,0 +1,376 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+
+from ...prompts.section_analysis_prompt import (
+    DEAL_NOTE_SYNTHESIS_PROMPT,
+    SECTION_ANALYSIS_PROMPT,
+    SECTION_PROMPT_VERSION,
+    SYNTHESIS_PROMPT_VERSION,
+)
+from ...storage.chunk_store import chunk_store
+from ...storage.section_cache import section_cache
+from ..deadline import DeadlineExceeded
+from ..llm_usage import usage_scope
+from ..model_cascade import complete_markdown, get_cascade, not_empty
+from .batch_retrieval import batch_retrieve
+from .llm_timing import LLMTimingCallback
+from .rag_config.rag_cache import context_id
+from .rag_config.rag_context import rag_request_scope
+from .rag_config.rag_llm import get_llm
+from .rag_config.rag_llm import llm as default_llm
+from .rag_config.rag_models_config import rag_model_config
+from .section_tools import SectionTool, get_section_tools
+from .tools.base_tool import expand_contexts, format_contexts
+
+NO_INFORMATION = "No specific information available."
+# Stands in for the agent's "Action Input" when the engine builds section queries
+SECTION_ENGINE_QUERY = "Extract all available information about {company_name}"
+SYNTHESIS_SECTION = "__synthesis__"
+
+# Awaited with each section result as soon as that section is ready
+SectionCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def model_name(llm=None) -> str:
+    if llm is None and rag_model_config.section_cascade_models:
+        return "+".join(rag_model_config.section_cascade_models)
+    return (
+        getattr(llm or default_llm, "model_name", None) or rag_model_config.model_name
+    )
+
+
+async def draft_markdown(
+    prompt: str, llm=None, callbacks: Optional[list] = None
+) -> str:
+    """Run a section prompt on llm, or through the section cascade when one is configured."""
+    config: RunnableConfig = {"callbacks": callbacks or []}
+    if llm is not None or not rag_model_config.section_cascade_models:
+        with usage_scope(site="section_draft"):
+            return await (llm or default_llm).ainvoke(prompt, config=config)
+    cascade = get_cascade(
+        "section_draft",
+        rag_model_config.section_cascade_models,
+        [not_empty, complete_markdown],
+    )
+    return await cascade.arun(lambda name: get_llm(name).ainvoke(prompt, config=config))
+
+
+async def memoized(
+    corpus_version: Optional[str],
+    section: str,
+    prompt_version: str,
+    model: str,
+    evidence_hash: str,
+    generate,
+    persist: bool = True,
+) -> Tuple[str, Optional[str]]:
+    """
+    Serve a generated section from the section cache, or generate and store it.
+
+    With persist=False (evidence that could not be fully retrieved) the
+    section is generated without touching the cache, so a transient failure
+    is never served as the section's result for this corpus version.
+
+    Returns:
+        tuple: (markdown, cache source: "evidence" when reused from another
+               corpus version with identical evidence, None when generated)
+    """
+    if corpus_version is None or not persist:
+        return await generate(), None
+    row = await asyncio.to_thread(
+        section_cache.find_by_evidence, section, prompt_version, model, evidence_hash
+    )
+    if row is not None:
+        markdown, source = row["markdown"], "evidence"
+    else:
+        markdown, source = await generate(), None
+    await asyncio.to_thread(
+        section_cache.set,
+        corpus_version,
+        section,
+        prompt_version,
+        model,
+        evidence_hash,
+        markdown,
+    )
+    return markdown, source
+
+
+async def analyze_section(
+    section: SectionTool,
+    contexts: List[Dict[str, Any]],
+    company_name: str,
+    llm=None,
+    callbacks: Optional[list] = None,
+) -> Dict[str, Any]:
+    """Draft one memo section from its retrieved evidence with a single LLM call."""
+    start_time = time.time()
+    contexts = await asyncio.to_thread(expand_contexts, contexts, section.name)
+    if not contexts:
+        markdown = NO_INFORMATION
+    else:
+        prompt = SECTION_ANALYSIS_PROMPT.format(
+            company_name=company_name,
+            section_title=section.title,
+            section_focus=section.description,
+            evidence=format_contexts(contexts),
+        )
+        markdown = await draft_markdown(prompt, llm=llm, callbacks=callbacks)
+    return {
+        "section": section.name,
+        "title": section.title,
+        "markdown": markdown.strip() or NO_INFORMATION,
+        "contexts": len(contexts),
+        "execution_time": round(time.time() - start_time, 2),
+    }
+
+
+async def synthesize_deal_note(
+    company_name: str,
+    section_results: List[Dict[str, Any]],
+    llm=None,
+    callbacks: Optional[list] = None,
+) -> str:
+    """Assemble drafted sections into the final memo markdown with one LLM call."""
+    llm = llm or default_llm
+    section_analyses = "\n\n".join(
+        f"## {result['title'].upper()}\n{result['markdown']}"
+        for result in section_results
+    )
+    prompt = DEAL_NOTE_SYNTHESIS_PROMPT.format(
+        company_name=company_name, section_analyses=section_analyses
+    )
+    with usage_scope(site="synthesis"):
+        output = await llm.ainvoke(prompt, config={"callbacks": callbacks or []})
+    return output.strip()
+
+
+async def analyze_sections_parallel(
+    company_name: str,
+    section_names: Optional[List[str]] = None,
+    llm=None,
+    top_k: Optional[int] = None,
+    corpus_name: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+    on_section: Optional[SectionCallback] = None,
+    synthesize: bool = True,
+    deck_id: Optional[str] = None,
+    max_contexts: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Deterministic map-reduce alternative to the ReAct agent.
+
+    All section retrievals run in one batch, all section drafts run
+    concurrently, then a single synthesis call assembles the memo. Sections
+    are memoized per corpus version, and after a deck update only sections
+    whose retrieved evidence changed are regenerated. ``on_section`` is
+    awaited with each section result in completion order; with
+    ``synthesize=False`` only the sections are drafted (and memoized).
+    ``max_contexts`` caps the evidence per section after retrieval, so the
+    retrievals themselves stay shareable with a full-size run.
+    """
+    if use_cache is None:
+        use_cache = rag_model_config.section_cache_enabled
+    sections = get_section_tools(section_names)
+    query = SECTION_ENGINE_QUERY.format(company_name=company_name)
+    model = model_name(llm)
+    llm_timing = LLMTimingCallback()
+
+    async def emit(result: Dict[str, Any]):
+        if on_section is not None:
+            await on_section(result)
+
+    try:
+        with rag_request_scope(corpus_name, company_name, deck_id):
+            print(f"Starting parallel {len(sections)}-section analysis...")
+            start_time = time.time()
+            corpus_version = (
+                await asyncio.to_thread(
+                    chunk_store.corpus_version, deck_id or company_name
+                )
+                if use_cache
+                else None
+            )
+
+            # Sections already generated for this exact corpus version
+            section_results: Dict[str, Dict[str, Any]] = {}
+            if corpus_version:
+                for section in sections:
+                    row = await asyncio.to_thread(
+                        section_cache.get,
+                        corpus_version,
+                        section.name,
+                        SECTION_PROMPT_VERSION,
+                        model,
+                    )
+                    if row is not None:
+                        section_results[section.name] = {
+                            "section": section.name,
+                            "title": section.title,
+                            "markdown": row["markdown"],
+                            "cached": "corpus",
+                            "evidence_hash": row["evidence_hash"],
+                        }
+                        await emit(section_results[section.name])
+
+            pending = [s for s in sections if s.name not in section_results]
+            retrieval: Dict[str, Any] = {"sections": {}, "execution_time": 0.0}
+            if pending:
+                retrieval = await batch_retrieve(
+                    {section.name: section.build_query(query) for section in pending},
+                    top_k=top_k,
+                )
+
+            async def run_section(section: SectionTool) -> Dict[str, Any]:
+                contexts = retrieval["sections"].get(section.name, [])[:max_contexts]
+                retrieval_error = retrieval.get("errors", {}).get(section.name)
+                evidence_hash = _hash(
+                    company_name, *(context_id(ctx["text"]) for ctx in contexts)
+                )
+                drafted: Dict[str, Any] = {}
+
+                async def generate() -> str:
+                    drafted.update(
+                        await analyze_section(
+                            section,
+                            contexts,
+                            company_name,
+                            llm=llm,
+                            callbacks=[llm_timing],
+                        )
+                    )
+                    return drafted["markdown"]
+
+                markdown, source = await memoized(
+                    corpus_version,
+                    section.name,
+                    SECTION_PROMPT_VERSION,
+                    model,
+                    evidence_hash,
+                    generate,
+                    persist=retrieval_error is None,
+                )
+                result = {
+                    "section": section.name,
+                    "title": section.title,
+                    "markdown": markdown,
+                    "contexts": drafted.get("contexts", len(contexts)),
+                    "execution_time": drafted.get("execution_time", 0.0),
+                    "cached": source,
+                    "evidence_hash": evidence_hash,
+                }
+                if retrieval_error is not None:
+                    result["error"] = f"Retrieval failed: {retrieval_error}"
+                await emit(result)
+                return result
+
+            results = await asyncio.gather(
+                *(run_section(section) for section in pending),
+                return_exceptions=True,
+            )
+            for section, result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    print(f"Section {section.name} failed: {str(result)}")
+                    result = {
+                        "section": section.name,
+                        "title": section.title,
+                        "markdown": NO_INFORMATION,
+                        "contexts": 0,
+                        "execution_time": 0.0,
+                        "error": str(result),
+                    }
+                    await emit(result)
+                section_results[section.name] = result
+            ordered_results = [section_results[section.name] for section in sections]
+
+            synthesis_start = time.time()
+            markdown, synthesis_source = None, None
+            if synthesize:
+                markdown, synthesis_source = await memoized(
+                    corpus_version,
+                    SYNTHESIS_SECTION,
+                    SYNTHESIS_PROMPT_VERSION,
+                    model,
+                    _hash(company_name, *(r["markdown"] for r in ordered_results)),
+                    lambda: synthesize_deal_note(
+                        company_name, ordered_results, llm=llm, callbacks=[llm_timing]
+                    ),
+                    # Never memoize a memo built around a failed section
+                    persist=not any(r.get("error") for r in ordered_results),
+                )
+            execution_time = time.time() - start_time
+
+            return {
+                "query": query,
+                "engine": "parallel",
+                "comprehensive_analysis": (markdown or "No analysis generated")
+                if synthesize
+                else None,
+                "execution_time": round(execution_time, 2),
+                "retrieval_time": retrieval["execution_time"],
+                "synthesis_time": round(time.time() - synthesis_start, 2),
+                "tools_used": len(pending),
+                "sections_analyzed": [result["section"] for result in ordered_results],
+                "section_results": ordered_results,
+                "corpus_version": corpus_version,
+                "section_cache": {
+                    "corpus_hits": sum(
+                        r.get("cached") == "corpus" for r in ordered_results
+                    ),
+                    "evidence_hits": sum(
+                        r.get("cached") == "evidence" for r in ordered_results
+                    ),
+                    "regenerated": sum(
+                        r.get("cached") is None for r in ordered_results
+                    ),
+                    "synthesis_cached": synthesis_source is not None,
+                },
+                "llm_stats": llm_timing.stats(),
+            }
+
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        return {
+            "query": query,
+            "engine": "parallel",
+            "error": f"Parallel analysis failed: {str(e)}",
+            "comprehensive_analysis": None,
+        }
+
+
+async def precompute_sections(
+    company_name: str,
+    corpus_name: Optional[str] = None,
+    deck_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Draft and memoize every section right after ingestion.
+
+    Runs in the background after a deck is imported so that generating the
+    memo later only needs the final synthesis call.
+    """
+    with usage_scope(deck_id=deck_id):
+        result = await analyze_sections_parallel(
+            company_name,
+            corpus_name=corpus_name,
+            use_cache=True,
+            synthesize=False,
+            deck_id=deck_id,
+        )
+    if result.get("error"):
+        print(f"Section precompute for {company_name} failed: {result['error']}")
+    else:
+        print(
+            f"Precomputed {len(result['sections_analyzed'])} sections for "
+            f"{company_name} in {result['execution_time']}s"
+        )
+    return result
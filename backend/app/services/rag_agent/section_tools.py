@@ -0,0 +1,185 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .tools.business_model_tool import (
+    BUSINESS_MODEL_QUERY,
+    abusiness_model_tool,
+    business_model_tool,
+)
+from .tools.differentiation_tool import (
+    DIFFERENTIATION_QUERY,
+    adifferentiation_tool,
+    differentiation_tool,
+)
+from .tools.exit_potential_tool import (
+    EXIT_POTENTIALS_QUERY,
+    aexit_potentials_tool,
+    exit_potentials_tool,
+)
+from .tools.funding_details_tool import (
+    FUNDING_DETAILS_QUERY,
+    afunding_details_tool,
+    funding_details_tool,
+)
+from .tools.market_opportunity_tool import (
+    MARKET_OPPORTUNITY_QUERY,
+    amarket_opportunity_tool,
+    market_opportunity_tool,
+)
+from .tools.market_strategy_tool import (
+    GTM_STRATEGY_QUERY,
+    agtm_strategy_tool,
+    gtm_strategy_tool,
+)
+from .tools.problem_solution_tool import SOLUTION_QUERY, asolution_tool, solution_tool
+from .tools.problem_statement_tool import (
+    PROBLEM_STATEMENT_QUERY,
+    aproblem_statement_tool,
+    problem_statement_tool,
+)
+from .tools.product_architecture_tool import (
+    PRODUCT_ARCHITECTURE_QUERY,
+    aproduct_architecture_tool,
+    product_architecture_tool,
+)
+from .tools.risk_mitigation_tool import (
+    RISKS_MITIGATIONS_QUERY,
+    arisks_mitigations_tool,
+    risks_mitigations_tool,
+)
+from .tools.team_overview_tool import (
+    TEAM_OVERVIEW_QUERY,
+    ateam_overview_tool,
+    team_overview_tool,
+)
+from .tools.traction_tool import TRACTION_QUERY, atraction_tool, traction_tool
+
+
+@dataclass(frozen=True)
+class SectionTool:
+    """One of the 12 deal-note sections and the retrieval tools backing it."""
+
+    name: str
+    title: str
+    description: str
+    func: Callable[[str], str]
+    coroutine: Callable[[str], Awaitable[str]]
+    query_template: str
+
+    def build_query(self, query: str) -> str:
+        return self.query_template.format(query=query)
+
+
+SECTION_TOOLS: List[SectionTool] = [
+    SectionTool(
+        name="Team_Overview",
+        title="Team Overview",
+        description="Extract team and leadership information: founders, team bios, roles, skills, education, experience, team composition, advisory board.",
+        func=team_overview_tool,
+        coroutine=ateam_overview_tool,
+        query_template=TEAM_OVERVIEW_QUERY,
+    ),
+    SectionTool(
+        name="Problem_Statement",
+        title="Problem Statement",
+        description="Extract problem statement: specific problems addressed, market pain points, customer challenges, unmet needs.",
+        func=problem_statement_tool,
+        coroutine=aproblem_statement_tool,
+        query_template=PROBLEM_STATEMENT_QUERY,
+    ),
+    SectionTool(
+        name="Solution",
+        title="Solution",
+        description="Extract solution information: product features, value proposition, how it addresses problems, capabilities, benefits.",
+        func=solution_tool,
+        coroutine=asolution_tool,
+        query_template=SOLUTION_QUERY,
+    ),
+    SectionTool(
+        name="Differentiation",
+        title="Differentiation",
+        description="Extract competitive differentiation: unique selling points, IP, competitive edge, barriers to entry, moats.",
+        func=differentiation_tool,
+        coroutine=adifferentiation_tool,
+        query_template=DIFFERENTIATION_QUERY,
+    ),
+    SectionTool(
+        name="Market_Opportunity",
+        title="Market Opportunity",
+        description="Extract market opportunity: market size (TAM/SAM/SOM), trends, growth rates, target users, competitors.",
+        func=market_opportunity_tool,
+        coroutine=amarket_opportunity_tool,
+        query_template=MARKET_OPPORTUNITY_QUERY,
+    ),
+    SectionTool(
+        name="Business_Model",
+        title="Business Model",
+        description="Extract business model: revenue sources, pricing, revenue metrics, unit economics, monetization strategy.",
+        func=business_model_tool,
+        coroutine=abusiness_model_tool,
+        query_template=BUSINESS_MODEL_QUERY,
+    ),
+    SectionTool(
+        name="Traction",
+        title="Traction",
+        description="Extract traction data: adoption, growth (ARR, MRR, DAU, MAU), MoM/YoY growth, churn, milestones.",
+        func=traction_tool,
+        coroutine=atraction_tool,
+        query_template=TRACTION_QUERY,
+    ),
+    SectionTool(
+        name="Product_Architecture",
+        title="Product Architecture",
+        description="Extract technical architecture: tech stack, operational infrastructure, system architecture, integrations.",
+        func=product_architecture_tool,
+        coroutine=aproduct_architecture_tool,
+        query_template=PRODUCT_ARCHITECTURE_QUERY,
+    ),
+    SectionTool(
+        name="GTM_Strategy",
+        title="Go-to-Market Strategy",
+        description="Extract go-to-market strategy: sales channels, marketing, partnerships, customer acquisition strategy.",
+        func=gtm_strategy_tool,
+        coroutine=agtm_strategy_tool,
+        query_template=GTM_STRATEGY_QUERY,
+    ),
+    SectionTool(
+        name="Funding_Details",
+        title="Funding Details",
+        description="Extract funding information: stage, amount raised, investors, cap table, runway, use of funds.",
+        func=funding_details_tool,
+        coroutine=afunding_details_tool,
+        query_template=FUNDING_DETAILS_QUERY,
+    ),
+    SectionTool(
+        name="Risks_Mitigations",
+        title="Risks & Mitigations",
+        description="Extract risk analysis: identified risks (market, tech, regulatory, execution) and mitigation plans.",
+        func=risks_mitigations_tool,
+        coroutine=arisks_mitigations_tool,
+        query_template=RISKS_MITIGATIONS_QUERY,
+    ),
+    SectionTool(
+        name="Exit_Potentials",
+        title="Exit Potentials",
+        description="Extract exit strategy: IPO potential, acquisition opportunities, M&A prospects, exit pathways.",
+        func=exit_potentials_tool,
+        coroutine=aexit_potentials_tool,
+        query_template=EXIT_POTENTIALS_QUERY,
+    ),
+]
+
+
+def build_section_queries(query: str) -> Dict[str, str]:
+    """Expand one request query into the enhanced query of every section."""
+    return {section.name: section.build_query(query) for section in SECTION_TOOLS}
+
+
+def get_section_tools(names: Optional[List[str]] = None) -> List[SectionTool]:
+    """Return the registered sections, optionally limited to the given names."""
+    if names is None:
+        return list(SECTION_TOOLS)
+    unknown = set(names) - {section.name for section in SECTION_TOOLS}
+    if unknown:
+        raise ValueError(f"Unknown deal-note sections: {sorted(unknown)}")
+    return [section for section in SECTION_TOOLS if section.name in names]
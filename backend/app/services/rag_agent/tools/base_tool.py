@@ -1,42 +1,302 @@
-from vertexai.preview import rag
-from ..rag_config.rag_registry import rag_registry
+import asyncio
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from google.cloud import aiplatform_v1beta1
+
+from ....constants import PROJECT_ID, REGION
+from ....storage.chunk_store import chunk_store
+from ...deadline import (
+    DeadlineExceeded,
+    await_within_deadline,
+    check_deadline,
+    remaining,
+)
+from ...single_flight import AsyncSingleFlight, SingleFlight
+from ..adaptive_top_k import adaptive_top_k
+from ..context_budget import current_context_budget
+from ..rag_config.rag_cache import context_id, retrieval_cache
+from ..rag_config.rag_context import current_corpus_name, current_deck_id
 from ..rag_config.rag_models_config import rag_model_config
 
+_client: Optional[aiplatform_v1beta1.VertexRagServiceClient] = None
 
-def rag_query_tool(query: str) -> str:
-    """Enhanced RAG query tool"""
-    try:
-        print(f"Querying RAG corpus: {query[:100]}...")
-        corpus_name = rag_registry.get("corpus_name")
-        response = rag.retrieval_query(
-            rag_resources=[rag.RagResource(rag_corpus=corpus_name)],
+# gRPC async clients are bound to the event loop they were created on
+_async_clients: Dict[type, Tuple[Any, asyncio.AbstractEventLoop]] = {}
+
+# Concurrent requests for the same retrieval share one RAG call
+retrieval_flights = SingleFlight()
+aretrieval_flights = AsyncSingleFlight()
+
+
+def _loop_client(client_class: type) -> Any:
+    loop = asyncio.get_running_loop()
+    client, client_loop = _async_clients.get(client_class, (None, None))
+    if client is None or client_loop is not loop:
+        client = client_class(
+            client_options={"api_endpoint": f"{REGION}-aiplatform.googleapis.com"}
+        )
+        _async_clients[client_class] = (client, loop)
+    return client
+
+
+def _get_client() -> aiplatform_v1beta1.VertexRagServiceClient:
+    global _client
+    if _client is None:
+        _client = aiplatform_v1beta1.VertexRagServiceClient(
+            client_options={"api_endpoint": f"{REGION}-aiplatform.googleapis.com"}
+        )
+    return _client
+
+
+def _get_async_client() -> aiplatform_v1beta1.VertexRagServiceAsyncClient:
+    return _loop_client(aiplatform_v1beta1.VertexRagServiceAsyncClient)
+
+
+def _get_async_data_client() -> aiplatform_v1beta1.VertexRagDataServiceAsyncClient:
+    return _loop_client(aiplatform_v1beta1.VertexRagDataServiceAsyncClient)
+
+
+def _parse_contexts(response) -> List[Dict[str, Any]]:
+    """Flatten a retrieval response into plain context dicts."""
+    parsed = []
+    if hasattr(response, "contexts") and response.contexts:
+        contexts = (
+            response.contexts.contexts
+            if hasattr(response.contexts, "contexts")
+            else response.contexts
+        )
+        for ctx in contexts:
+            text_content = ""
+            if hasattr(ctx, "chunk") and ctx.chunk and hasattr(ctx.chunk, "text"):
+                text_content = ctx.chunk.text
+            elif hasattr(ctx, "text"):
+                text_content = ctx.text
+            if text_content:
+                parsed.append(
+                    {
+                        "text": text_content,
+                        "source_uri": getattr(ctx, "source_uri", ""),
+                        "score": getattr(ctx, "score", None),
+                    }
+                )
+    return parsed
+
+
+def _cache_key(
+    query: str, corpus_name: str, top_k: int, rag_file_ids: Sequence[str] = ()
+):
+    return retrieval_cache.make_key(
+        corpus_name,
+        query,
+        top_k,
+        rag_model_config.similarity_threshold,
+        rag_model_config.hybrid_alpha,
+        rag_file_ids,
+    )
+
+
+def _retrieve_request(
+    query: str, corpus_name: str, top_k: int, rag_file_ids: Sequence[str] = ()
+) -> aiplatform_v1beta1.RetrieveContextsRequest:
+    vertex_rag_store = aiplatform_v1beta1.RetrieveContextsRequest.VertexRagStore
+    return aiplatform_v1beta1.RetrieveContextsRequest(
+        parent=f"projects/{PROJECT_ID}/locations/{REGION}",
+        vertex_rag_store=vertex_rag_store(
+            rag_resources=[
+                vertex_rag_store.RagResource(
+                    rag_corpus=corpus_name, rag_file_ids=list(rag_file_ids)
+                )
+            ]
+        ),
+        query=aiplatform_v1beta1.RagQuery(
             text=query,
-            rag_retrieval_config=rag.RagRetrievalConfig(
-                top_k=rag_model_config.top_k,
-                filter=rag.Filter(
+            rag_retrieval_config=aiplatform_v1beta1.RagRetrievalConfig(
+                top_k=top_k,
+                filter=aiplatform_v1beta1.RagRetrievalConfig.Filter(
                     vector_similarity_threshold=rag_model_config.similarity_threshold
                 ),
-                hybrid_search=rag.HybridSearch(alpha=rag_model_config.hybrid_alpha),
+                hybrid_search=aiplatform_v1beta1.RagRetrievalConfig.HybridSearch(
+                    alpha=rag_model_config.hybrid_alpha
+                ),
             ),
+        ),
+    )
+
+
+def retrieve_contexts(
+    query: str, corpus_name: Optional[str] = None, top_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Retrieve contexts for a query, served from the retrieval cache when possible."""
+    corpus_name = corpus_name or current_corpus_name()
+    top_k = top_k or rag_model_config.top_k
+    cache_key = _cache_key(query, corpus_name, top_k)
+    cached = retrieval_cache.get(cache_key)
+    if cached is not None:
+        print(f"RAG cache hit: {query[:100]}...")
+        return cached
+
+    def query_corpus() -> List[Dict[str, Any]]:
+        check_deadline()
+        print(f"Querying RAG corpus: {query[:100]}...")
+        response = _get_client().retrieve_contexts(
+            request=_retrieve_request(query, corpus_name, top_k),
+            timeout=rag_model_config.retrieval_timeout,
         )
+        contexts = _parse_contexts(response)
+        retrieval_cache.set(cache_key, contexts)
+        return contexts
+
+    return retrieval_flights.do(cache_key, query_corpus)
+
+
+async def aretrieve_contexts(
+    query: str,
+    corpus_name: Optional[str] = None,
+    top_k: Optional[int] = None,
+    rag_file_ids: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of retrieve_contexts using the native async RAG client.
+
+    rag_file_ids restricts the search to those files of the corpus.
+    """
+    corpus_name = corpus_name or current_corpus_name()
+    top_k = top_k or rag_model_config.top_k
+    rag_file_ids = list(rag_file_ids or [])
+    cache_key = _cache_key(query, corpus_name, top_k, rag_file_ids)
+    cached = retrieval_cache.get(cache_key)
+    if cached is not None:
+        print(f"RAG cache hit: {query[:100]}...")
+        return cached
+
+    # The call is shared with any concurrent request for the same retrieval,
+    # so it gets the service timeout rather than this request's deadline
+    async def query_corpus() -> List[Dict[str, Any]]:
+        print(f"Querying RAG corpus (async): {query[:100]}...")
+        response = await _get_async_client().retrieve_contexts(
+            request=_retrieve_request(query, corpus_name, top_k, rag_file_ids),
+            timeout=rag_model_config.retrieval_timeout,
+        )
+        contexts = _parse_contexts(response)
+        retrieval_cache.set(cache_key, contexts)
+        return contexts
+
+    return await await_within_deadline(aretrieval_flights.do(cache_key, query_corpus))
+
+
+async def alist_corpus_files(corpus_name: str) -> List[Dict[str, Any]]:
+    """Ids and source URIs of every file imported into a corpus."""
+    check_deadline()
+    pager = await _get_async_data_client().list_rag_files(
+        parent=corpus_name, timeout=remaining()
+    )
+    files = []
+    async for rag_file in pager:
+        files.append(
+            {
+                "file_id": rag_file.name.rsplit("/", 1)[-1],
+                "uris": list(rag_file.gcs_source.uris),
+            }
+        )
+    return files
+
+
+def retrieve_adaptive(
+    query: str, section: Optional[str] = None, corpus_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Retrieve once at top_k, keeping the smallest prefix whose evidence is sufficient."""
+    contexts = retrieve_contexts(query, corpus_name=corpus_name)
+    if not rag_model_config.adaptive_top_k_enabled:
+        return contexts
+    return adaptive_top_k.trim(contexts, section)
+
+
+async def aretrieve_adaptive(
+    query: str, section: Optional[str] = None, corpus_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Async variant of retrieve_adaptive."""
+    contexts = await aretrieve_contexts(query, corpus_name=corpus_name)
+    if not rag_model_config.adaptive_top_k_enabled:
+        return contexts
+    return adaptive_top_k.trim(contexts, section)
+
+
+def expand_contexts(
+    contexts: List[Dict[str, Any]], section: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Widen hits to neighbouring chunks or whole slides from the local chunk store."""
+    mode, window = rag_model_config.section_expansion.get(section or "", ("none", 0))
+    if mode == "none" or not contexts:
+        return contexts
+
+    doc_id = current_deck_id()
+    expanded = []
+    # Context ids of unexpanded hits and (doc_id, chunk_index) of chunks
+    emitted: Set[Hashable] = set()
+    for ctx in contexts:
+        try:
+            chunks = chunk_store.expand(ctx["text"], doc_id, mode=mode, window=window)
+        except Exception as e:
+            print(f"Chunk expansion error: {str(e)}")
+            chunks = None
+
+        if not chunks:
+            if context_id(ctx["text"]) not in emitted:
+                emitted.add(context_id(ctx["text"]))
+                expanded.append(ctx)
+            continue
+
+        new_chunks = [
+            chunk
+            for chunk in chunks
+            if (chunk["doc_id"], chunk["chunk_index"]) not in emitted
+        ]
+        if not new_chunks:
+            continue  # already covered by an earlier expansion
+        emitted.update((chunk["doc_id"], chunk["chunk_index"]) for chunk in new_chunks)
+        expanded.append(
+            {
+                **ctx,
+                "text": "\n\n".join(chunk["text"] for chunk in new_chunks),
+                "chunk_indices": [chunk["chunk_index"] for chunk in new_chunks],
+            }
+        )
+    return expanded
+
+
+def format_contexts(contexts: List[Dict[str, Any]]) -> str:
+    """Render contexts as [Source i] blocks, deduped and trimmed by any run budget."""
+    budget = current_context_budget()
+    if budget is not None:
+        return budget.render(contexts)
+    texts = [f"[Source {i}]: {ctx['text']}" for i, ctx in enumerate(contexts, 1)]
+    return "\n\n".join(texts) if texts else ""
+
+
+def rag_query_tool(query: str, section: Optional[str] = None) -> str:
+    """Enhanced RAG query tool"""
+    try:
+        return format_contexts(
+            expand_contexts(retrieve_adaptive(query, section), section)
+        )
+
+    except DeadlineExceeded:
+        raise
+
+    except Exception as e:
+        print(f"RAG query error: {str(e)}")
+        return ""
+
+
+async def arag_query_tool(query: str, section: Optional[str] = None) -> str:
+    """Async variant of rag_query_tool"""
+    try:
+        contexts = await aretrieve_adaptive(query, section)
+        contexts = await asyncio.to_thread(expand_contexts, contexts, section)
+        return format_contexts(contexts)
 
-        texts = []
-        if hasattr(response, "contexts") and response.contexts:
-            contexts = (
-                response.contexts.contexts
-                if hasattr(response.contexts, "contexts")
-                else response.contexts
-            )
-            for i, ctx in enumerate(contexts, 1):
-                text_content = ""
-                if hasattr(ctx, "chunk") and ctx.chunk and hasattr(ctx.chunk, "text"):
-                    text_content = ctx.chunk.text
-                elif hasattr(ctx, "text"):
-                    text_content = ctx.text
-                if text_content:
-                    texts.append(f"[Source {i}]: {text_content}")
-
-        return "\n\n".join(texts) if texts else ""
+    except DeadlineExceeded:
+        raise
 
     except Exception as e:
         print(f"RAG query error: {str(e)}")
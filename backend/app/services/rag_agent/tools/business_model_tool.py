@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def business_model_tool(query: str) -> str:
-    """Extract business model and revenue information"""
-    enhanced_query = f"""
+BUSINESS_MODEL_QUERY = """
         EXTRACT BUSINESS MODEL INFORMATION:
         Find details about: revenue sources, pricing strategy, revenue metrics,
         unit economics, monetization strategy, revenue streams.
@@ -16,4 +13,17 @@ def business_model_tool(query: str) -> str:
          Dont infer any information.
 
         """
-    return rag_query_tool(enhanced_query)
+
+
+def business_model_tool(query: str) -> str:
+    """Extract business model and revenue information"""
+    return rag_query_tool(
+        BUSINESS_MODEL_QUERY.format(query=query), section="Business_Model"
+    )
+
+
+async def abusiness_model_tool(query: str) -> str:
+    """Async variant of business_model_tool"""
+    return await arag_query_tool(
+        BUSINESS_MODEL_QUERY.format(query=query), section="Business_Model"
+    )
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def differentiation_tool(query: str) -> str:
-    """Extract competitive differentiation and unique advantages"""
-    enhanced_query = f"""
+DIFFERENTIATION_QUERY = """
         EXTRACT DIFFERENTIATION FACTORS:
         Find information about: unique selling points, intellectual property, competitive edge,
         barriers to entry, moats, what makes this solution different.
@@ -16,4 +13,17 @@ def differentiation_tool(query: str) -> str:
         Dont infer any information.
 
         """
-    return rag_query_tool(enhanced_query)
+
+
+def differentiation_tool(query: str) -> str:
+    """Extract competitive differentiation and unique advantages"""
+    return rag_query_tool(
+        DIFFERENTIATION_QUERY.format(query=query), section="Differentiation"
+    )
+
+
+async def adifferentiation_tool(query: str) -> str:
+    """Async variant of differentiation_tool"""
+    return await arag_query_tool(
+        DIFFERENTIATION_QUERY.format(query=query), section="Differentiation"
+    )
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def exit_potentials_tool(query: str) -> str:
-    """Extract exit strategy and opportunities"""
-    enhanced_query = f"""
+EXIT_POTENTIALS_QUERY = """
         EXTRACT EXIT POTENTIALS:
         Find information about: IPO potential, acquisition opportunities, M&A prospects,
         exit pathways, strategic buyers, exit timeline.
@@ -13,4 +10,17 @@ def exit_potentials_tool(query: str) -> str:
         Focus on: exit strategy, potential acquirers, IPO readiness, exit valuation,
         strategic options, investor exit opportunities.
         """
-    return rag_query_tool(enhanced_query)
+
+
+def exit_potentials_tool(query: str) -> str:
+    """Extract exit strategy and opportunities"""
+    return rag_query_tool(
+        EXIT_POTENTIALS_QUERY.format(query=query), section="Exit_Potentials"
+    )
+
+
+async def aexit_potentials_tool(query: str) -> str:
+    """Async variant of exit_potentials_tool"""
+    return await arag_query_tool(
+        EXIT_POTENTIALS_QUERY.format(query=query), section="Exit_Potentials"
+    )
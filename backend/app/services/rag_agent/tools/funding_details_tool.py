@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def funding_details_tool(query: str) -> str:
-    """Extract funding and financial information"""
-    enhanced_query = f"""
+FUNDING_DETAILS_QUERY = """
         EXTRACT FUNDING DETAILS:
         Find information about: funding stage, amount raised, investors, cap table,
         runway, use of funds, valuation, investment rounds.
@@ -15,4 +12,17 @@ def funding_details_tool(query: str) -> str:
         Dont infer any information.
 
         """
-    return rag_query_tool(enhanced_query)
+
+
+def funding_details_tool(query: str) -> str:
+    """Extract funding and financial information"""
+    return rag_query_tool(
+        FUNDING_DETAILS_QUERY.format(query=query), section="Funding_Details"
+    )
+
+
+async def afunding_details_tool(query: str) -> str:
+    """Async variant of funding_details_tool"""
+    return await arag_query_tool(
+        FUNDING_DETAILS_QUERY.format(query=query), section="Funding_Details"
+    )
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def market_opportunity_tool(query: str) -> str:
-    """Extract market size and opportunity data"""
-    enhanced_query = f"""
+MARKET_OPPORTUNITY_QUERY = """
         EXTRACT MARKET OPPORTUNITY DATA:
         Find information about: market size (TAM/SAM/SOM), market trends, growth rates,
         target users, market segments, addressable market, competitors.
@@ -16,4 +13,17 @@ def market_opportunity_tool(query: str) -> str:
         Dont infer any information.
 
         """
-    return rag_query_tool(enhanced_query)
+
+
+def market_opportunity_tool(query: str) -> str:
+    """Extract market size and opportunity data"""
+    return rag_query_tool(
+        MARKET_OPPORTUNITY_QUERY.format(query=query), section="Market_Opportunity"
+    )
+
+
+async def amarket_opportunity_tool(query: str) -> str:
+    """Async variant of market_opportunity_tool"""
+    return await arag_query_tool(
+        MARKET_OPPORTUNITY_QUERY.format(query=query), section="Market_Opportunity"
+    )
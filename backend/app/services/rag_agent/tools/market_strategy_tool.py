@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def gtm_strategy_tool(query: str) -> str:
-    """Extract go-to-market and distribution strategy"""
-    enhanced_query = f"""
+GTM_STRATEGY_QUERY = """
         EXTRACT GO-TO-MARKET STRATEGY:
         Find information about: sales channels, marketing strategy, partnerships,
         customer acquisition strategy, distribution channels, market entry approach.
@@ -15,4 +12,17 @@ def gtm_strategy_tool(query: str) -> str:
         Dont infer any information.
 
         """
-    return rag_query_tool(enhanced_query)
+
+
+def gtm_strategy_tool(query: str) -> str:
+    """Extract go-to-market and distribution strategy"""
+    return rag_query_tool(
+        GTM_STRATEGY_QUERY.format(query=query), section="GTM_Strategy"
+    )
+
+
+async def agtm_strategy_tool(query: str) -> str:
+    """Async variant of gtm_strategy_tool"""
+    return await arag_query_tool(
+        GTM_STRATEGY_QUERY.format(query=query), section="GTM_Strategy"
+    )
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def solution_tool(query: str) -> str:
-    """Extract solution and product information"""
-    enhanced_query = f"""
+SOLUTION_QUERY = """
         EXTRACT SOLUTION INFORMATION:
         Find details about: the startup's solution, product features, value proposition,
         how it addresses the problem, product capabilities, user benefits.
@@ -15,4 +12,13 @@ def solution_tool(query: str) -> str:
         
         Dont infer any information.
         """
-    return rag_query_tool(enhanced_query)
+
+
+def solution_tool(query: str) -> str:
+    """Extract solution and product information"""
+    return rag_query_tool(SOLUTION_QUERY.format(query=query), section="Solution")
+
+
+async def asolution_tool(query: str) -> str:
+    """Async variant of solution_tool"""
+    return await arag_query_tool(SOLUTION_QUERY.format(query=query), section="Solution")
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def problem_statement_tool(query: str) -> str:
-    """Extract problem statement and market pain points"""
-    enhanced_query = f"""
+PROBLEM_STATEMENT_QUERY = """
         EXTRACT PROBLEM STATEMENT:
         Find information about: the specific problem being addressed, market pain points,
         customer challenges, unmet needs, current solutions' limitations.
@@ -15,4 +12,17 @@ def problem_statement_tool(query: str) -> str:
 
         Dont infer any information.
         """
-    return rag_query_tool(enhanced_query)
+
+
+def problem_statement_tool(query: str) -> str:
+    """Extract problem statement and market pain points"""
+    return rag_query_tool(
+        PROBLEM_STATEMENT_QUERY.format(query=query), section="Problem_Statement"
+    )
+
+
+async def aproblem_statement_tool(query: str) -> str:
+    """Async variant of problem_statement_tool"""
+    return await arag_query_tool(
+        PROBLEM_STATEMENT_QUERY.format(query=query), section="Problem_Statement"
+    )
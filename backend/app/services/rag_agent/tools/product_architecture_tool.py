@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def product_architecture_tool(query: str) -> str:
-    """Extract technical and operational architecture"""
-    enhanced_query = f"""
+PRODUCT_ARCHITECTURE_QUERY = """
         EXTRACT PRODUCT ARCHITECTURE:
         Find information about: technology stack, operational infrastructure, system architecture,
         integrations, technical capabilities, platform details.
@@ -16,4 +13,17 @@ def product_architecture_tool(query: str) -> str:
         Dont infer any information.
 
         """
-    return rag_query_tool(enhanced_query)
+
+
+def product_architecture_tool(query: str) -> str:
+    """Extract technical and operational architecture"""
+    return rag_query_tool(
+        PRODUCT_ARCHITECTURE_QUERY.format(query=query), section="Product_Architecture"
+    )
+
+
+async def aproduct_architecture_tool(query: str) -> str:
+    """Async variant of product_architecture_tool"""
+    return await arag_query_tool(
+        PRODUCT_ARCHITECTURE_QUERY.format(query=query), section="Product_Architecture"
+    )
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def risks_mitigations_tool(query: str) -> str:
-    """Extract risk analysis and mitigation strategies"""
-    enhanced_query = f"""
+RISKS_MITIGATIONS_QUERY = """
         EXTRACT RISKS AND MITIGATIONS:
         Find information about: identified risks (market, technical, regulatory, execution),
         risk mitigation plans, challenges, potential obstacles.
@@ -14,4 +11,17 @@ def risks_mitigations_tool(query: str) -> str:
         risk management approach, contingency plans.
         Dont infer any information.
         """
-    return rag_query_tool(enhanced_query)
+
+
+def risks_mitigations_tool(query: str) -> str:
+    """Extract risk analysis and mitigation strategies"""
+    return rag_query_tool(
+        RISKS_MITIGATIONS_QUERY.format(query=query), section="Risks_Mitigations"
+    )
+
+
+async def arisks_mitigations_tool(query: str) -> str:
+    """Async variant of risks_mitigations_tool"""
+    return await arag_query_tool(
+        RISKS_MITIGATIONS_QUERY.format(query=query), section="Risks_Mitigations"
+    )
@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def team_overview_tool(query: str) -> str:
-    """Extract team and leadership information"""
-    enhanced_query = f"""
+TEAM_OVERVIEW_QUERY = """
     EXTRACT TEAM OVERVIEW INFORMATION:
     Find details about: founders, co-founders, team members, leadership bios, roles, skills, education, 
     work experience, team composition, advisory board, key personnel.
@@ -14,4 +11,17 @@ def team_overview_tool(query: str) -> str:
     years of experience, team size, organizational structure.
     
     """
-    return rag_query_tool(enhanced_query)
+
+
+def team_overview_tool(query: str) -> str:
+    """Extract team and leadership information"""
+    return rag_query_tool(
+        TEAM_OVERVIEW_QUERY.format(query=query), section="Team_Overview"
+    )
+
+
+async def ateam_overview_tool(query: str) -> str:
+    """Async variant of team_overview_tool"""
+    return await arag_query_tool(
+        TEAM_OVERVIEW_QUERY.format(query=query), section="Team_Overview"
+    )
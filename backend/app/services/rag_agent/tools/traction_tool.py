@@ -1,9 +1,6 @@
-from .base_tool import rag_query_tool
+from .base_tool import arag_query_tool, rag_query_tool
 
-
-def traction_tool(query: str) -> str:
-    """Extract traction and growth metrics"""
-    enhanced_query = f"""
+TRACTION_QUERY = """
     EXTRACT TRACTION AND GROWTH DATA:
     Find information about: user adoption, growth metrics (ARR, MRR, DAU, MAU),
     month-over-month/year-over-year growth, churn rates, key milestones.
@@ -16,4 +13,13 @@ def traction_tool(query: str) -> str:
     Dont infer any information.
 
     """
-    return rag_query_tool(enhanced_query)
+
+
+def traction_tool(query: str) -> str:
+    """Extract traction and growth metrics"""
+    return rag_query_tool(TRACTION_QUERY.format(query=query), section="Traction")
+
+
+async def atraction_tool(query: str) -> str:
+    """Async variant of traction_tool"""
+    return await arag_query_tool(TRACTION_QUERY.format(query=query), section="Traction")
@@ -0,0 +1,217 @@
+"""Process-wide rate limiting and retry policy for all LLM traffic."""
+
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .deadline import (
+    DeadlineExceeded,
+    asleep_within_deadline,
+    check_deadline,
+    sleep_within_deadline,
+)
+
+# Gemini bills an image part as a fixed number of tokens
+IMAGE_TOKENS = 258
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_MAX = 60.0  # seconds
+
+# Matches "retry in 7s", "Retry-After: 30s" and "retry_delay { seconds: 12 }"
+_RETRY_AFTER_PATTERN = re.compile(
+    r"retry(?:[ _-]?(?:after|delay|in))?\D{0,20}?(\d+(?:\.\d+)?)\s*(?:s\b|\})",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class RateLimits:
+    """Per-model budgets: requests and tokens per minute"""
+
+    rpm: int
+    tpm: int
+
+
+DEFAULT_RATE_LIMITS = RateLimits(rpm=60, tpm=1_000_000)
+MODEL_RATE_LIMITS: Dict[str, RateLimits] = {
+    "gemini-2.5-flash": RateLimits(rpm=120, tpm=1_000_000),
+    "gemini-2.5-flash-lite": RateLimits(rpm=240, tpm=2_000_000),
+    "gemini-1.5-flash": RateLimits(rpm=120, tpm=1_000_000),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.refill_per_second = capacity / 60.0
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket and return how long to wait before using it."""
+        # Requests larger than the bucket would never fit; let them through at full
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.refill_per_second,
+            )
+            self.updated_at = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_per_second
+
+
+class LLMRateLimiter:
+    """Shared request and token budgets per model, used by every Gemini call site."""
+
+    def __init__(self, limits: Optional[Dict[str, RateLimits]] = None):
+        self.limits = dict(limits or MODEL_RATE_LIMITS)
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def _buckets_for(self, model: str) -> Dict[str, TokenBucket]:
+        with self._lock:
+            if model not in self._buckets:
+                limits = self.limits.get(model, DEFAULT_RATE_LIMITS)
+                self._buckets[model] = {
+                    "requests": TokenBucket(limits.rpm),
+                    "tokens": TokenBucket(limits.tpm),
+                }
+            return self._buckets[model]
+
+    def _reserve(self, model: str, tokens: int) -> float:
+        buckets = self._buckets_for(model)
+        wait = max(buckets["requests"].reserve(1), buckets["tokens"].reserve(tokens))
+        if wait > 0:
+            with self._lock:
+                self.throttled += 1
+                self.waited_seconds += wait
+        return wait
+
+    def acquire(self, model: str, tokens: int = 0):
+        """Block until the model has budget for one request of `tokens` tokens."""
+        check_deadline()
+        wait = self._reserve(model, tokens)
+        if wait > 0:
+            sleep_within_deadline(wait)
+
+    async def aacquire(self, model: str, tokens: int = 0):
+        """Async variant of acquire that waits without blocking the event loop."""
+        check_deadline()
+        wait = self._reserve(model, tokens)
+        if wait > 0:
+            await asleep_within_deadline(wait)
+
+    def call(
+        self,
+        model: str,
+        tokens: int,
+        func: Callable[[], Any],
+        max_retries: int = 3,
+        base_delay: float = BACKOFF_BASE,
+    ) -> Any:
+        """
+        Run func under the model's budget, retrying failures with backoff.
+
+        Waits and retries stop as soon as the current request's deadline
+        passes or it is cancelled.
+        """
+        for attempt in range(1, max_retries + 1):
+            self.acquire(model, tokens)
+            try:
+                return func()
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = backoff_delay(attempt, base_delay, retry_after(e))
+                self._count_retry()
+                print(
+                    f"[{model}] attempt {attempt} failed ({e}); retrying in {delay:.1f}s"
+                )
+                sleep_within_deadline(delay)
+
+    async def acall(
+        self,
+        model: str,
+        tokens: int,
+        coroutine: Callable[[], Awaitable[Any]],
+        max_retries: int = 3,
+        base_delay: float = BACKOFF_BASE,
+    ) -> Any:
+        """Async variant of call."""
+        for attempt in range(1, max_retries + 1):
+            await self.aacquire(model, tokens)
+            try:
+                return await coroutine()
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = backoff_delay(attempt, base_delay, retry_after(e))
+                self._count_retry()
+                print(
+                    f"[{model}] attempt {attempt} failed ({e}); retrying in {delay:.1f}s"
+                )
+                await asleep_within_deadline(delay)
+
+    def _count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited_seconds, 2),
+            "retries": self.retries,
+        }
+
+
+def estimate_content_tokens(content: Any) -> int:
+    """Rough prompt size for budgeting: ~4 characters per token, fixed cost per image."""
+    if isinstance(content, (list, tuple)):
+        return sum(estimate_content_tokens(part) for part in content)
+    if isinstance(content, str):
+        return (len(content) + 3) // 4
+    return IMAGE_TOKENS
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Extract a server retry hint (header, attribute or message) from an error."""
+    hint = getattr(error, "retry_after", None)
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if hint is None and headers is not None:
+        hint = headers.get("Retry-After")
+    if hint is None:
+        match = _RETRY_AFTER_PATTERN.search(str(error))
+        hint = match.group(1) if match else None
+    try:
+        return float(hint) if hint is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int, base_delay: float = BACKOFF_BASE, hint: Optional[float] = None
+) -> float:
+    """Exponential backoff with full jitter, never shorter than the server's hint."""
+    delay = random.uniform(0, min(BACKOFF_MAX, base_delay * 2 ** (attempt - 1)))
+    return max(delay, hint) if hint is not None else delay
+
+
+# Global instance
+rate_limiter = LLMRateLimiter()
@@ -0,0 +1,122 @@
+"""Coalesce identical in-flight calls so concurrent callers share one result."""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Coroutine, Dict, Hashable
+
+from .deadline import DeadlineExceeded, detached_context, remaining
+
+
+class _Flight:
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+        self.cancelled = False
+
+
+class AsyncSingleFlight:
+    """
+    Async single-flight group.
+
+    The first caller for a key starts the call as a task; later callers with
+    the same key await that task instead of starting their own. Each caller
+    awaits through asyncio.shield, so cancelling one caller does not cancel
+    the call for the others; the call is cancelled only once every caller
+    has gone away. The shared call runs without the first caller's request
+    deadline, so that caller leaving early does not fail the others.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(
+        self, key: Hashable, coroutine: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is None or flight.cancelled or flight.task.get_loop() is not loop:
+            task = loop.create_task(coroutine(), context=detached_context())
+            flight = _Flight(task)
+            self._flights[key] = flight
+            task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.cancelled = True
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
+
+
+class SingleFlight:
+    """Thread-based single-flight group for blocking calls."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            existing = self._flights.get(key)
+            leader = existing is None
+            if existing is None:
+                future: Future = Future()
+                self._flights[key] = future
+                self.calls += 1
+            else:
+                future = existing
+                self.coalesced += 1
+        if not leader:
+            try:
+                # Each follower stops waiting at its own deadline
+                return future.result(timeout=remaining())
+            except DeadlineExceeded:
+                # The leader's request expired, not ours; make the call ourselves
+                return self.do(key, func)
+            except FutureTimeoutError:
+                if future.done():
+                    raise
+                raise DeadlineExceeded("Request deadline exceeded")
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
@@ -0,0 +1,137 @@
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+from ..services.rag_agent.rag_config.rag_cache import context_id
+from .sqlite_store import SQLiteStore
+from .store_raw_pitch import BASE_UPLOAD_DIR
+
+CHUNK_STORE_PATH = os.path.join(BASE_UPLOAD_DIR, "chunk_store.db")
+# Retrieved text may be re-chunked by the RAG engine, so fall back to
+# matching on a snippet of each stored chunk.
+MATCH_SNIPPET_CHARS = 80
+
+
+class ChunkStore(SQLiteStore):
+    """Local SQLite copy of each deck's chunks, keyed by chunk_index and slide_number."""
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS chunks (
+            doc_id TEXT NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            slide_number INTEGER NOT NULL,
+            text_hash TEXT NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (doc_id, chunk_index)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_chunks_hash ON chunks (text_hash)",
+        "CREATE INDEX IF NOT EXISTS idx_chunks_slide ON chunks (doc_id, slide_number)",
+    ]
+
+    def __init__(self, db_path: str = CHUNK_STORE_PATH):
+        super().__init__(db_path)
+
+    def save_chunks(self, doc_id: str, chunks: List[Dict]):
+        """Replace the stored chunks of a deck with a freshly chunked version."""
+        rows = [
+            (
+                doc_id,
+                chunk["metadata"]["chunk_index"],
+                chunk["metadata"]["slide_number"],
+                context_id(chunk["text"]),
+                chunk["text"],
+            )
+            for chunk in chunks
+        ]
+        with self._connection() as conn:
+            conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?)", rows)
+        print(f"Stored {len(rows)} chunks for {doc_id} in local chunk store")
+
+    def get_chunks(self, doc_id: str) -> List[Dict]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM chunks WHERE doc_id = ? ORDER BY chunk_index", (doc_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def corpus_version(self, doc_id: str) -> Optional[str]:
+        """Content hash of a deck's stored chunks; changes whenever the deck does."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT text_hash FROM chunks WHERE doc_id = ? ORDER BY chunk_index",
+                (doc_id,),
+            ).fetchall()
+        if not rows:
+            return None
+        digest = hashlib.sha1("".join(row["text_hash"] for row in rows).encode())
+        return digest.hexdigest()[:16]
+
+    def find(self, text: str, doc_id: Optional[str] = None) -> Optional[Dict]:
+        """Locate the stored chunk a retrieved text came from."""
+        with self._connection() as conn:
+            query = "SELECT * FROM chunks WHERE text_hash = ?"
+            params = [context_id(text)]
+            if doc_id:
+                query += " AND doc_id = ?"
+                params.append(doc_id)
+            row = conn.execute(query, params).fetchone()
+        if row:
+            return dict(row)
+        if not doc_id:
+            return None
+
+        normalized = " ".join(text.split())
+        for chunk in self.get_chunks(doc_id):
+            snippet = " ".join(chunk["text"].split())[:MATCH_SNIPPET_CHARS]
+            if snippet and (snippet in normalized or normalized in chunk["text"]):
+                return chunk
+        return None
+
+    def neighbors(self, doc_id: str, chunk_index: int, window: int) -> List[Dict]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM chunks WHERE doc_id = ? AND chunk_index BETWEEN ? AND ? "
+                "ORDER BY chunk_index",
+                (doc_id, chunk_index - window, chunk_index + window),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def slide(self, doc_id: str, slide_number: int) -> List[Dict]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM chunks WHERE doc_id = ? AND slide_number = ? "
+                "ORDER BY chunk_index",
+                (doc_id, slide_number),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def expand(
+        self, text: str, doc_id: Optional[str], mode: str = "none", window: int = 1
+    ) -> Optional[List[Dict]]:
+        """
+        Expand a retrieved chunk locally.
+
+        Args:
+            mode (str): "neighbors" for chunk_index +/- window, "slide" for the
+                whole slide, "none" to skip expansion
+        Returns:
+            list | None: stored chunks covering the expansion, or None if the
+                hit could not be matched to a stored chunk
+        """
+        if mode == "none":
+            return None
+        hit = self.find(text, doc_id)
+        if hit is None:
+            return None
+        if mode == "slide":
+            return self.slide(hit["doc_id"], hit["slide_number"])
+        if mode == "neighbors":
+            return self.neighbors(hit["doc_id"], hit["chunk_index"], window)
+        raise ValueError(f"Unknown chunk expansion mode: {mode}")
+
+
+# Global instance
+chunk_store = ChunkStore()
@@ -0,0 +1,184 @@
+import os
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from ..constants import DECK_REGISTRY_BACKEND
+from .sqlite_store import SQLiteStore
+from .store_raw_pitch import BASE_UPLOAD_DIR
+
+DECK_REGISTRY_PATH = os.path.join(BASE_UPLOAD_DIR, "deck_registry.db")
+# Deck ids become upload file names and GCS path components
+DECK_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$")
+
+
+@dataclass
+class DeckRecord:
+    """One ingested pitch deck and the RAG corpus built from it"""
+
+    deck_id: str
+    company_name: str
+    corpus_name: Optional[str] = None
+    created_at: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class DeckRegistryBackend(ABC):
+    """Storage for deck records"""
+
+    @abstractmethod
+    def put(self, record: DeckRecord):
+        pass
+
+    @abstractmethod
+    def get(self, deck_id: str) -> Optional[DeckRecord]:
+        pass
+
+    @abstractmethod
+    def list(self) -> List[DeckRecord]:
+        pass
+
+    @abstractmethod
+    def delete(self, deck_id: str):
+        pass
+
+
+class InMemoryDeckBackend(DeckRegistryBackend):
+    """Process-local backend; decks are lost on restart"""
+
+    def __init__(self):
+        self._records: Dict[str, DeckRecord] = {}
+        self._lock = threading.Lock()
+
+    def put(self, record: DeckRecord):
+        with self._lock:
+            self._records[record.deck_id] = record
+
+    def get(self, deck_id: str) -> Optional[DeckRecord]:
+        with self._lock:
+            return self._records.get(deck_id)
+
+    def list(self) -> List[DeckRecord]:
+        with self._lock:
+            return sorted(self._records.values(), key=lambda r: r.created_at)
+
+    def delete(self, deck_id: str):
+        with self._lock:
+            self._records.pop(deck_id, None)
+
+
+class SQLiteDeckBackend(SQLiteStore, DeckRegistryBackend):
+    """Backend persisted in a local SQLite database"""
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS decks (
+            deck_id TEXT PRIMARY KEY,
+            company_name TEXT NOT NULL,
+            corpus_name TEXT,
+            created_at REAL NOT NULL
+        )
+        """
+    ]
+
+    def __init__(self, db_path: str = DECK_REGISTRY_PATH):
+        super().__init__(db_path)
+
+    def put(self, record: DeckRecord):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO decks VALUES (?, ?, ?, ?)",
+                (
+                    record.deck_id,
+                    record.company_name,
+                    record.corpus_name,
+                    record.created_at,
+                ),
+            )
+
+    def get(self, deck_id: str) -> Optional[DeckRecord]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM decks WHERE deck_id = ?", (deck_id,)
+            ).fetchone()
+        return DeckRecord(**dict(row)) if row else None
+
+    def list(self) -> List[DeckRecord]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT * FROM decks ORDER BY created_at").fetchall()
+        return [DeckRecord(**dict(row)) for row in rows]
+
+    def delete(self, deck_id: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM decks WHERE deck_id = ?", (deck_id,))
+
+
+DECK_BACKENDS = {"memory": InMemoryDeckBackend, "sqlite": SQLiteDeckBackend}
+
+
+class DeckRegistry:
+    """
+    Deck-scoped replacement for the single-slot RAG registry.
+
+    Every upload gets its own deck id, so concurrent uploads and memo
+    generations never read each other's corpus.
+    """
+
+    def __init__(self, backend: DeckRegistryBackend):
+        self.backend = backend
+
+    @staticmethod
+    def new_deck_id(company_name: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "-", company_name).strip("-_")[:100]
+        return f"{slug or 'deck'}-{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def is_valid_deck_id(deck_id: str) -> bool:
+        return bool(DECK_ID_PATTERN.match(deck_id))
+
+    def register(
+        self,
+        deck_id: str,
+        company_name: str,
+        corpus_name: Optional[str] = None,
+    ) -> DeckRecord:
+        existing = self.backend.get(deck_id)
+        record = DeckRecord(
+            deck_id=deck_id,
+            company_name=company_name,
+            corpus_name=corpus_name,
+            created_at=existing.created_at if existing else time.time(),
+        )
+        self.backend.put(record)
+        return record
+
+    def get(self, deck_id: str) -> DeckRecord:
+        record = self.backend.get(deck_id)
+        if record is None:
+            raise RuntimeError(f"No deck registered with id: {deck_id}")
+        return record
+
+    def get_optional(self, deck_id: str) -> Optional[DeckRecord]:
+        return self.backend.get(deck_id)
+
+    def list(self) -> List[DeckRecord]:
+        return self.backend.list()
+
+    def delete(self, deck_id: str):
+        self.backend.delete(deck_id)
+
+
+def create_deck_registry(backend: str = "sqlite") -> DeckRegistry:
+    if backend not in DECK_BACKENDS:
+        raise ValueError(f"Unknown deck registry backend: {backend}")
+    return DeckRegistry(DECK_BACKENDS[backend]())
+
+
+# Global instance
+deck_registry = create_deck_registry(DECK_REGISTRY_BACKEND)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from .sqlite_store import SQLiteStore
+from .store_raw_pitch import BASE_UPLOAD_DIR
+
+LLM_CACHE_PATH = os.path.join(BASE_UPLOAD_DIR, "llm_cache.db")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def _hash_part(digest, part: Any):
+    """Feed one content part into the digest, using raw bytes for images."""
+    if isinstance(part, (list, tuple)):
+        for item in part:
+            _hash_part(digest, item)
+        return
+    if isinstance(part, str):
+        digest.update(b"text:" + part.encode("utf-8"))
+        return
+    data = getattr(part, "data", None)
+    if data is None:
+        data = getattr(part, "_image_bytes", None)
+    if isinstance(data, bytes):
+        digest.update(b"bytes:" + data)
+    else:
+        digest.update(b"repr:" + repr(part).encode("utf-8"))
+
+
+class LLMResponseCache(SQLiteStore):
+    """
+    Disk-backed cache of LLM responses.
+
+    Keys hash the model, generation config and full content (including image
+    bytes). Entries expire after ttl_seconds; beyond max_entries the least
+    recently used are evicted.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS llm_responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_llm_last_used ON llm_responses (last_used_at)",
+    ]
+
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        super().__init__(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        model: str, content: Any, generation_config: Optional[Dict] = None
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(
+            json.dumps(generation_config or {}, sort_keys=True, default=str).encode()
+        )
+        _hash_part(digest, content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row["created_at"] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self.evictions += 1
+                row = None
+            if row:
+                conn.execute(
+                    "UPDATE llm_responses SET last_used_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        if row:
+            self.hits += 1
+            return row["response"]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            if count > self.max_entries:
+                evicted = conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN (SELECT key FROM "
+                    "llm_responses ORDER BY last_used_at LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+                self.evictions += evicted
+
+    def delete(self, key: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connection() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+
+# Global instance
+llm_cache = LLMResponseCache()
@@ -0,0 +1,106 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+from .sqlite_store import SQLiteStore
+from .store_raw_pitch import BASE_UPLOAD_DIR
+
+SECTION_CACHE_PATH = os.path.join(BASE_UPLOAD_DIR, "section_cache.db")
+
+
+class SectionCache(SQLiteStore):
+    """
+    Persistent memo of generated deal-note sections.
+
+    Entries are keyed by (corpus_version, section, prompt_version, model) and
+    also record the hash of the evidence they were generated from, so a new
+    corpus version can reuse a section whose evidence did not change.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS section_results (
+            corpus_version TEXT NOT NULL,
+            section TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            model TEXT NOT NULL,
+            evidence_hash TEXT NOT NULL,
+            markdown TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (corpus_version, section, prompt_version, model)
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_section_evidence
+        ON section_results (section, prompt_version, model, evidence_hash)
+        """,
+    ]
+
+    def __init__(self, db_path: str = SECTION_CACHE_PATH):
+        super().__init__(db_path)
+        self.hits = 0
+        self.evidence_hits = 0
+        self.misses = 0
+
+    def get(
+        self, corpus_version: str, section: str, prompt_version: str, model: str
+    ) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM section_results WHERE corpus_version = ? AND section = ? "
+                "AND prompt_version = ? AND model = ?",
+                (corpus_version, section, prompt_version, model),
+            ).fetchone()
+        if row:
+            self.hits += 1
+        return dict(row) if row else None
+
+    def find_by_evidence(
+        self, section: str, prompt_version: str, model: str, evidence_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        """Find a section generated from identical evidence under any corpus version."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM section_results WHERE section = ? AND prompt_version = ? "
+                "AND model = ? AND evidence_hash = ? ORDER BY created_at DESC",
+                (section, prompt_version, model, evidence_hash),
+            ).fetchone()
+        if row:
+            self.evidence_hits += 1
+        else:
+            self.misses += 1
+        return dict(row) if row else None
+
+    def set(
+        self,
+        corpus_version: str,
+        section: str,
+        prompt_version: str,
+        model: str,
+        evidence_hash: str,
+        markdown: str,
+    ):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO section_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    corpus_version,
+                    section,
+                    prompt_version,
+                    model,
+                    evidence_hash,
+                    markdown,
+                    time.time(),
+                ),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "evidence_hits": self.evidence_hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance
+section_cache = SectionCache()
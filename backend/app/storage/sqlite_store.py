@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List
+
+
+class SQLiteStore:
+    """Base for small local SQLite stores: lazy schema setup and serialized access."""
+
+    SCHEMA: List[str] = []
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connection(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            self._initialized = True
+        return conn
@@ -0,0 +1,177 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from .sqlite_store import SQLiteStore
+from .store_raw_pitch import BASE_UPLOAD_DIR
+
+USAGE_LEDGER_PATH = os.path.join(BASE_UPLOAD_DIR, "llm_usage.db")
+DEFAULT_RETENTION_SECONDS = 30 * 24 * 3600
+# Expired rows are pruned once every this many inserts
+PRUNE_EVERY = 1000
+
+GROUP_BY_COLUMNS = ("site", "model", "deck_id", "request_id")
+RECORD_COLUMNS = (
+    "created_at",
+    "request_id",
+    "deck_id",
+    "site",
+    "model",
+    "prompt_tokens",
+    "output_tokens",
+    "latency",
+    "retries",
+    "cached",
+    "failed",
+    "cost",
+)
+
+
+class UsageLedger(SQLiteStore):
+    """
+    Append-only ledger of LLM calls.
+
+    Each row records one logical call (retries included): the call site,
+    deck and request it was made for, model, prompt/output tokens, latency,
+    retries and estimated cost. Rows older than retention_seconds are pruned.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL,
+            request_id TEXT,
+            deck_id TEXT,
+            site TEXT NOT NULL,
+            model TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            latency REAL NOT NULL,
+            retries INTEGER NOT NULL,
+            cached INTEGER NOT NULL,
+            failed INTEGER NOT NULL,
+            cost REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_usage_created ON llm_usage (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_usage_deck ON llm_usage (deck_id)",
+    ]
+
+    def __init__(
+        self,
+        db_path: str = USAGE_LEDGER_PATH,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ):
+        super().__init__(db_path)
+        self.retention_seconds = retention_seconds
+        self._inserts = 0
+
+    def record(self, entry: Dict[str, Any]):
+        values = [entry.get(column) for column in RECORD_COLUMNS]
+        values[0] = values[0] or time.time()
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT INTO llm_usage ({', '.join(RECORD_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in RECORD_COLUMNS)})",
+                values,
+            )
+            self._inserts += 1
+            if self._inserts % PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM llm_usage WHERE created_at < ?",
+                    (time.time() - self.retention_seconds,),
+                )
+
+    @staticmethod
+    def _filters(
+        deck_id: Optional[str], request_id: Optional[str], since: Optional[float]
+    ):
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("deck_id", deck_id), ("request_id", request_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def summary(
+        self,
+        group_by: str = "site",
+        deck_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Totals per group_by value, most expensive first."""
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(
+                f"Unknown group_by: {group_by}; expected one of {GROUP_BY_COLUMNS}"
+            )
+        where, params = self._filters(deck_id, request_id, since)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {group_by} AS name,
+                       COUNT(*) AS calls,
+                       SUM(cached) AS cached,
+                       SUM(failed) AS failed,
+                       SUM(retries) AS retries,
+                       SUM(prompt_tokens) AS prompt_tokens,
+                       SUM(output_tokens) AS output_tokens,
+                       SUM(latency) AS latency,
+                       SUM(cost) AS cost
+                FROM llm_usage {where}
+                GROUP BY {group_by}
+                ORDER BY cost DESC, prompt_tokens DESC
+                """,
+                params,
+            ).fetchall()
+        summary = []
+        for row in rows:
+            uncached = row["calls"] - row["cached"]
+            summary.append(
+                {
+                    group_by: row["name"],
+                    "calls": row["calls"],
+                    "cached": row["cached"],
+                    "failed": row["failed"],
+                    "retries": row["retries"],
+                    "prompt_tokens": row["prompt_tokens"],
+                    "output_tokens": row["output_tokens"],
+                    "latency": round(row["latency"], 2),
+                    "avg_latency": round(row["latency"] / uncached, 3)
+                    if uncached
+                    else 0.0,
+                    "estimated_cost_usd": round(row["cost"], 6),
+                }
+            )
+        return summary
+
+    def export(
+        self,
+        deck_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Yield matching rows as JSON lines, oldest first."""
+        where, params = self._filters(deck_id, request_id, since)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(RECORD_COLUMNS)} FROM llm_usage {where} "
+                "ORDER BY created_at",
+                params,
+            ).fetchall()
+        for row in rows:
+            entry = dict(row)
+            entry["cached"] = bool(entry["cached"])
+            entry["failed"] = bool(entry["failed"])
+            yield json.dumps(entry) + "\n"
+
+
+# Global instance
+usage_ledger = UsageLedger()
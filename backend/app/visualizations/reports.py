@@ -1,24 +1,26 @@
 """PDF report generation functions."""
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+import os
+import sys
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import inch
 from reportlab.platypus import (
-    SimpleDocTemplate,
+    Image,
+    PageBreak,
     Paragraph,
+    SimpleDocTemplate,
     Spacer,
-    Image,
     Table,
     TableStyle,
-    PageBreak,
 )
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from datetime import datetime
-import os
-import sys
 
 sys.path.append("/Users/pragathi.vetrivelmurugan/AI-Analyst/backend/app")
+from ..data.summary_parser import parse_ai_summary
 from ..utils.helpers import format_currency
 
 
@@ -478,49 +480,7 @@ class PDFReportGenerator:
 
     def _parse_ai_summary(self, ai_summary):
         """Parse AI summary into sections."""
-        sections = {}
-        current_section = None
-        current_content = []
-
-        lines = ai_summary.split("\n")
-
-        for line in lines:
-            line = line.strip()
-
-            # Check if this is a section header (starts with ## or is in ALL CAPS)
-            if line.startswith("##") or (
-                len(line) > 10
-                and line.isupper()
-                and any(
-                    keyword in line
-                    for keyword in [
-                        "ADVANTAGE",
-                        "DISADVANTAGE",
-                        "RECOMMENDATION",
-                        "PERSPECTIVE",
-                        "ANALYSIS",
-                    ]
-                )
-            ):
-                # Save previous section
-                if current_section and current_content:
-                    sections[current_section] = "\n".join(current_content)
-
-                # Start new section
-                current_section = line.lstrip("#").strip()
-                current_content = []
-            elif current_section and line:
-                current_content.append(line)
-
-        # Save last section
-        if current_section and current_content:
-            sections[current_section] = "\n".join(current_content)
-
-        # If no sections found, treat entire content as one section
-        if not sections and ai_summary.strip():
-            sections["Competitive Analysis Summary"] = ai_summary.strip()
-
-        return sections
+        return parse_ai_summary(ai_summary)
 
 
 # Global instance
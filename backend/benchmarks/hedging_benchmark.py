@@ -0,0 +1,108 @@
+"""
+Hedged requests against a latency-injecting stand-in for the Gemini client.
+
+Each round fires `--concurrency` calls at once. A call takes about
+`--median-ms` (log-normal jitter), and `--tail-pct` percent of calls take
+`--tail-ms` instead. The same seeded workload runs without and with the
+Hedger, and end-to-end p50/p95/p99 are reported along with the hedge rate
+and the p95 the hedger tracked.
+
+    python -m backend.benchmarks.hedging_benchmark
+    python -m backend.benchmarks.hedging_benchmark --tail-pct 5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+from ..app.services.hedging import Hedger
+
+MODEL = "stand-in"
+
+
+class LatencyInjectingModel:
+    """Stand-in for generate_content_async that sleeps for an injected latency."""
+
+    def __init__(self, median_ms: float, tail_pct: float, tail_ms: float, seed: int):
+        self.median = median_ms / 1000
+        self.tail_pct = tail_pct
+        self.tail = tail_ms / 1000
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def generate_content_async(self, content: str) -> str:
+        self.calls += 1
+        if self.random.random() * 100 < self.tail_pct:
+            latency = self.tail
+        else:
+            latency = self.median * self.random.lognormvariate(0, 0.15)
+        await asyncio.sleep(latency)
+        return f"response to {content}"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_workload(args: argparse.Namespace, hedger: Optional[Hedger]) -> Dict:
+    model = LatencyInjectingModel(
+        args.median_ms, args.tail_pct, args.tail_ms, args.seed
+    )
+    latencies: List[float] = []
+
+    async def call(index: int) -> float:
+        start_time = time.monotonic()
+
+        async def attempt() -> str:
+            return await model.generate_content_async(f"page {index}")
+
+        if hedger is None:
+            await attempt()
+        else:
+            await hedger.run(MODEL, attempt)
+        return time.monotonic() - start_time
+
+    for round_index in range(args.rounds + 1):
+        results = await asyncio.gather(
+            *(call(index) for index in range(args.concurrency))
+        )
+        # The first round only warms up the hedger's latency window
+        if round_index:
+            latencies.extend(results)
+
+    report: Dict[str, Optional[float]] = {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "model_calls": model.calls,
+    }
+    if hedger is not None:
+        report["hedged_pct"] = round(100 * hedger.hedged / hedger.requests, 1)
+        report["hedge_wins"] = hedger.hedge_wins
+        tracked_p95 = hedger.latencies.percentile(MODEL, hedger.percentile)
+        report["tracked_p95_ms"] = (
+            round(tracked_p95 * 1000, 1) if tracked_p95 is not None else None
+        )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--median-ms", type=float, default=30)
+    parser.add_argument("--tail-pct", type=float, default=2)
+    parser.add_argument("--tail-ms", type=float, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"No hedging: {asyncio.run(run_workload(args, None))}")
+    print(f"Hedging:    {asyncio.run(run_workload(args, Hedger()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Page extraction through call_gemini_api on worker threads versus acall_gemini_api.
+
+`--pages` extractions start at once against a stand-in model whose
+generate_content (blocking) and generate_content_async (awaitable) take
+about `--latency-ms` each. The sync path runs each call on a worker thread
+via asyncio.to_thread, as page extraction did before; the async path
+awaits the model directly. Wall time, throughput, peak live threads and
+the number of distinct threads that ran a model call are reported.
+`--workers` sizes the default executor (asyncio's default is
+min(32, cpu_count + 4)).
+
+    python -m backend.benchmarks.page_extraction_benchmark
+    python -m backend.benchmarks.page_extraction_benchmark --workers 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, Set, cast
+
+from vertexai.preview.generative_models import GenerativeModel
+
+from ..app.services import gemini_api
+from ..app.services.rate_limiter import LLMRateLimiter, RateLimits
+from ..app.storage.usage_ledger import usage_ledger
+
+MODEL = "stand-in"
+
+
+class LatencyInjectingModel:
+    """Stand-in for a GenerativeModel that sleeps for an injected latency."""
+
+    def __init__(self, latency_ms: float, seed: int):
+        self.latency = latency_ms / 1000
+        self.random = random.Random(seed)
+        self.threads: Set[int] = set()
+
+    def _response(self, content: list) -> SimpleNamespace:
+        return SimpleNamespace(text=f"## Page\n{content[0]}", usage_metadata=None)
+
+    def _jittered(self) -> float:
+        return self.latency * self.random.lognormvariate(0, 0.15)
+
+    def generate_content(self, content: list) -> SimpleNamespace:
+        self.threads.add(threading.get_ident())
+        time.sleep(self._jittered())
+        return self._response(content)
+
+    async def generate_content_async(self, content: list) -> SimpleNamespace:
+        self.threads.add(threading.get_ident())
+        await asyncio.sleep(self._jittered())
+        return self._response(content)
+
+
+async def run_workload(args: argparse.Namespace, use_async: bool) -> Dict:
+    if args.workers:
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(args.workers)
+        )
+    model = LatencyInjectingModel(args.latency_ms, args.seed)
+    # Stands in for a GenerativeModel by duck typing
+    gemini_api._models[MODEL] = cast(GenerativeModel, model)
+    peak_threads = threading.active_count()
+    done = asyncio.Event()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.002)
+
+    async def extract(page: int) -> str:
+        content = [f"page {page}"]
+        if use_async:
+            return await gemini_api.acall_gemini_api(MODEL, content, use_cache=False)
+        return await asyncio.to_thread(
+            gemini_api.call_gemini_api, MODEL, content, use_cache=False
+        )
+
+    sampler = asyncio.create_task(sample_threads())
+    start_time = time.monotonic()
+    outputs = await asyncio.gather(*(extract(page) for page in range(args.pages)))
+    elapsed = time.monotonic() - start_time
+    done.set()
+    await sampler
+
+    return {
+        "pages": sum(1 for output in outputs if output),
+        "wall_s": round(elapsed, 3),
+        "pages_per_s": round(args.pages / elapsed, 1),
+        "peak_threads": peak_threads,
+        "model_call_threads": len(model.threads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # No rate limiting and no writes to the real usage ledger
+    gemini_api.rate_limiter = LLMRateLimiter(
+        {MODEL: RateLimits(rpm=1_000_000, tpm=1_000_000_000)}
+    )
+    usage_ledger.db_path = os.path.join(tempfile.mkdtemp(), "usage.db")
+
+    print(f"Sync on threads: {asyncio.run(run_workload(args, use_async=False))}")
+    print(f"Async:           {asyncio.run(run_workload(args, use_async=True))}")
+
+
+if __name__ == "__main__":
+    main()
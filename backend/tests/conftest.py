@@ -0,0 +1,34 @@
+import os
+
+# The RAG modules read these at import time
+os.environ.setdefault("PROJECT_ID", "test-project")
+os.environ.setdefault("REGION", "us-central1")
+
+import pytest  # noqa: E402
+
+from backend.app.services.rag_agent.rag_config.rag_cache import (  # noqa: E402
+    retrieval_cache,
+)
+from backend.app.storage.chunk_store import chunk_store  # noqa: E402
+from backend.app.storage.deck_registry import (  # noqa: E402
+    SQLiteDeckBackend,
+    deck_registry,
+)
+from backend.app.storage.llm_cache import llm_cache  # noqa: E402
+from backend.app.storage.section_cache import section_cache  # noqa: E402
+from backend.app.storage.usage_ledger import usage_ledger  # noqa: E402
+
+
+@pytest.fixture
+def local_stores(tmp_path, monkeypatch):
+    """Point every local SQLite store and the deck registry at fresh databases."""
+    for store in (chunk_store, llm_cache, section_cache, usage_ledger):
+        name = f"{type(store).__name__}.db"
+        monkeypatch.setattr(store, "db_path", str(tmp_path / name))
+        monkeypatch.setattr(store, "_initialized", False)
+    monkeypatch.setattr(
+        deck_registry, "backend", SQLiteDeckBackend(str(tmp_path / "decks.db"))
+    )
+    retrieval_cache.clear()
+    yield
+    retrieval_cache.clear()
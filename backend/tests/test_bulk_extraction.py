@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from backend.app.services.benchmark_creation import batch_service
+from backend.app.services.benchmark_creation.batch_service import (
+    JOB_SUCCEEDED,
+    BatchJob,
+    LocalFileBatchBackend,
+    request_hash,
+    request_line,
+)
+
+PDFS = {"acme.pdf": "Acme deck text", "beta.pdf": "Beta deck text"}
+
+
+def memo_responder(model, prompt):
+    """Answers every extraction with a memo naming the prompt's document."""
+    return json.dumps({"company_name": prompt})
+
+
+@pytest.fixture
+def batch_jobs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_service, "BATCH_JOBS_DIR", str(tmp_path / "jobs"))
+
+
+def submit_job(backend):
+    job = BatchJob.create(backend.name, batch_service.BULK_EXTRACTION_MODEL)
+    lines = [request_line(key, prompt) for key, prompt in PDFS.items()]
+    for line in lines:
+        job.entries[line["key"]] = {"request_hash": request_hash(line["request"])}
+    job.save()
+    with open(job.requests_path, "w") as job_file:
+        for line in lines:
+            job_file.write(json.dumps(line) + "\n")
+    backend.submit(job)
+    job.save()
+    return job.job_id
+
+
+def test_local_backend_round_trip(batch_jobs_dir):
+    backend = LocalFileBatchBackend(responder=memo_responder)
+    job = BatchJob.load(submit_job(backend))
+
+    assert backend.refresh(job) == JOB_SUCCEEDED
+    results = {result.key: result for result in backend.results(job)}
+    assert {key: json.loads(result.text) for key, result in results.items()} == {
+        key: {"company_name": prompt} for key, prompt in PDFS.items()
+    }
+    assert not any(result.error for result in results.values())
+    assert not job.offline
+
+
+def test_offline_answers_mark_the_job(batch_jobs_dir):
+    job = BatchJob.load(submit_job(LocalFileBatchBackend(live=False)))
+
+    assert job.offline
+
+
+def import_orchestrators():
+    try:
+        from backend.app.flows import orchestrators
+    except Exception as e:  # app settings or GCP credentials unavailable
+        pytest.skip(f"orchestrators cannot be imported here: {e}")
+    return orchestrators
+
+
+@pytest.fixture
+def flow(batch_jobs_dir, monkeypatch):
+    """A PDFProcessingFlow whose OCR and Firestore steps are local stand-ins."""
+    orchestrators = import_orchestrators()
+    flow = orchestrators.PDFProcessingFlow()
+    flow.stored = []
+    monkeypatch.setattr(flow, "_list_pdfs", lambda folder: list(PDFS))
+    monkeypatch.setattr(flow, "_extract_text", lambda folder, pdf: PDFS[pdf])
+    monkeypatch.setattr(
+        flow, "_store", lambda data, pdf: flow.stored.append((pdf, data)) or True
+    )
+    gemini_service = orchestrators.gemini_service
+    monkeypatch.setattr(gemini_service, "extraction_available", lambda: True)
+    monkeypatch.setattr(gemini_service, "build_extraction_prompt", lambda text: text)
+    return flow
+
+
+def test_submit_and_ingest_with_the_local_backend(flow):
+    job_id = flow.submit_bulk_extraction(
+        "pdfs", backend=LocalFileBatchBackend(responder=memo_responder)
+    )
+
+    assert flow.ingest_bulk_job(job_id, wait=False)
+    assert sorted((pdf, data["company_name"]) for pdf, data in flow.stored) == sorted(
+        PDFS.items()
+    )
+    # A second ingestion stores nothing again
+    assert not flow.ingest_bulk_job(job_id, wait=False)
+    assert len(flow.stored) == len(PDFS)
+
+
+def test_offline_results_are_stored_only_on_request(flow):
+    job_id = flow.submit_bulk_extraction(
+        "pdfs", backend=LocalFileBatchBackend(live=False)
+    )
+
+    assert not flow.ingest_bulk_job(job_id, wait=False)
+    assert flow.stored == []
+    assert flow.ingest_bulk_job(job_id, wait=False, allow_offline=True)
+    assert len(flow.stored) == len(PDFS)
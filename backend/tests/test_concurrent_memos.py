@@ -0,0 +1,118 @@
+import asyncio
+import re
+import threading
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.llms import LLM
+
+from backend.app.services.rag_agent import deal_note_agent
+from backend.app.services.rag_agent.deal_note_agent_analyser import (
+    analyze_comprehensive,
+)
+from backend.app.services.rag_agent.tools import base_tool
+
+MEMOS = 8
+QUERY = "Write the deal note for {company}"
+
+
+class FakeRagClient:
+    """Returns one context naming the corpus it was asked about."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.threads = set()
+
+    async def retrieve_contexts(self, request, timeout=None):
+        corpus = request.vertex_rag_store.rag_resources[0].rag_corpus
+        self.calls += 1
+        self.threads.add(threading.get_ident())
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.in_flight -= 1
+        hit = SimpleNamespace(text=f"evidence from {corpus}", source_uri="", score=0.1)
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[hit]))
+
+
+class ScriptedLLM(LLM):
+    """Calls Team_Overview once, then answers with what it observed."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        raise NotImplementedError("the agent must run asynchronously")
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        await asyncio.sleep(0.01)
+        # The question and scratchpad come after the format instructions
+        scratchpad = prompt.rsplit("Question: ", 1)[1]
+        company_match = re.search(r"deal note for (\w+)", scratchpad)
+        assert company_match is not None
+        company = company_match.group(1)
+        observation = re.search(r"Observation: (.*)", scratchpad)
+        if observation is None:
+            return (
+                "Thought: I need the team first.\n"
+                f"Action: Team_Overview\nAction Input: {company}"
+            )
+        return f"Final Answer: Memo for {company}. {observation.group(1)}"
+
+
+def test_overlapping_memos_get_their_own_evidence(local_stores, monkeypatch):
+    client = FakeRagClient()
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+    monkeypatch.setattr(deal_note_agent, "llm", ScriptedLLM())
+    monkeypatch.setattr(deal_note_agent, "_agent_executor", None)
+    companies = [f"Company{i}" for i in range(MEMOS)]
+
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                analyze_comprehensive(
+                    QUERY.format(company=company),
+                    corpus_name=f"corpora/{company}",
+                    company_name=company,
+                    context_budget=False,
+                    use_cache=False,
+                )
+                for company in companies
+            )
+        )
+
+    results = asyncio.run(run_all())
+
+    for company, result in zip(companies, results):
+        assert "error" not in result, result.get("error")
+        memo = result["comprehensive_analysis"]
+        assert memo.startswith(f"Memo for {company}.")
+        assert f"evidence from corpora/{company}" in memo
+        assert "corpora/" not in memo.replace(f"corpora/{company}", "")
+        assert result["completed"]
+    # Retrievals overlap across memos, each memo has at most one in flight,
+    # and all of them are awaited on the event loop rather than on threads
+    assert client.calls == MEMOS
+    assert 1 < client.peak <= MEMOS
+    assert len(client.threads) == 1
@@ -0,0 +1,31 @@
+import asyncio
+
+from backend.app.services.rag_agent.coverage_controller import ToolCoverageController
+
+
+def test_failed_tool_call_leaves_the_section_missing():
+    controller = ToolCoverageController(["Traction", "Team_Overview"])
+    results = iter(["", "ARR grew 3x"])
+    calls = []
+
+    async def traction_tool(query: str) -> str:
+        calls.append(query)
+        return next(results)
+
+    async def run() -> str:
+        return await controller.run("Traction", "Acme", traction_tool)
+
+    first = asyncio.run(run())
+    assert controller.missing == ["Traction", "Team_Overview"]
+    assert "Sections not yet covered: Traction, Team_Overview" in first
+
+    # The retry reaches the tool again instead of replaying the failure
+    second = asyncio.run(run())
+    assert calls == ["Acme", "Acme"]
+    assert second.startswith("ARR grew 3x")
+    assert controller.missing == ["Team_Overview"]
+    assert controller.memoized_calls == 0
+
+    asyncio.run(run())
+    assert controller.memoized_calls == 1
+    assert len(calls) == 2
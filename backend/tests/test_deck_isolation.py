@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.app.services.rag_agent.rag_config.rag_context import rag_request_scope
+from backend.app.services.rag_agent.tools import base_tool
+from backend.app.storage.chunk_store import chunk_store
+from backend.app.storage.deck_registry import deck_registry
+
+# Both decks are uploads of the same file: their first chunk is identical,
+# but the slides around it differ
+SHARED_TEXT = "Acme builds payment rails for small merchants."
+
+
+def deck_chunks(deck_id):
+    texts = [SHARED_TEXT, f"{deck_id} traction", f"{deck_id} team"]
+    return [
+        {"text": text, "metadata": {"chunk_index": i, "slide_number": 1}}
+        for i, text in enumerate(texts)
+    ]
+
+
+class FakeRagClient:
+    """Answers retrieval with a hit from the requested corpus, after a delay."""
+
+    def __init__(self):
+        self.corpora = []
+
+    async def retrieve_contexts(self, request, timeout=None):
+        corpus = request.vertex_rag_store.rag_resources[0].rag_corpus
+        self.corpora.append(corpus)
+        # Let the other deck's request run in between
+        await asyncio.sleep(0.01)
+        hit = SimpleNamespace(text=SHARED_TEXT, source_uri=f"{corpus}/file", score=0.1)
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[hit]))
+
+
+async def process_deck(deck_id):
+    deck = deck_registry.get(deck_id)
+    with rag_request_scope(deck.corpus_name, deck.company_name, deck.deck_id):
+        contexts = await base_tool.aretrieve_contexts("What does Acme do?")
+        await asyncio.sleep(0)
+        return contexts, base_tool.expand_contexts(contexts, "Team_Overview")
+
+
+def test_concurrent_decks_do_not_see_each_other(local_stores, monkeypatch):
+    client = FakeRagClient()
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+    for deck_id in ("acme-aaaa1111", "acme-bbbb2222"):
+        chunk_store.save_chunks(deck_id, deck_chunks(deck_id))
+        deck_registry.register(deck_id, "Acme", f"corpora/{deck_id}")
+
+    async def run_both():
+        return await asyncio.gather(
+            process_deck("acme-aaaa1111"), process_deck("acme-bbbb2222")
+        )
+
+    results = asyncio.run(run_both())
+
+    assert sorted(client.corpora) == ["corpora/acme-aaaa1111", "corpora/acme-bbbb2222"]
+    for deck_id, (contexts, expanded) in zip(
+        ("acme-aaaa1111", "acme-bbbb2222"), results
+    ):
+        other = "acme-bbbb2222" if deck_id == "acme-aaaa1111" else "acme-aaaa1111"
+        assert [ctx["source_uri"] for ctx in contexts] == [f"corpora/{deck_id}/file"]
+        text = expanded[0]["text"]
+        assert f"{deck_id} traction" in text and f"{deck_id} team" in text
+        assert other not in text
+
+
+def test_deck_ids_are_safe_path_components():
+    assert deck_registry.is_valid_deck_id("acme-aaaa1111")
+    for deck_id in ("../etc", "a/b", "", ".hidden", "a b"):
+        assert not deck_registry.is_valid_deck_id(deck_id)
+    generated = deck_registry.new_deck_id("../../Acme Deck v2")
+    assert deck_registry.is_valid_deck_id(generated)
+    assert generated.startswith("Acme-Deck-v2-")
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.deadline import DeadlineExceeded
+from backend.app.services.rag_agent import portfolio_query as portfolio
+from backend.app.services.rag_agent.tools import base_tool
+from backend.app.storage.deck_registry import deck_registry
+
+
+class FailingRagClient:
+    """Answers retrieval for every corpus except those mapped to an error."""
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    async def retrieve_contexts(self, request, timeout=None):
+        corpus = request.vertex_rag_store.rag_resources[0].rag_corpus
+        if corpus in self.failures:
+            raise self.failures[corpus]
+        hit = SimpleNamespace(text=f"{corpus} traction", source_uri="file", score=0.2)
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[hit]))
+
+
+def register_decks():
+    for deck_id, company in (("acme-aaaa1111", "Acme"), ("beta-bbbb2222", "Beta")):
+        deck_registry.register(deck_id, company, f"corpora/{deck_id}")
+
+
+def test_failed_decks_are_reported(local_stores, monkeypatch):
+    client = FailingRagClient({"corpora/beta-bbbb2222": RuntimeError("unavailable")})
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+    register_decks()
+
+    response = asyncio.run(portfolio.portfolio_query("Traction?", answer=False))
+
+    assert response["errors"] == {"beta-bbbb2222": "unavailable"}
+    by_deck = {entry["deck_id"]: entry for entry in response["companies"]}
+    assert by_deck["acme-aaaa1111"]["evidence"]
+    assert "error" not in by_deck["acme-aaaa1111"]
+    assert by_deck["beta-bbbb2222"]["error"] == "unavailable"
+    assert "could not be retrieved" in portfolio._format_company(
+        by_deck["beta-bbbb2222"]
+    )
+
+
+def test_deadline_is_not_reported_as_a_failed_deck(local_stores, monkeypatch):
+    client = FailingRagClient({"corpora/beta-bbbb2222": DeadlineExceeded("late")})
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+    register_decks()
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(portfolio.portfolio_query("Traction?", answer=False))
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from backend.app.services.deadline import (
+    ClientDisconnected,
+    DeadlineExceeded,
+    remaining,
+    run_request,
+    sleep_within_deadline,
+)
+from backend.app.services.rag_agent.rag_config.rag_models_config import (
+    rag_model_config,
+)
+from backend.app.services.rag_agent.tools import base_tool
+
+
+class DisconnectingRequest:
+    """Starlette request stand-in whose client leaves after `polls` polls."""
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+def test_disconnect_stops_work_in_worker_threads():
+    stopped = {}
+
+    def blocking_work():
+        start_time = time.monotonic()
+        try:
+            sleep_within_deadline(5)
+        except DeadlineExceeded as e:
+            stopped["error"] = e
+        stopped["after"] = time.monotonic() - start_time
+
+    async def handler():
+        await run_request(
+            DisconnectingRequest(polls=2),
+            asyncio.to_thread(blocking_work),
+            poll_interval=0.01,
+        )
+
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(handler())
+    # The worker thread was woken by the cancellation, not by its own timer
+    assert isinstance(stopped["error"], ClientDisconnected)
+    assert stopped["after"] < 1
+
+
+def test_deadline_cancels_a_slow_request():
+    reached_end = threading.Event()
+
+    async def slow():
+        await asyncio.sleep(5)
+        reached_end.set()
+
+    start_time = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run_request(None, slow(), seconds=0.05, poll_interval=0.01))
+    assert time.monotonic() - start_time < 1
+    assert not reached_end.is_set()
+
+
+def test_nested_tasks_see_the_request_deadline():
+    async def task_remaining():
+        return remaining()
+
+    async def handler():
+        # Tasks and worker threads copy the request's context, deadline included
+        in_task = await asyncio.create_task(task_remaining())
+        in_thread = await asyncio.to_thread(remaining)
+        return in_task, in_thread
+
+    in_task, in_thread = asyncio.run(run_request(None, handler(), seconds=30))
+    assert 0 < in_thread <= in_task <= 30
+    assert remaining() is None
+
+
+class SlowRagClient:
+    """Answers retrieval after `delay` seconds, recording the timeout it got."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.timeouts: List[Optional[float]] = []
+
+    async def retrieve_contexts(self, request, timeout=None):
+        self.timeouts.append(timeout)
+        await asyncio.sleep(self.delay)
+        hit = SimpleNamespace(text="Acme traction", source_uri="file", score=0.1)
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[hit]))
+
+
+def test_shared_retrieval_keeps_each_callers_deadline(local_stores, monkeypatch):
+    client = SlowRagClient(delay=0.2)
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+
+    def retrieve(seconds):
+        coroutine = base_tool.aretrieve_contexts("Traction?", "corpora/acme")
+        return run_request(None, coroutine, seconds=seconds, poll_interval=0.01)
+
+    async def leader_then_follower():
+        leader = asyncio.create_task(retrieve(0.05))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(retrieve(5))
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(leader_then_follower())
+
+    # One call, bounded by the service timeout rather than the leader's deadline
+    assert client.timeouts == [rag_model_config.retrieval_timeout]
+    assert isinstance(leader, DeadlineExceeded)
+    assert [ctx["text"] for ctx in follower] == ["Acme traction"]
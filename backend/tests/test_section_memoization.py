@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.app.services.rag_agent import section_engine
+from backend.app.services.rag_agent.execute_deal_note_agent import (
+    generate_full_investment_report,
+)
+from backend.app.services.rag_agent.section_engine import (
+    SECTION_PROMPT_VERSION,
+    SYNTHESIS_PROMPT_VERSION,
+    SYNTHESIS_SECTION,
+    analyze_sections_parallel,
+    model_name,
+    precompute_sections,
+)
+from backend.app.services.rag_agent.tools import base_tool
+from backend.app.storage.chunk_store import chunk_store
+from backend.app.storage.section_cache import section_cache
+
+SECTIONS = ["Traction", "Funding_Details"]
+
+
+class FlakyRagClient:
+    """Fails every Funding_Details query while `failing` is set."""
+
+    def __init__(self):
+        self.failing = True
+        self.queries = []
+
+    async def retrieve_contexts(self, request, timeout=None):
+        text = request.query.text
+        self.queries.append(text)
+        if self.failing and "funding" in text.lower():
+            raise RuntimeError("RAG backend unavailable")
+        hit = SimpleNamespace(
+            text=f"evidence for {text[:20]}", source_uri="", score=0.1
+        )
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[hit]))
+
+
+class EchoLLM:
+    model_name = "echo"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt, config=None):
+        self.calls += 1
+        return "drafted"
+
+
+def cached_sections(corpus_version, model):
+    """Sections (and the synthesis) stored in the section cache for a version."""
+    versions = {name: SECTION_PROMPT_VERSION for name in SECTIONS}
+    versions[SYNTHESIS_SECTION] = SYNTHESIS_PROMPT_VERSION
+    return {
+        name
+        for name, version in versions.items()
+        if section_cache.get(corpus_version, name, version, model)
+    }
+
+
+def test_failed_retrieval_is_not_memoized(local_stores, monkeypatch):
+    client = FlakyRagClient()
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+    chunk_store.save_chunks(
+        "acme-aaaa1111",
+        [{"text": "Acme", "metadata": {"chunk_index": 0, "slide_number": 1}}],
+    )
+    llm = EchoLLM()
+
+    def run():
+        return asyncio.run(
+            analyze_sections_parallel(
+                "Acme",
+                section_names=SECTIONS,
+                llm=llm,
+                corpus_name="corpora/acme",
+                use_cache=True,
+                deck_id="acme-aaaa1111",
+            )
+        )
+
+    first = run()
+    by_section = {r["section"]: r for r in first["section_results"]}
+    assert "error" not in by_section["Traction"]
+    assert by_section["Funding_Details"]["error"].startswith("Retrieval failed")
+    # Only the section whose evidence was retrieved is kept for this version
+    corpus_version = first["corpus_version"]
+    assert cached_sections(corpus_version, model_name(llm)) == {"Traction"}
+
+    client.failing = False
+    client.queries.clear()
+    second = run()
+    by_section = {r["section"]: r for r in second["section_results"]}
+    assert by_section["Traction"]["cached"] == "corpus"
+    assert "error" not in by_section["Funding_Details"]
+    assert len(client.queries) == 1 and "funding" in client.queries[0].lower()
+    assert cached_sections(corpus_version, model_name(llm)) == set(
+        SECTIONS + [SYNTHESIS_SECTION]
+    )
+
+
+def test_default_memo_uses_precomputed_drafts(local_stores, monkeypatch):
+    client = FlakyRagClient()
+    client.failing = False
+    monkeypatch.setattr(base_tool, "_get_async_client", lambda: client)
+    llm = EchoLLM()
+    monkeypatch.setattr(section_engine, "default_llm", llm)
+    chunk_store.save_chunks(
+        "acme-aaaa1111",
+        [{"text": "Acme", "metadata": {"chunk_index": 0, "slide_number": 1}}],
+    )
+    scope = {"corpus_name": "corpora/acme", "deck_id": "acme-aaaa1111"}
+
+    asyncio.run(precompute_sections("Acme", **scope))
+    drafts = llm.calls
+    report = asyncio.run(generate_full_investment_report("Acme", **scope))
+
+    assert report["engine"] == "parallel"
+    # Every section comes from the drafts; only the synthesis is generated
+    assert drafts > 1 and llm.calls == drafts + 1
+    assert all(r.get("cached") for r in report["section_results"])
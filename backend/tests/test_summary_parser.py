@@ -0,0 +1,51 @@
+from backend.app.data.summary_parser import (
+    FALLBACK_SECTION,
+    AISummaryParser,
+    parse_ai_summary,
+)
+
+SUMMARY = """## Competitive Advantages
+- Lowest CAC in the sector
+- 2x faster onboarding
+
+## Competitive Disadvantages
+- Smaller sales team
+
+STRATEGIC RECOMMENDATIONS
+- Expand into the mid-market
+"""
+
+
+def test_sections_arrive_before_the_stream_ends():
+    emitted = []
+    parser = AISummaryParser(lambda title, content: emitted.append(title))
+    # Chunk boundaries fall in the middle of headers and lines
+    for start in range(0, len(SUMMARY), 7):
+        parser.feed(SUMMARY[start : start + 7])
+        if "## Competitive Disadvantages\n- S" in "".join(parser.text_parts):
+            break
+    assert emitted == ["Competitive Advantages"]
+
+    parser.feed(SUMMARY[start + 7 :])
+    sections = parser.close()
+    assert emitted == [
+        "Competitive Advantages",
+        "Competitive Disadvantages",
+        "STRATEGIC RECOMMENDATIONS",
+    ]
+    assert sections == parse_ai_summary(SUMMARY)
+    assert sections["Competitive Disadvantages"] == "- Smaller sales team"
+
+
+def test_reset_discards_a_retried_stream():
+    parser = AISummaryParser()
+    parser.feed("## Competitive Advantages\n- partial")
+    parser.reset()
+    parser.feed(SUMMARY)
+    assert parser.close() == parse_ai_summary(SUMMARY)
+
+
+def test_text_without_headers_becomes_one_section():
+    assert parse_ai_summary("Acme leads on price.") == {
+        FALLBACK_SECTION: "Acme leads on price."
+    }
@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from backend.app.services.llm_usage import (
+    arecord_llm_call,
+    record_llm_call,
+    usage_scope,
+)
+from backend.app.storage.usage_ledger import usage_ledger
+
+
+async def ingest_and_write(deck_id: str):
+    with usage_scope(deck_id=deck_id):
+        with usage_scope(site="page_extraction"):
+            await asyncio.sleep(0.01)
+            await arecord_llm_call("gemini-2.5-flash-lite", prompt_tokens=100)
+        with usage_scope(site="synthesis"):
+            # Worker threads keep the tags of the task that started them
+            await asyncio.to_thread(
+                record_llm_call, "gemini-2.5-flash", prompt_tokens=10
+            )
+
+
+def test_concurrent_requests_are_attributed_separately(local_stores):
+    async def run_all():
+        await asyncio.gather(*(ingest_and_write(f"deck-{i}") for i in range(5)))
+
+    asyncio.run(run_all())
+    record_llm_call("gemini-2.5-flash")
+
+    rows = [json.loads(line) for line in usage_ledger.export()]
+    assert len(rows) == 11
+    unattributed = [row for row in rows if row["deck_id"] is None]
+    assert [(row["site"], row["request_id"]) for row in unattributed] == [
+        ("other", None)
+    ]
+    for i in range(5):
+        deck_rows = [row for row in rows if row["deck_id"] == f"deck-{i}"]
+        assert sorted(row["site"] for row in deck_rows) == [
+            "page_extraction",
+            "synthesis",
+        ]
+        # One request id per outermost scope, shared by its nested scopes
+        assert len({row["request_id"] for row in deck_rows}) == 1
+    assert len({row["request_id"] for row in rows if row["deck_id"]}) == 5